@@ -0,0 +1 @@
+"""Benchmarks of the Xetra ETL pipeline"""
@@ -0,0 +1,113 @@
+"""Generator of synthetic source data shaped like the Xetra public data set"""
+from datetime import date, timedelta
+
+import numpy as np
+import pandas as pd
+
+from xetra.common.s3 import S3BucketConnector
+from xetra.common.trading_calendar import XetraTradingCalendar
+
+# Columns of the Xetra source files in the order of the public data set
+XETRA_COLUMNS = ['ISIN', 'Mnemonic', 'SecurityDesc', 'SecurityType', 'Currency', 'SecurityID',
+                 'Date', 'Time', 'StartPrice', 'MaxPrice', 'MinPrice', 'EndPrice',
+                 'NumberOfTrades', 'TradedVolume']
+# Hours with source files, the continuous trading of Xetra runs from 08:00 to 16:30 UTC
+TRADING_HOURS = range(8, 17)
+
+
+def generate_isins(isin_count: int):
+    """
+    Creates ISINs and mnemonics of instruments
+
+    :param isin_count: number of instruments
+
+    :returns:
+      isins: list of ISINs
+      mnemonics: list of mnemonics in the same order
+    """
+    isins = [f'DE000{number:06d}{number % 10}' for number in range(isin_count)]
+    mnemonics = [f'X{number:04d}' for number in range(isin_count)]
+    return isins, mnemonics
+
+
+def generate_hour(day: str, hour: int, isin_count: int, trades_per_minute: int,
+                  rng: np.random.Generator) -> pd.DataFrame:
+    """
+    Creates the rows of one hourly source file. Every row aggregates the trades
+    of one instrument within one minute like the Xetra data set.
+
+    :param day: date of the file, e.g. 2021-04-16
+    :param hour: hour of the file
+    :param isin_count: number of instruments
+    :param trades_per_minute: number of rows per minute
+    :param rng: numpy random generator
+
+    :returns:
+      data_frame: Pandas DataFrame with the XETRA_COLUMNS
+    """
+    isins, mnemonics = generate_isins(isin_count)
+    rows = 60 * trades_per_minute
+    minutes = np.repeat(np.arange(60), trades_per_minute)
+    instruments = rng.integers(0, isin_count, rows)
+    # Price level per instrument with a small random move per row
+    base_prices = 10 + (np.arange(isin_count) * 7.31) % 190
+    start_prices = base_prices[instruments] * (1 + rng.normal(0, 0.01, rows))
+    end_prices = start_prices * (1 + rng.normal(0, 0.002, rows))
+    max_prices = np.maximum(start_prices, end_prices) * (1 + rng.uniform(0, 0.002, rows))
+    min_prices = np.minimum(start_prices, end_prices) * (1 - rng.uniform(0, 0.002, rows))
+    return pd.DataFrame({
+        'ISIN': np.asarray(isins)[instruments],
+        'Mnemonic': np.asarray(mnemonics)[instruments],
+        'SecurityDesc': 'SYNTHETIC SECURITY',
+        'SecurityType': 'Common stock',
+        'Currency': 'EUR',
+        'SecurityID': 2504159 + instruments,
+        'Date': day,
+        'Time': [f'{hour:02d}:{minute:02d}' for minute in minutes],
+        'StartPrice': start_prices.round(2),
+        'MaxPrice': max_prices.round(2),
+        'MinPrice': min_prices.round(2),
+        'EndPrice': end_prices.round(2),
+        'NumberOfTrades': rng.integers(1, 20, rows),
+        'TradedVolume': rng.integers(1, 5000, rows)}, columns=XETRA_COLUMNS)
+
+
+def trading_dates(first_date: str, days: int):
+    """
+    Returns the first Xetra trading days from first_date on
+
+    :param first_date: first calendar day, e.g. 2021-04-12
+    :param days: number of trading days
+
+    :returns:
+      dates: list of dates formatted like 2021-04-12
+    """
+    start = date.fromisoformat(first_date)
+    # Two calendar weeks per trading week are more than enough with holidays
+    end = start + timedelta(days=days * 2 + 14)
+    return list(XetraTradingCalendar().trading_days(start, end)[:days].strftime('%Y-%m-%d'))
+
+
+def write_source_files(s3_bucket: S3BucketConnector, dates: list, isin_count: int,
+                       trades_per_minute: int, seed: int = 42):
+    """
+    Writes hourly source files for dates to the bucket with the keys of the
+    Xetra data set, e.g. 2021-04-16/2021-04-16_BINS_XETR08.csv
+
+    :param s3_bucket: S3BucketConnector of the source bucket
+    :param dates: dates the source files are created for
+    :param isin_count: number of instruments
+    :param trades_per_minute: number of rows per minute
+    :param seed: seed of the random generator
+
+    :returns:
+      rows: number of rows written
+    """
+    rng = np.random.default_rng(seed)
+    rows = 0
+    for day in dates:
+        for hour in TRADING_HOURS:
+            data_frame = generate_hour(day, hour, isin_count, trades_per_minute, rng)
+            s3_bucket.write_df_to_s3(data_frame, f'{day}/{day}_BINS_XETR{hour:02d}.csv', 'csv')
+            rows += len(data_frame)
+    return rows
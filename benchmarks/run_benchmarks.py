@@ -0,0 +1,204 @@
+"""Running the benchmarks of the Xetra ETL pipeline against a mocked S3"""
+import argparse
+import json
+import logging
+import os
+import platform
+import statistics
+import sys
+import time
+from datetime import datetime
+from unittest.mock import patch
+
+import boto3
+import pandas as pd
+import pyarrow
+from moto import mock_s3
+
+from benchmarks.data_generator import trading_dates, write_source_files
+from xetra.common.s3 import S3BucketConnector
+from xetra.common.meta_process import MetaProcess
+from xetra.transformers.xetra_transformer import XetraETL, XetraSourceConfig, XetraTargetConfig
+
+ENDPOINT_URL = 'https://s3.eu-central-1.amazonaws.com'
+SRC_BUCKET = 'benchmark-src'
+TRG_BUCKET = 'benchmark-trg'
+FIRST_DATE = '2021-04-12'
+SOURCE_CONFIG = XetraSourceConfig(
+    src_first_extract_date=FIRST_DATE,
+    src_columns=['ISIN', 'Mnemonic', 'Date', 'Time', 'StartPrice', 'EndPrice',
+                 'MinPrice', 'MaxPrice', 'TradedVolume'],
+    src_col_date='Date',
+    src_col_isin='ISIN',
+    src_col_time='Time',
+    src_col_start_price='StartPrice',
+    src_col_min_price='MinPrice',
+    src_col_max_price='MaxPrice',
+    src_col_traded_vol='TradedVolume')
+TARGET_CONFIG = XetraTargetConfig(
+    trg_col_isin='isin',
+    trg_col_date='date',
+    trg_col_op_price='opening_price_eur',
+    trg_col_clos_price='closing_price_eur',
+    trg_col_min_price='minimum_price_eur',
+    trg_col_max_price='maximum_price_eur',
+    trg_col_dail_trad_vol='daily_traded_volume',
+    trg_col_ch_prev_clos='change_prev_closing_%',
+    trg_key='report1/xetra_daily_report1_',
+    trg_key_date_format='%Y%m%d_%H%M%S',
+    trg_format='parquet')
+
+
+def time_call(func, repeat: int) -> dict:
+    """
+    Calls func repeat times and measures the wall time of every call
+
+    :param func: function without arguments
+    :param repeat: number of calls
+
+    :returns:
+      result: dict with the times of all runs and their minimum, median and mean in seconds
+    """
+    runs = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        runs.append(time.perf_counter() - start)
+    return {'runs': runs, 'min': min(runs), 'median': statistics.median(runs),
+            'mean': statistics.mean(runs)}
+
+
+def run_benchmarks(isin_count: int, trades_per_minute: int, days: int,
+                   repeat: int = 3, seed: int = 42) -> dict:
+    """
+    Generates synthetic source data on a mocked S3 and times the pipeline steps
+
+    :param isin_count: number of instruments
+    :param trades_per_minute: number of source rows per minute
+    :param days: number of trading days
+    :param repeat: number of runs per benchmark
+    :param seed: seed of the data generator
+
+    :returns:
+      results: dict with the parameters, the environment and the result per benchmark
+    """
+    env = {'AWS_ACCESS_KEY_ID': 'benchmark', 'AWS_SECRET_ACCESS_KEY': 'benchmark'}
+    with patch.dict(os.environ, env), mock_s3():
+        s3_resource = boto3.resource(service_name='s3', endpoint_url=ENDPOINT_URL)
+        for bucket in (SRC_BUCKET, TRG_BUCKET):
+            s3_resource.create_bucket(Bucket=bucket, CreateBucketConfiguration={
+                'LocationConstraint': 'eu-central-1'})
+        s3_bucket_src = S3BucketConnector('AWS_ACCESS_KEY_ID', 'AWS_SECRET_ACCESS_KEY',
+                                          ENDPOINT_URL, SRC_BUCKET)
+        s3_bucket_trg = S3BucketConnector('AWS_ACCESS_KEY_ID', 'AWS_SECRET_ACCESS_KEY',
+                                          ENDPOINT_URL, TRG_BUCKET)
+        dates = trading_dates(FIRST_DATE, days + 1)
+        source_rows = write_source_files(s3_bucket_src, dates, isin_count,
+                                         trades_per_minute, seed)
+        # The first date is the look-back day of the report
+        date_list = [dates[1], dates]
+        with patch.object(MetaProcess, 'return_date_list', return_value=date_list):
+            xetra_etl = XetraETL(s3_bucket_src, s3_bucket_trg, 'meta/benchmark_meta.csv',
+                                 SOURCE_CONFIG, TARGET_CONFIG)
+            data_frame = xetra_etl.extract()
+            day_files = s3_bucket_src.list_files_in_prefix(dates[0])
+            benchmarks = {}
+            for engine in ('c', 'pyarrow'):
+                benchmarks[f'read_csv_to_df[{engine}]'] = (time_call(
+                    lambda engine=engine: [s3_bucket_src.read_csv_to_df(key, engine=engine)
+                                           for key in day_files], repeat),
+                    source_rows // len(dates))
+            for engine in ('legacy', 'single_pass'):
+                xetra_etl.trg_args = TARGET_CONFIG._replace(trg_transform_engine=engine)
+                benchmarks[f'transform_report1[{engine}]'] = (time_call(
+                    lambda: xetra_etl.transform_report1(data_frame.copy()), repeat),
+                    len(data_frame))
+            for file_format in ('csv', 'parquet'):
+                benchmarks[f'write_df_to_s3[{file_format}]'] = (time_call(
+                    lambda file_format=file_format: s3_bucket_trg.write_df_to_s3(
+                        data_frame, f'benchmark/source.{file_format}', file_format),
+                    repeat), len(data_frame))
+            benchmarks['etl_report1'] = (time_call(
+                lambda: XetraETL(s3_bucket_src, s3_bucket_trg, 'meta/benchmark_meta.csv',
+                                 SOURCE_CONFIG, TARGET_CONFIG).etl_report1(), repeat),
+                source_rows)
+    return {
+        'created': datetime.now().isoformat(timespec='seconds'),
+        'params': {'isin_count': isin_count, 'trades_per_minute': trades_per_minute,
+                   'days': days, 'repeat': repeat, 'seed': seed},
+        'environment': {'python': platform.python_version(), 'pandas': pd.__version__,
+                        'pyarrow': pyarrow.__version__, 'machine': platform.machine(),
+                        'cpu_count': os.cpu_count()},
+        'results': {name: dict(timing, rows=rows) for name, (timing, rows) in benchmarks.items()}
+    }
+
+
+def compare(results: dict, baseline: dict, tolerance: float = 0.2) -> list:
+    """
+    Compares the median times of the benchmarks with a baseline
+
+    :param results: dict from run_benchmarks
+    :param baseline: dict from run_benchmarks of an earlier run
+    :param tolerance: relative slowdown from which on a benchmark is a regression
+
+    :returns:
+      comparison: list of dicts with name, baseline and current median, ratio and regression flag
+    """
+    comparison = []
+    for name, result in results['results'].items():
+        if name not in baseline['results']:
+            continue
+        baseline_median = baseline['results'][name]['median']
+        ratio = result['median'] / baseline_median if baseline_median else float('inf')
+        comparison.append({'name': name, 'baseline': baseline_median,
+                           'current': result['median'], 'ratio': ratio,
+                           'regression': ratio > 1 + tolerance})
+    return comparison
+
+
+def main(argv: list = None):
+    """
+    entry point to run the benchmarks
+    """
+    parser = argparse.ArgumentParser(description='Run the Xetra ETL benchmarks.')
+    parser.add_argument('--isins', type=int, default=500, help='Number of instruments.')
+    parser.add_argument('--trades-per-minute', type=int, default=200,
+                        help='Number of source rows per minute.')
+    parser.add_argument('--days', type=int, default=3, help='Number of report days.')
+    parser.add_argument('--repeat', type=int, default=3, help='Number of runs per benchmark.')
+    parser.add_argument('--seed', type=int, default=42, help='Seed of the data generator.')
+    parser.add_argument('--output', default='benchmark_results.json',
+                        help='JSON file the results are written to.')
+    parser.add_argument('--baseline', help='JSON file with results to compare with.')
+    parser.add_argument('--tolerance', type=float, default=0.2,
+                        help='Relative slowdown reported as regression.')
+    args = parser.parse_args(argv)
+    if args.baseline and os.path.abspath(args.baseline) == os.path.abspath(args.output):
+        parser.error('--baseline and --output must be different files, '
+                     'the results would overwrite the baseline')
+    logging.basicConfig(level=logging.WARNING)
+
+    # Reading the baseline first, so a missing file fails before the benchmarks run
+    baseline = None
+    if args.baseline:
+        with open(args.baseline, encoding='utf-8') as file:
+            baseline = json.load(file)
+    results = run_benchmarks(args.isins, args.trades_per_minute, args.days,
+                             args.repeat, args.seed)
+    with open(args.output, 'w', encoding='utf-8') as file:
+        json.dump(results, file, indent=2)
+    for name, result in results['results'].items():
+        print(f'{name:32} median {result["median"]:9.4f}s  rows {result["rows"]}')
+    if baseline is None:
+        return 0
+    regressions = 0
+    for entry in compare(results, baseline, args.tolerance):
+        flag = 'REGRESSION' if entry['regression'] else 'ok'
+        print(f'{entry["name"]:32} {entry["baseline"]:9.4f}s -> {entry["current"]:9.4f}s '
+              f'x{entry["ratio"]:.2f} {flag}')
+        regressions += entry['regression']
+    return 1 if regressions else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -5,8 +5,12 @@ import logging.config
 
 import yaml
 
-from xetra.common.s3 import S3BucketConnector
+from xetra.common.s3 import S3ConnectionFactory
+from xetra.common.local_cache import LocalObjectCache
+from xetra.common.metrics import PipelineMetrics
+from xetra.common.s3_async import AsyncS3BucketConnector
 from xetra.transformers.xetra_transformer import XetraETL, XetraSourceConfig, XetraTargetConfig
+from xetra.transformers.report_registry import MultiReportETL, ReportConfig
 
 
 def main():
@@ -16,6 +20,8 @@ def main():
     # Parsing YML file
     parser = argparse.ArgumentParser(description='Run the Xetra ETL Job.')
     parser.add_argument('config', help='A configuration file in YAML format.')
+    parser.add_argument('--mirror', action='store_true',
+                        help='Only mirrors the source files of the dates to process to parquet.')
     args = parser.parse_args()
 
     config = yaml.safe_load(open(args.config))
@@ -24,28 +30,77 @@ def main():
     logging.config.dictConfig(log_config)
     # reading s3 configuration
     s3_config = config['s3']
-    # creating the S3BucketConnector classes for source and target
-    s3_bucket_src = S3BucketConnector(access_key=s3_config['access_key'],
-                                      secret_key=s3_config['secret_key'],
-                                      endpoint_url=s3_config['src_endpoint_url'],
-                                      bucket=s3_config['src_bucket'])
-    s3_bucket_trg = S3BucketConnector(access_key=s3_config['access_key'],
-                                      secret_key=s3_config['secret_key'],
-                                      endpoint_url=s3_config['trg_endpoint_url'],
-                                      bucket=s3_config['trg_bucket'])
+    # creating the metrics of the run shared by all components
+    metrics_config = config.get('metrics', {})
+    metrics = PipelineMetrics(json_path=metrics_config.get('json_path'),
+                              prometheus_textfile=metrics_config.get('prometheus_textfile'))
+    # creating the S3BucketConnector classes for source and target sharing one session
+    connection_factory = S3ConnectionFactory(
+        access_key=s3_config['access_key'],
+        secret_key=s3_config['secret_key'],
+        max_pool_connections=s3_config.get('max_pool_connections', 10),
+        tcp_keepalive=s3_config.get('tcp_keepalive', False),
+        retry_max_attempts=s3_config.get('retry_max_attempts'),
+        retry_mode=s3_config.get('retry_mode'))
+    src_cache = None
+    if s3_config.get('src_cache_dir'):
+        # local cache of the parsed source files, which never change once published
+        src_cache = LocalObjectCache(s3_config['src_cache_dir'],
+                                     s3_config.get('src_cache_max_bytes', 2 * 1024 ** 3))
+    s3_bucket_src = connection_factory.connector(endpoint_url=s3_config['src_endpoint_url'],
+                                                 bucket=s3_config['src_bucket'],
+                                                 cache=src_cache,
+                                                 metrics=metrics)
+    s3_bucket_trg = connection_factory.connector(
+        endpoint_url=s3_config['trg_endpoint_url'],
+        bucket=s3_config['trg_bucket'],
+        multipart_part_size=s3_config.get('multipart_part_size'),
+        multipart_concurrency=s3_config.get('multipart_concurrency', 4),
+        metrics=metrics)
+    s3_bucket_src_async = None
+    if s3_config.get('src_async'):
+        # asynchronous source connector used by extract instead of threads
+        s3_bucket_src_async = AsyncS3BucketConnector(access_key=s3_config['access_key'],
+                                                     secret_key=s3_config['secret_key'],
+                                                     endpoint_url=s3_config['src_endpoint_url'],
+                                                     bucket=s3_config['src_bucket'],
+                                                     cache=src_cache,
+                                                     metrics=metrics)
     # reading source configuration
     source_config = XetraSourceConfig(**config['source'])
+    logger = logging.getLogger(__name__)
+    if config.get('reports') and not args.mirror:
+        # creating several reports from one shared extract
+        reports = [ReportConfig(report=report['report'], meta_key=report['meta_key'],
+                                trg_args=XetraTargetConfig(**report['target']))
+                   for report in config['reports']]
+        logger.info('Xetra ETL job started.')
+        MultiReportETL(s3_bucket_src, s3_bucket_trg, source_config, reports,
+                       meta_append_only=config.get('meta', {}).get('meta_append_only', False),
+                       s3_bucket_src_async=s3_bucket_src_async,
+                       metrics=metrics,
+                       meta_compact_threshold=config.get('meta', {}).get(
+                           'meta_compact_threshold', 30)).etl_reports()
+        logger.info('Xetra ETL job finished.')
+        return
     # reading target configuration
     target_config = XetraTargetConfig(**config['target'])
     # reading meta file configuration
     meta_config = config['meta']
     # creating XetraETL class
-    logger = logging.getLogger(__name__)
     logger.info('Xetra ETL job started.')
     xetra_etl = XetraETL(s3_bucket_src, s3_bucket_trg,
-                         meta_config['meta_key'], source_config, target_config)
-    # running etl job for xetra report 1
-    xetra_etl.etl_report1()
+                         meta_config['meta_key'], source_config, target_config,
+                         meta_append_only=meta_config.get('meta_append_only', False),
+                         s3_bucket_src_async=s3_bucket_src_async,
+                         metrics=metrics,
+                         meta_compact_threshold=meta_config.get('meta_compact_threshold', 30))
+    if args.mirror:
+        # running the mirror stage only
+        xetra_etl.mirror_source()
+    else:
+        # running etl job for xetra report 1
+        xetra_etl.etl_report1()
     logger.info('Xetra ETL job finished.')
 
 
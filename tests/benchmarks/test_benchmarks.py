@@ -0,0 +1,67 @@
+"""TestBenchmarks"""
+import unittest
+from unittest.mock import patch
+
+import numpy as np
+
+from benchmarks.data_generator import XETRA_COLUMNS, generate_hour, trading_dates
+from benchmarks.run_benchmarks import compare, main, run_benchmarks
+
+
+class TestBenchmarks(unittest.TestCase):
+    """
+    Testing the benchmark suite.
+    """
+
+    def test_generate_hour(self):
+        """
+        Tests the shape of a generated hourly source file
+        """
+        # Method execution
+        data_frame = generate_hour('2021-04-16', 9, 10, 4, np.random.default_rng(1))
+        # Test after method execution
+        self.assertEqual(XETRA_COLUMNS, list(data_frame.columns))
+        self.assertEqual(240, len(data_frame))
+        self.assertLessEqual(data_frame['ISIN'].nunique(), 10)
+        self.assertEqual(['09:00', '09:59'], [data_frame['Time'].min(), data_frame['Time'].max()])
+        self.assertTrue((data_frame['MinPrice'] <= data_frame['MaxPrice']).all())
+
+    def test_trading_dates(self):
+        """
+        Tests that the generated dates skip weekends and holidays
+        """
+        # Method execution
+        dates = trading_dates('2021-03-31', 4)
+        # Test after method execution
+        self.assertEqual(['2021-03-31', '2021-04-01', '2021-04-06', '2021-04-07'], dates)
+
+    def test_run_benchmarks_and_compare(self):
+        """
+        Tests a small benchmark run and the comparison with a baseline
+        """
+        # Method execution
+        results = run_benchmarks(isin_count=5, trades_per_minute=2, days=1, repeat=1)
+        baseline = {'results': {name: dict(result, median=result['median'] / 2)
+                                for name, result in results['results'].items()}}
+        comparison = compare(results, baseline, tolerance=0.5)
+        # Test after method execution
+        self.assertIn('etl_report1', results['results'])
+        self.assertIn('transform_report1[single_pass]', results['results'])
+        self.assertEqual(1, len(results['results']['etl_report1']['runs']))
+        self.assertEqual(len(results['results']), len(comparison))
+        self.assertTrue(all(entry['regression'] for entry in comparison))
+
+    def test_main_baseline_is_output(self):
+        """
+        Tests that main refuses a baseline that would be overwritten by the results
+        """
+        # Method execution
+        with patch('benchmarks.run_benchmarks.run_benchmarks') as run:
+            with self.assertRaises(SystemExit):
+                main(['--output', 'results.json', '--baseline', 'results.json'])
+        # Test after method execution
+        run.assert_not_called()
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,79 @@
+"""TestLocalObjectCache"""
+import os
+import tempfile
+import time
+import unittest
+
+import pandas as pd
+
+from xetra.common.local_cache import LocalObjectCache
+
+
+class TestLocalObjectCache(unittest.TestCase):
+    """
+    Testing the LocalObjectCache class.
+    """
+
+    def setUp(self):
+        """
+        Setting up the environment
+        """
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.df = pd.DataFrame({'col1': ['valA', 'valB'], 'col2': [1.5, 2.5]})
+
+    def tearDown(self):
+        self.tmp_dir.cleanup()
+
+    def test_entry_key(self):
+        """
+        Tests that entry keys differ for other ETags and read arguments
+        """
+        # Method execution
+        key = LocalObjectCache.entry_key('bucket', 'key.csv', '"etag1"', engine='c')
+        # Test after method execution
+        self.assertEqual(key, LocalObjectCache.entry_key('bucket', 'key.csv', '"etag1"',
+                                                         engine='c'))
+        self.assertNotEqual(key, LocalObjectCache.entry_key('bucket', 'key.csv', '"etag2"',
+                                                            engine='c'))
+        self.assertNotEqual(key, LocalObjectCache.entry_key('bucket', 'key.csv', '"etag1"',
+                                                            engine='pyarrow'))
+
+    def test_get_put(self):
+        """
+        Tests get for a missing and a stored entry
+        """
+        # Test init
+        cache = LocalObjectCache(self.tmp_dir.name)
+        # Method execution
+        result_missing = cache.get('missing')
+        cache.put('entry', self.df)
+        result = cache.get('entry')
+        # Test after method execution
+        self.assertIsNone(result_missing)
+        pd.testing.assert_frame_equal(self.df, result)
+
+    def test_put_evicts_least_recently_used(self):
+        """
+        Tests that put deletes the least recently used entries above max_bytes
+        """
+        # Test init
+        cache = LocalObjectCache(self.tmp_dir.name)
+        cache.put('entry1', self.df)
+        entry_size = os.path.getsize(os.path.join(self.tmp_dir.name, 'entry1.parquet'))
+        cache.max_bytes = 2 * entry_size
+        cache.put('entry2', self.df)
+        # Making entry2 the least recently used one by reading entry1
+        past = time.time() - 60
+        os.utime(os.path.join(self.tmp_dir.name, 'entry1.parquet'), (past, past))
+        os.utime(os.path.join(self.tmp_dir.name, 'entry2.parquet'), (past - 60, past - 60))
+        cache.get('entry1')
+        # Method execution
+        cache.put('entry3', self.df)
+        # Test after method execution
+        self.assertIsNotNone(cache.get('entry1'))
+        self.assertIsNone(cache.get('entry2'))
+        self.assertIsNotNone(cache.get('entry3'))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -2,6 +2,7 @@
 import os
 import unittest
 from io import StringIO
+from unittest.mock import patch
 from datetime import datetime, timedelta
 
 import boto3
@@ -11,6 +12,7 @@ from moto import mock_s3
 from xetra.common.s3 import S3BucketConnector
 from xetra.common.meta_process import MetaProcess
 from xetra.common.constants import MetaProcessFormat
+from xetra.common.trading_calendar import XetraTradingCalendar
 from xetra.common.custom_exceptions import WrongMetaFileException
 
 
@@ -184,6 +186,161 @@ class TestMetaProcessMethods(unittest.TestCase):
             }
         )
 
+    def test_update_meta_file_append_only(self):
+        """
+        Tests the update_meta_file method
+        writing delta files of the append-only meta store
+        """
+        # Expected results
+        date_list_exp = ['2021-04-12', '2021-04-13', '2021-04-16', '2021-04-17']
+        # Test init
+        meta_key = 'meta.csv'
+        delta_prefix = f'{meta_key}{MetaProcessFormat.META_DELTA_SUFFIX.value}'
+        # Method execution
+        MetaProcess.update_meta_file(date_list_exp[:2], meta_key, self.s3_bucket_meta,
+                                     append_only=True)
+        MetaProcess.update_meta_file(date_list_exp[2:], meta_key, self.s3_bucket_meta,
+                                     append_only=True)
+        # Test after method execution
+        self.assertNotIn(meta_key, self.s3_bucket_meta.list_files_in_prefix(meta_key))
+        self.assertEqual(len(self.s3_bucket_meta.list_files_in_prefix(delta_prefix)), 2)
+        df_meta_result = MetaProcess.read_meta_file(meta_key, self.s3_bucket_meta, append_only=True)
+        self.assertEqual(date_list_exp,
+                         sorted(df_meta_result[MetaProcessFormat.META_SOURCE_DATE_COL.value]))
+
+    def test_update_meta_file_append_only_compaction(self):
+        """
+        Tests the update_meta_file method compacting the delta
+        files into the meta file when the threshold is reached
+        """
+        # Expected results
+        date_list_exp = ['2021-04-12', '2021-04-13', '2021-04-16', '2021-04-17']
+        # Test init
+        meta_key = 'meta.csv'
+        delta_prefix = f'{meta_key}{MetaProcessFormat.META_DELTA_SUFFIX.value}'
+        meta_content = (
+          f'{MetaProcessFormat.META_SOURCE_DATE_COL.value},'
+          f'{MetaProcessFormat.META_PROCESS_COL.value}\n'
+          f'{date_list_exp[0]},'
+          f'{datetime.today().strftime(MetaProcessFormat.META_PROCESS_DATE_FORMAT.value)}'
+        )
+        self.s3_bucket.put_object(Body=meta_content, Key=meta_key)
+        # Method execution
+        for date in date_list_exp[1:]:
+            MetaProcess.update_meta_file([date], meta_key, self.s3_bucket_meta,
+                                         append_only=True, compact_threshold=3)
+        # Test after method execution
+        self.assertFalse(self.s3_bucket_meta.list_files_in_prefix(delta_prefix))
+        df_meta_result = self.s3_bucket_meta.read_csv_to_df(meta_key)
+        self.assertEqual(date_list_exp,
+                         list(df_meta_result[MetaProcessFormat.META_SOURCE_DATE_COL.value]))
+
+    def test_read_meta_file_many_deltas(self):
+        """
+        Tests the read_meta_file method reading
+        many delta files in the order of their keys
+        """
+        # Expected results
+        date_list_exp = self.dates[::-1] * 5
+        # Test init
+        meta_key = 'meta.csv'
+        for date in date_list_exp:
+            MetaProcess.update_meta_file([date], meta_key, self.s3_bucket_meta, append_only=True,
+                                         compact_threshold=len(date_list_exp) + 1)
+        # Method execution
+        df_meta_result = MetaProcess.read_meta_file(meta_key, self.s3_bucket_meta, append_only=True)
+        # Test after method execution
+        self.assertEqual(date_list_exp,
+                         list(df_meta_result[MetaProcessFormat.META_SOURCE_DATE_COL.value]))
+
+    def test_return_date_list_append_only(self):
+        """
+        Tests the return_date_list method
+        with the delta files of the append-only meta store
+        """
+        # Expected results
+        min_date_exp = self.dates[2]
+        date_list_exp = [self.dates[day] for day in range(3, -1, -1)]
+        # Test init
+        meta_key = 'meta.csv'
+        meta_content = (
+          f'{MetaProcessFormat.META_SOURCE_DATE_COL.value},'
+          f'{MetaProcessFormat.META_PROCESS_COL.value}\n'
+          f'{self.dates[4]},{self.dates[0]}'
+        )
+        self.s3_bucket.put_object(Body=meta_content, Key=meta_key)
+        MetaProcess.update_meta_file([self.dates[3]], meta_key, self.s3_bucket_meta,
+                                     append_only=True)
+        # Method execution
+        min_date_return, date_list_return = MetaProcess.return_date_list(
+            self.dates[4], meta_key, self.s3_bucket_meta, append_only=True)
+        # Test after method execution
+        self.assertEqual(date_list_exp, date_list_return)
+        self.assertEqual(min_date_exp, min_date_return)
+
+    def test_return_date_list_date_index(self):
+        """
+        Tests the return_date_list method answering from the date index
+        written at compaction and the outstanding delta files
+        """
+        # Expected results
+        min_date_exp = self.dates[1]
+        date_list_exp = [self.dates[2], self.dates[1], self.dates[0]]
+        index_exp = [self.dates[day] for day in range(7, 3, -1)]
+        # Test init
+        meta_key = 'meta.csv'
+        for date in index_exp:
+            MetaProcess.update_meta_file([date], meta_key, self.s3_bucket_meta,
+                                         append_only=True, compact_threshold=4)
+        MetaProcess.update_meta_file([self.dates[3]], meta_key, self.s3_bucket_meta,
+                                     append_only=True, compact_threshold=4)
+        MetaProcess.update_meta_file([self.dates[2]], meta_key, self.s3_bucket_meta,
+                                     append_only=True, compact_threshold=4)
+        df_index = self.s3_bucket_meta.read_parquet_to_df(MetaProcess.date_index_key(meta_key))
+        read_csv_to_df = self.s3_bucket_meta.read_csv_to_df
+        # Method execution
+        with patch.object(self.s3_bucket_meta, 'read_csv_to_df',
+                          side_effect=read_csv_to_df) as read_csv_mock:
+            min_date_return, date_list_return = MetaProcess.return_date_list(
+                self.dates[5], meta_key, self.s3_bucket_meta, append_only=True)
+        # Test after method execution
+        self.assertEqual(index_exp,
+                         list(df_index[MetaProcessFormat.META_SOURCE_DATE_COL.value]))
+        self.assertEqual(date_list_exp, date_list_return)
+        self.assertEqual(min_date_exp, min_date_return)
+        self.assertNotIn(meta_key, [call.args[0] for call in read_csv_mock.call_args_list])
+        self.assertEqual(read_csv_mock.call_count, 2)
+
+    def test_return_date_list_xetra_calendar(self):
+        """
+        Tests the return_date_list method
+        with the Xetra trading calendar skipping weekends and holidays
+        """
+        # Expected results
+        min_date_exp = '2022-12-27'
+        date_list_exp = ['2022-12-23', '2022-12-27', '2022-12-28', '2023-01-02']
+        # Test init
+        calendar = XetraTradingCalendar()
+        meta_key = 'meta.csv'
+        processed = calendar.trading_days('2022-12-21', datetime.today().date())\
+            .strftime(MetaProcessFormat.META_DATE_FORMAT.value)
+        processed = [date for date in processed if date not in ('2022-12-27', '2022-12-28')]
+        meta_content = (
+          f'{MetaProcessFormat.META_SOURCE_DATE_COL.value},'
+          f'{MetaProcessFormat.META_PROCESS_COL.value}\n' +
+          '\n'.join(f'{date},{self.dates[0]}' for date in processed)
+        )
+        self.s3_bucket.put_object(Body=meta_content, Key=meta_key)
+        # Method execution
+        min_date_return, date_list_return = MetaProcess.return_date_list(
+            '2022-12-21', meta_key, self.s3_bucket_meta, calendar=calendar)
+        # Test after method execution
+        self.assertEqual(min_date_exp, min_date_return)
+        self.assertEqual(date_list_exp[:3], date_list_return[:3])
+        self.assertIn(date_list_exp[3], date_list_return)
+        for holiday in ['2022-12-24', '2022-12-26', '2022-12-31', '2023-01-01']:
+            self.assertNotIn(holiday, date_list_return)
+
     def test_return_date_list_no_meta_file(self):
         """
         Tests the return_date_list method
@@ -307,9 +464,10 @@ class TestMetaProcessMethods(unittest.TestCase):
         self.s3_bucket.put_object(Body=meta_content, Key=meta_key)
         first_date = self.dates[0]
         # Method execution
-        min_date_return, date_list_return = MetaProcess.return_date_list(first_date, meta_key,
-                                                                         self.s3_bucket_meta)
+        result = MetaProcess.return_date_list(first_date, meta_key, self.s3_bucket_meta)
+        min_date_return, date_list_return = result
         # Test after method execution
+        self.assertIsInstance(result, tuple)
         self.assertEqual(date_list_exp, date_list_return)
         self.assertEqual(min_date_exp, min_date_return)
         # Cleanup after test
@@ -0,0 +1,93 @@
+"""TestPipelineMetrics"""
+import json
+import os
+import tempfile
+import unittest
+
+from xetra.common.metrics import PipelineMetrics
+
+
+class TestPipelineMetrics(unittest.TestCase):
+    """
+    Testing the PipelineMetrics class.
+    """
+
+    def test_stage_and_counters(self):
+        """
+        Tests that stage times and counters are added up in the summary
+        """
+        # Test init
+        metrics = PipelineMetrics()
+        # Method execution
+        with metrics.stage('extract'):
+            sum(range(100000))
+        with metrics.stage('extract'):
+            pass
+        metrics.increment('rows_read', 10)
+        metrics.increment('rows_read', 5)
+        metrics.increment('objects_read')
+        summary = metrics.summary()
+        # Test after method execution
+        self.assertEqual(['extract'], list(summary['stages']))
+        self.assertGreater(summary['stages']['extract']['wall_seconds'], 0)
+        self.assertGreaterEqual(summary['stages']['extract']['cpu_seconds'], 0)
+        self.assertEqual({'rows_read': 15, 'objects_read': 1}, summary['counters'])
+        self.assertGreater(summary['peak_rss_bytes'], 0)
+
+    def test_observe_latency(self):
+        """
+        Tests the latency histogram of an S3 operation
+        """
+        # Test init
+        metrics = PipelineMetrics()
+        # Method execution
+        metrics.observe_latency('GetObject', 0.003)
+        metrics.observe_latency('GetObject', 0.2)
+        metrics.observe_latency('GetObject', 60)
+        histogram = metrics.summary()['s3_latency_seconds']['GetObject']
+        # Test after method execution
+        self.assertEqual(3, histogram['count'])
+        self.assertAlmostEqual(60.203, histogram['sum'])
+        self.assertEqual(1, histogram['buckets']['0.005'])
+        self.assertEqual(1, histogram['buckets']['0.25'])
+        self.assertEqual(1, histogram['buckets']['inf'])
+        self.assertEqual(3, sum(histogram['buckets'].values()))
+
+    def test_emit(self):
+        """
+        Tests that emit logs the summary and writes the JSON and Prometheus files
+        """
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            # Test init
+            json_path = os.path.join(tmp_dir, 'metrics.json')
+            prom_path = os.path.join(tmp_dir, 'metrics.prom')
+            metrics = PipelineMetrics(json_path=json_path, prometheus_textfile=prom_path)
+            with metrics.stage('load'):
+                metrics.increment('bytes_uploaded', 2048)
+            metrics.observe_latency('PutObject', 0.02)
+            # Method execution
+            with self.assertLogs() as logm:
+                summary = metrics.emit()
+                # Log test after method execution
+                self.assertIn('Xetra ETL run summary', logm.output[0])
+            with open(json_path, encoding='utf-8') as file:
+                summary_file = json.load(file)
+            with open(prom_path, encoding='utf-8') as file:
+                prom_lines = file.read().splitlines()
+        # Test after method execution
+        self.assertEqual(summary, summary_file)
+        self.assertIn('xetra_bytes_uploaded_total 2048', prom_lines)
+        self.assertIn('xetra_s3_request_duration_seconds_bucket'
+                      '{operation="PutObject",le="0.01"} 0', prom_lines)
+        self.assertIn('xetra_s3_request_duration_seconds_bucket'
+                      '{operation="PutObject",le="0.025"} 1', prom_lines)
+        self.assertIn('xetra_s3_request_duration_seconds_bucket'
+                      '{operation="PutObject",le="+Inf"} 1', prom_lines)
+        self.assertIn('xetra_s3_request_duration_seconds_count{operation="PutObject"} 1',
+                      prom_lines)
+        self.assertTrue(any(line.startswith('xetra_stage_wall_seconds{stage="load"}')
+                            for line in prom_lines))
+
+
+if __name__ == '__main__':
+    unittest.main()
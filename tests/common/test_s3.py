@@ -1,13 +1,19 @@
 """TestS3BucketConnectorMethods"""
+import gzip
 import os
+import tempfile
 import unittest
+from unittest.mock import patch
 from io import StringIO, BytesIO
 
 import boto3
 import pandas as pd
+import zstandard
 from moto import mock_s3
 
-from xetra.common.s3 import S3BucketConnector
+from xetra.common.s3 import S3BucketConnector, S3ConnectionFactory
+from xetra.common.local_cache import LocalObjectCache
+from xetra.common.metrics import PipelineMetrics
 from xetra.common.custom_exceptions import WrongFormatException
 
 
@@ -98,6 +104,23 @@ class TestS3BucketConnectorMethods(unittest.TestCase):
         # Tests after method execution
         self.assertTrue(not list_result)
 
+    def test_delete_files(self):
+        """
+        Tests the delete_files method for deleting
+        2 of 3 files on the mocked s3 bucket
+        """
+        # Expected results
+        keys_exp = ['prefix/test1.csv', 'prefix/test2.csv']
+        key_kept_exp = 'prefix/test3.csv'
+        # Test init
+        for key in keys_exp + [key_kept_exp]:
+            self.s3_bucket.put_object(Body='col1,col2\nvalA,valB', Key=key)
+        # Method execution
+        result = self.s3_bucket_conn.delete_files(keys_exp)
+        # Tests after method execution
+        self.assertTrue(result)
+        self.assertEqual([key_kept_exp], self.s3_bucket_conn.list_files_in_prefix('prefix/'))
+
     def test_read_csv_to_df_ok(self):
         """
         Tests the read_csv_to_df method for
@@ -134,6 +157,101 @@ class TestS3BucketConnectorMethods(unittest.TestCase):
             }
         )
 
+    def test_read_csv_to_df_usecols_dtype(self):
+        """
+        Tests the read_csv_to_df method when only some
+        columns are parsed with explicit data types
+        """
+        # Expected results
+        key_exp = 'test.csv'
+        df_exp = pd.DataFrame({'col1': pd.Categorical(['valA', 'valB']),
+                               'col3': pd.Series([1.5, 2.5], dtype='float32')})
+        # Test init
+        csv_content = 'col1,col2,col3\nvalA,valB,1.5\nvalB,valC,2.5'
+        self.s3_bucket.put_object(Body=csv_content, Key=key_exp)
+        # Method execution
+        df_result = self.s3_bucket_conn.read_csv_to_df(
+            key_exp, usecols=['col1', 'col3'], dtype={'col1': 'category', 'col3': 'float32'})
+        # Test after method execution
+        pd.testing.assert_frame_equal(df_exp, df_result)
+        # Cleanup after test
+        self.s3_bucket.delete_objects(
+            Delete={
+                'Objects': [
+                    {
+                        'Key': key_exp
+                    }
+                ]
+            }
+        )
+
+    def test_read_csv_to_df_pyarrow(self):
+        """
+        Tests that the read_csv_to_df method gives the same DataFrame
+        with the pyarrow parser engine as with the C engine
+        """
+        # Expected results
+        key_exp = 'test.csv'
+        # Test init
+        csv_content = ('ISIN,Date,Time,StartPrice,TradedVolume\n'
+                       'AT0000A0E9W5,2021-04-15,12:00,20.19,877\n'
+                       'AT0000A0E9W5,2021-04-15,,20.5,87')
+        self.s3_bucket.put_object(Body=csv_content, Key=key_exp)
+        # Method execution
+        df_exp = self.s3_bucket_conn.read_csv_to_df(key_exp)
+        df_result = self.s3_bucket_conn.read_csv_to_df(key_exp, engine='pyarrow')
+        df_exp_dtype = self.s3_bucket_conn.read_csv_to_df(
+            key_exp, usecols=['ISIN', 'Date', 'StartPrice'],
+            dtype={'ISIN': 'category', 'Date': 'category', 'StartPrice': 'float32'})
+        df_result_dtype = self.s3_bucket_conn.read_csv_to_df(
+            key_exp, usecols=['ISIN', 'Date', 'StartPrice'],
+            dtype={'ISIN': 'category', 'Date': 'category', 'StartPrice': 'float32'},
+            engine='pyarrow')
+        # Test after method execution
+        pd.testing.assert_frame_equal(df_exp, df_result)
+        pd.testing.assert_frame_equal(df_exp_dtype, df_result_dtype)
+        # Cleanup after test
+        self.s3_bucket.delete_objects(
+            Delete={
+                'Objects': [
+                    {
+                        'Key': key_exp
+                    }
+                ]
+            }
+        )
+
+    def test_read_csv_to_df_encoding(self):
+        """
+        Tests that the read_csv_to_df method decodes the response
+        stream with the given encoding for both parser engines
+        """
+        # Expected results
+        key_exp = 'test.csv'
+        val_exp = 'Börse'
+        # Test init
+        self.s3_bucket.put_object(Body=f'col1,col2\n{val_exp},1'.encode('latin-1'), Key=key_exp)
+        # Method execution
+        df_result = self.s3_bucket_conn.read_csv_to_df(key_exp, encoding='latin-1')
+        df_result_pyarrow = self.s3_bucket_conn.read_csv_to_df(
+            key_exp, encoding='latin-1', engine='pyarrow')
+        # Test after method execution
+        self.assertEqual(val_exp, df_result['col1'][0])
+        self.assertEqual(val_exp, df_result_pyarrow['col1'][0])
+
+    def test_read_csv_to_df_wrong_engine(self):
+        """
+        Tests the read_csv_to_df method if a not
+        supported parser engine is given as argument
+        """
+        # Expected results
+        key_exp = 'test.csv'
+        # Test init
+        self.s3_bucket.put_object(Body='col1,col2\nvalA,valB', Key=key_exp)
+        # Method execution
+        with self.assertRaises(WrongFormatException):
+            self.s3_bucket_conn.read_csv_to_df(key_exp, engine='wrong_engine')
+
     def test_write_df_to_s3_empty(self):
         """
         Tests the write_df_to_s3 method with
@@ -240,5 +358,298 @@ class TestS3BucketConnectorMethods(unittest.TestCase):
             # Log test after method execution
             self.assertIn(log_exp, logm.output[0])
 
+    # moto does not decode the aws-chunked bodies botocore sends for parts with checksums
+    @patch.dict(os.environ, {'AWS_REQUEST_CHECKSUM_CALCULATION': 'when_required'})
+    @patch('moto.s3.models.S3_UPLOAD_PART_MIN_SIZE', 256)
+    def test_write_df_to_s3_multipart(self):
+        """
+        Tests the write_df_to_s3 method
+        if streaming csv and parquet as multipart upload is successful
+        """
+        # Expected results
+        df_exp = pd.DataFrame({'col1': range(2000), 'col2': [f'val{i}' for i in range(2000)]})
+        # Test init
+        s3_bucket_conn = S3BucketConnector(self.s3_access_key,
+                                           self.s3_secret_key,
+                                           self.s3_endpoint_url,
+                                           self.s3_bucket_name,
+                                           multipart_part_size=1024,
+                                           multipart_concurrency=2)
+        for file_format, read in [('csv', pd.read_csv), ('parquet', pd.read_parquet)]:
+            key_exp = f'test.{file_format}'
+            # Method execution
+            result = s3_bucket_conn.write_df_to_s3(df_exp, key_exp, file_format)
+            # Test after method execution
+            s3_object = self.s3_bucket.Object(key=key_exp)
+            df_result = read(BytesIO(s3_object.get().get('Body').read()))
+            self.assertTrue(result)
+            self.assertTrue(s3_object.e_tag.endswith(f'-{-(-s3_object.content_length // 1024)}"'))
+            self.assertTrue(df_exp.equals(df_result))
+
+    def test_write_df_to_s3_multipart_small(self):
+        """
+        Tests the write_df_to_s3 method with multipart uploads
+        enabled for a file smaller than one part
+        """
+        # Expected results
+        df_exp = pd.DataFrame([['A', 'B'], ['C', 'D']], columns=['col1', 'col2'])
+        key_exp = 'test.csv'
+        # Test init
+        s3_bucket_conn = S3BucketConnector(self.s3_access_key,
+                                           self.s3_secret_key,
+                                           self.s3_endpoint_url,
+                                           self.s3_bucket_name,
+                                           multipart_part_size=1024)
+        # Method execution
+        s3_bucket_conn.write_df_to_s3(df_exp, key_exp, 'csv')
+        # Test after method execution
+        s3_object = self.s3_bucket.Object(key=key_exp)
+        df_result = pd.read_csv(BytesIO(s3_object.get().get('Body').read()))
+        self.assertNotIn('-', s3_object.e_tag)
+        self.assertTrue(df_exp.equals(df_result))
+
+    def test_write_df_to_s3_multipart_abort(self):
+        """
+        Tests that the multipart upload is aborted
+        if serializing the DataFrame fails
+        """
+        # Expected results
+        key_exp = 'test.csv'
+        # Test init
+        df_exp = pd.DataFrame({'col1': range(2000)})
+        s3_bucket_conn = S3BucketConnector(self.s3_access_key,
+                                           self.s3_secret_key,
+                                           self.s3_endpoint_url,
+                                           self.s3_bucket_name,
+                                           multipart_part_size=5 * 1024 ** 2)
+
+        def to_csv_failing(out_buffer, **kwargs):
+            out_buffer.write(b'x' * (6 * 1024 ** 2))
+            raise ValueError('serialization failed')
+        # Method execution
+        with patch.object(df_exp, 'to_csv', side_effect=to_csv_failing):
+            with self.assertRaises(ValueError):
+                s3_bucket_conn.write_df_to_s3(df_exp, key_exp, 'csv')
+        # Test after method execution
+        uploads = self.s3.meta.client.list_multipart_uploads(Bucket=self.s3_bucket_name)
+        self.assertFalse(uploads.get('Uploads'))
+        self.assertFalse(self.s3_bucket_conn.list_files_in_prefix(key_exp))
+
+    def test_connection_factory_shared(self):
+        """
+        Tests that connectors of an S3ConnectionFactory share the session
+        and the S3 resource of an endpoint and use the configured client settings
+        """
+        # Test init
+        connection_factory = S3ConnectionFactory(self.s3_access_key, self.s3_secret_key,
+                                                 max_pool_connections=32, tcp_keepalive=True,
+                                                 retry_max_attempts=5, retry_mode='standard')
+        # Method execution
+        conn_src = connection_factory.connector(self.s3_endpoint_url, self.s3_bucket_name)
+        conn_trg = connection_factory.connector(self.s3_endpoint_url, self.s3_bucket_name,
+                                                multipart_concurrency=8)
+        conn_other = connection_factory.connector('https://s3.eu-west-1.amazonaws.com',
+                                                  self.s3_bucket_name)
+        # Test after method execution
+        self.assertIs(conn_src.session, conn_trg.session)
+        self.assertIs(conn_src.session, conn_other.session)
+        self.assertIs(conn_src._s3, conn_trg._s3)
+        self.assertIsNot(conn_src._s3, conn_other._s3)
+        self.assertEqual(8, conn_trg.multipart_concurrency)
+        client_config = conn_src._s3.meta.client.meta.config
+        self.assertEqual(32, client_config.max_pool_connections)
+        self.assertTrue(client_config.tcp_keepalive)
+        self.assertEqual('standard', client_config.retries['mode'])
+
+    def test_exceptions_no_such_key(self):
+        """
+        Tests that the exception classes resolved by the connector
+        match the errors of its requests
+        """
+        # Method execution and test after method execution
+        with self.assertRaises(self.s3_bucket_conn.exceptions.NoSuchKey):
+            self.s3_bucket_conn.read_csv_to_df('missing.csv')
+
+    def test_read_csv_to_df_local_cache(self):
+        """
+        Tests the read_csv_to_df method with a local cache:
+        a listed and cached file is not downloaded again, a changed file is
+        """
+        # Expected results
+        key_exp = 'prefix/test.csv'
+        df_exp = pd.DataFrame({'col1': ['valA', 'valC'], 'col2': [1.5, 2.5]})
+        df_changed = pd.DataFrame({'col1': ['valB'], 'col2': [3.5]})
+        # Test init
+        self.s3_bucket.put_object(Body=df_exp.to_csv(index=False), Key=key_exp)
+        with tempfile.TemporaryDirectory() as cache_dir:
+            s3_bucket_conn = S3BucketConnector(self.s3_access_key, self.s3_secret_key,
+                                               self.s3_endpoint_url, self.s3_bucket_name,
+                                               cache=LocalObjectCache(cache_dir))
+            # Method execution
+            df_first = s3_bucket_conn.read_csv_to_df(key_exp, dtype={'col1': 'category'})
+            s3_bucket_conn.list_files_in_prefix('prefix/')
+            with patch.object(s3_bucket_conn._bucket, 'Object') as object_mock:
+                with self.assertLogs() as logm:
+                    df_cached = s3_bucket_conn.read_csv_to_df(key_exp,
+                                                              dtype={'col1': 'category'})
+                    self.assertIn('from the local cache', logm.output[0])
+            self.s3_bucket.put_object(Body=df_changed.to_csv(index=False), Key=key_exp)
+            s3_bucket_conn.list_files_in_prefix('prefix/')
+            df_new = s3_bucket_conn.read_csv_to_df(key_exp, dtype={'col1': 'category'})
+        # Test after method execution
+        object_mock.assert_not_called()
+        pd.testing.assert_frame_equal(df_first, df_cached)
+        self.assertIsInstance(df_cached['col1'].dtype, pd.CategoricalDtype)
+        pd.testing.assert_frame_equal(df_changed.astype({'col1': 'category'}), df_new)
+
+    def test_read_csv_to_df_local_cache_missing_key(self):
+        """
+        Tests the read_csv_to_df method with a local cache
+        raising NoSuchKey like without cache for a missing key
+        """
+        # Test init
+        with tempfile.TemporaryDirectory() as cache_dir:
+            s3_bucket_conn = S3BucketConnector(self.s3_access_key, self.s3_secret_key,
+                                               self.s3_endpoint_url, self.s3_bucket_name,
+                                               cache=LocalObjectCache(cache_dir))
+            # Method execution
+            with self.assertRaises(s3_bucket_conn.exceptions.NoSuchKey) as context:
+                s3_bucket_conn.read_csv_to_df('missing.csv')
+        # Test after method execution
+        self.assertEqual('NoSuchKey', context.exception.response['Error']['Code'])
+
+    def test_metrics(self):
+        """
+        Tests that a connector with PipelineMetrics records transferred
+        objects and bytes and the latency of its S3 requests
+        """
+        # Test init
+        metrics = PipelineMetrics()
+        s3_bucket_conn = S3BucketConnector(self.s3_access_key, self.s3_secret_key,
+                                           self.s3_endpoint_url, self.s3_bucket_name,
+                                           metrics=metrics)
+        df_exp = pd.DataFrame({'col1': ['valA', 'valC'], 'col2': [1.5, 2.5]})
+        # Method execution
+        s3_bucket_conn.write_df_to_s3(df_exp, 'prefix/test.csv', 'csv')
+        s3_bucket_conn.list_files_in_prefix('prefix/')
+        s3_bucket_conn.read_csv_to_df('prefix/test.csv')
+        summary = metrics.summary()
+        # Test after method execution
+        size_exp = len(df_exp.to_csv(index=False).encode('utf-8'))
+        self.assertEqual({'objects_written': 1, 'bytes_uploaded': size_exp, 'objects_listed': 1,
+                          'objects_read': 1, 'bytes_downloaded': size_exp},
+                         summary['counters'])
+        self.assertEqual({'PutObject', 'ListObjects', 'GetObject'},
+                         set(summary['s3_latency_seconds']))
+
+    def test_read_df_parquet_projection_filters(self):
+        """
+        Tests the read_df method reading only the requested columns
+        and the row groups matching the filters of a parquet file
+        """
+        # Expected results
+        rows = 20000
+        df_exp = pd.DataFrame({'ISIN': ['DE2'] * rows, 'price': [2.0] * rows})
+        # Test init
+        metrics = PipelineMetrics()
+        s3_bucket_conn = S3BucketConnector(self.s3_access_key, self.s3_secret_key,
+                                           self.s3_endpoint_url, self.s3_bucket_name,
+                                           metrics=metrics)
+        # Large enough that the footer read does not cover the whole file
+        df_src = pd.DataFrame({'ISIN': ['DE1'] * rows + ['DE2'] * rows + ['DE3'] * rows,
+                               'price': [1.0] * rows + [2.0] * rows + [3.0] * rows,
+                               'volume': range(3 * rows)})
+        out_buffer = BytesIO()
+        df_src.to_parquet(out_buffer, index=False, row_group_size=rows)
+        self.s3_bucket.put_object(Body=out_buffer.getvalue(), Key='mirror/test.parquet')
+        # Method execution
+        df_result = s3_bucket_conn.read_df('mirror/test.parquet', 'parquet',
+                                           columns=['ISIN', 'price'],
+                                           filters=[('ISIN', '==', 'DE2')])
+        # Test after method execution
+        pd.testing.assert_frame_equal(df_exp, df_result, check_dtype=False)
+        counters = metrics.summary()['counters']
+        self.assertEqual(1, counters['objects_read'])
+        self.assertLess(counters['bytes_downloaded'], out_buffer.getbuffer().nbytes / 2)
+
+    def test_read_df_csv_filters(self):
+        """
+        Tests the read_df method applying columns and filters to a csv file
+        """
+        # Expected results
+        df_exp = pd.DataFrame({'col1': ['valC'], 'col2': [2.5]})
+        # Test init
+        self.s3_bucket.put_object(Body='col1,col2,col3\nvalA,1.5,x\nvalC,2.5,y\n',
+                                  Key='prefix/test.csv')
+        # Method execution
+        df_result = self.s3_bucket_conn.read_df('prefix/test.csv', 'csv',
+                                                columns=['col1', 'col2'],
+                                                filters=[('col2', '>', 2),
+                                                         ('col1', 'in', ['valC', 'valD'])])
+        # Test after method execution
+        pd.testing.assert_frame_equal(df_exp, df_result, check_dtype=False)
+
+    def test_read_df_wrong_format(self):
+        """
+        Tests the read_df method with an unsupported file format and filter operator
+        """
+        # Expected results
+        log_exp = 'The file format json is not supported to be read from s3!'
+        # Method execution
+        with self.assertLogs() as logm:
+            with self.assertRaises(WrongFormatException):
+                self.s3_bucket_conn.read_df('prefix/test.json', 'json')
+            with self.assertRaises(WrongFormatException):
+                self.s3_bucket_conn.read_df('prefix/test.parquet', 'parquet',
+                                            filters=[('col1', 'like', 'val%')])
+            # Log test after method execution
+            self.assertIn(log_exp, logm.output[0])
+
+    def test_write_read_csv_compressed(self):
+        """
+        Tests that write_df_to_s3 compresses csv files by key suffix or
+        compression argument and read_csv_to_df detects the compression.
+        The Content-Encoding is only set for keys without suffix.
+        """
+        # Expected results
+        df_exp = pd.DataFrame({'col1': ['valA', 'valC'] * 500, 'col2': [1.5, 2.5] * 500})
+        # Test init
+        s3_bucket_conn_multipart = S3BucketConnector(self.s3_access_key, self.s3_secret_key,
+                                                     self.s3_endpoint_url, self.s3_bucket_name,
+                                                     multipart_part_size=1024)
+        cases = [(self.s3_bucket_conn, 'test.csv.gz', None, gzip.decompress),
+                 (self.s3_bucket_conn, 'test.csv.zst', None,
+                  lambda data: zstandard.ZstdDecompressor().stream_reader(data).read()),
+                 (self.s3_bucket_conn, 'test_gzip.csv', 'gzip', gzip.decompress),
+                 (s3_bucket_conn_multipart, 'multipart.csv.gz', None, gzip.decompress)]
+        for s3_bucket_conn, key, compression, decompress in cases:
+            # Method execution
+            s3_bucket_conn.write_df_to_s3(df_exp, key, 'csv', compression=compression)
+            for engine in ('c', 'pyarrow'):
+                df_result = self.s3_bucket_conn.read_csv_to_df(key, engine=engine)
+                # Test after method execution
+                self.assertTrue(df_exp.equals(df_result))
+            s3_object = self.s3_bucket.Object(key=key).get()
+            self.assertEqual(compression, self.s3_bucket_conn.infer_compression(
+                'object', s3_object.get('ContentEncoding')))
+            df_raw = pd.read_csv(BytesIO(decompress(s3_object['Body'].read())))
+            self.assertTrue(df_exp.equals(df_raw))
+
+    def test_compression_wrong_format(self):
+        """
+        Tests write_df_to_s3 and read_csv_to_df with an unsupported compression
+        """
+        # Expected results
+        log_exp = 'The compression bz2 is not supported!'
+        df_exp = pd.DataFrame([['A', 'B']], columns=['col1', 'col2'])
+        # Method execution
+        with self.assertLogs() as logm:
+            with self.assertRaises(WrongFormatException):
+                self.s3_bucket_conn.write_df_to_s3(df_exp, 'test.csv', 'csv', compression='bz2')
+            with self.assertRaises(WrongFormatException):
+                self.s3_bucket_conn.read_csv_to_df('test.csv', compression='bz2')
+            # Log test after method execution
+            self.assertIn(log_exp, logm.output[0])
+
 if __name__ == "__main__":
     unittest.main()
@@ -0,0 +1,286 @@
+"""TestAsyncS3BucketConnectorMethods"""
+import asyncio
+import gzip
+import os
+import socket
+import tempfile
+import unittest
+from unittest.mock import patch
+from io import BytesIO
+
+import boto3
+import pandas as pd
+import zstandard
+from moto.server import ThreadedMotoServer
+
+from xetra.common.s3 import S3BucketConnector, StreamDecompressor
+from xetra.common.s3_async import AsyncS3BucketConnector
+from xetra.common.local_cache import LocalObjectCache
+from xetra.common.metrics import PipelineMetrics
+from xetra.common.custom_exceptions import WrongFormatException
+
+
+class TestAsyncS3BucketConnectorMethods(unittest.IsolatedAsyncioTestCase):
+    """
+    Testing the AsyncS3BucketConnector class against a local moto server
+    """
+
+    @classmethod
+    def setUpClass(cls):
+        """
+        Starting the moto server once for all tests
+        """
+        with socket.socket() as sock:
+            sock.bind(('127.0.0.1', 0))
+            port = sock.getsockname()[1]
+        cls.server = ThreadedMotoServer(ip_address='127.0.0.1', port=port, verbose=False)
+        cls.server.start()
+        cls.s3_endpoint_url = f'http://127.0.0.1:{port}'
+
+    @classmethod
+    def tearDownClass(cls):
+        """
+        Stopping the moto server
+        """
+        cls.server.stop()
+
+    def setUp(self):
+        """
+        Setting up the environment
+        """
+        # The moto server does not decode aws-chunked request bodies
+        self.env_patch = patch.dict(os.environ, {
+            'AWS_REQUEST_CHECKSUM_CALCULATION': 'when_required',
+            'AWS_DEFAULT_REGION': 'eu-central-1'})
+        self.env_patch.start()
+        # Defining the class arguments
+        self.s3_access_key = 'AWS_ACCESS_KEY_ID'
+        self.s3_secret_key = 'AWS_SECRET_ACCESS_KEY'
+        self.s3_bucket_name = f'test-bucket-{self.id().rsplit(".", 1)[-1].replace("_", "-")}'
+        # Creating s3 access keys as environment variables
+        os.environ[self.s3_access_key] = 'KEY1'
+        os.environ[self.s3_secret_key] = 'KEY2'
+        # Creating a bucket on the moto server
+        self.s3 = boto3.resource(service_name='s3', endpoint_url=self.s3_endpoint_url)
+        self.s3.create_bucket(Bucket=self.s3_bucket_name,
+                              CreateBucketConfiguration={
+                                  'LocationConstraint': 'eu-central-1'
+                              })
+        self.s3_bucket = self.s3.Bucket(self.s3_bucket_name)
+        # Creating a testing instance
+        self.s3_bucket_conn = AsyncS3BucketConnector(self.s3_access_key,
+                                                     self.s3_secret_key,
+                                                     self.s3_endpoint_url,
+                                                     self.s3_bucket_name)
+
+    def tearDown(self):
+        """
+        Executing after unittests
+        """
+        self.s3_bucket.objects.all().delete()
+        self.s3_bucket.delete()
+        self.env_patch.stop()
+
+    async def test_list_files_in_prefix_ok(self):
+        """
+        Tests the list_files_in_prefix method for getting 2 file keys
+        as list on the moto server bucket
+        """
+        # Expected results
+        prefix_exp = 'prefix/'
+        key1_exp = f'{prefix_exp}test1.csv'
+        key2_exp = f'{prefix_exp}test2.csv'
+        # Test init
+        csv_content = """col1,col2
+        valA,valB"""
+        self.s3_bucket.put_object(Body=csv_content, Key=key1_exp)
+        self.s3_bucket.put_object(Body=csv_content, Key=key2_exp)
+        self.s3_bucket.put_object(Body=csv_content, Key='other/test3.csv')
+        # Method execution
+        async with self.s3_bucket_conn as s3_bucket_conn:
+            list_result = await s3_bucket_conn.list_files_in_prefix(prefix_exp)
+            list_empty = await s3_bucket_conn.list_files_in_prefix('no-prefix/')
+        # Tests after method execution
+        self.assertEqual([key1_exp, key2_exp], list_result)
+        self.assertEqual([], list_empty)
+
+    async def test_read_csv_to_df_ok(self):
+        """
+        Tests the read_csv_to_df method for
+        reading one .csv file from the moto server bucket with both parser engines
+        """
+        # Expected results
+        key_exp = 'test.csv'
+        df_exp = pd.DataFrame({'col1': ['valA', 'valC'], 'col2': [1.5, 2.5]})
+        # Test init
+        self.s3_bucket.put_object(Body=df_exp.to_csv(index=False), Key=key_exp)
+        # Method execution
+        with self.assertLogs() as logm:
+            async with self.s3_bucket_conn as s3_bucket_conn:
+                df_result = await s3_bucket_conn.read_csv_to_df(key_exp)
+                df_result_pyarrow = await s3_bucket_conn.read_csv_to_df(key_exp,
+                                                                        engine='pyarrow')
+            # Log test after method execution
+            self.assertIn(f'Reading file {self.s3_endpoint_url}/{self.s3_bucket_name}/{key_exp}',
+                          logm.output[0])
+        # Test after method execution
+        pd.testing.assert_frame_equal(df_exp, df_result, check_dtype=False)
+        pd.testing.assert_frame_equal(df_exp, df_result_pyarrow, check_dtype=False)
+
+    async def test_read_csv_to_df_parse_in_thread(self):
+        """
+        Tests that the read_csv_to_df method parses the csv file in a worker thread
+        """
+        # Expected results
+        df_exp = pd.DataFrame({'col1': ['valA', 'valC'], 'col2': [1.5, 2.5]})
+        # Test init
+        self.s3_bucket.put_object(Body=df_exp.to_csv(index=False), Key='test.csv')
+        # Method execution
+        with patch('xetra.common.s3_async.asyncio.to_thread',
+                   wraps=asyncio.to_thread) as to_thread:
+            async with self.s3_bucket_conn as s3_bucket_conn:
+                df_result = await s3_bucket_conn.read_csv_to_df('test.csv')
+        # Test after method execution
+        self.assertIs(S3BucketConnector.csv_bytes_to_df, to_thread.call_args.args[0])
+        pd.testing.assert_frame_equal(df_exp, df_result, check_dtype=False)
+
+    async def test_read_csv_to_df_local_cache_and_metrics(self):
+        """
+        Tests the read_csv_to_df method with a local cache and metrics:
+        a listed and cached file is not downloaded again
+        """
+        # Expected results
+        key_exp = 'prefix/test.csv'
+        df_exp = pd.DataFrame({'col1': ['valA', 'valC'], 'col2': [1.5, 2.5]})
+        size_exp = len(df_exp.to_csv(index=False).encode('utf-8'))
+        # Test init
+        metrics = PipelineMetrics()
+        with tempfile.TemporaryDirectory() as cache_dir:
+            s3_bucket_conn = AsyncS3BucketConnector(self.s3_access_key, self.s3_secret_key,
+                                                    self.s3_endpoint_url, self.s3_bucket_name,
+                                                    cache=LocalObjectCache(cache_dir),
+                                                    metrics=metrics)
+            # Method execution
+            async with s3_bucket_conn:
+                await s3_bucket_conn.write_df_to_s3(df_exp, key_exp, 'csv')
+                await s3_bucket_conn.list_files_in_prefix('prefix/')
+                df_first = await s3_bucket_conn.read_csv_to_df(key_exp)
+                with self.assertLogs() as logm:
+                    df_cached = await s3_bucket_conn.read_csv_to_df(key_exp)
+                    self.assertIn('from the local cache', logm.output[0])
+        # Test after method execution
+        pd.testing.assert_frame_equal(df_first, df_cached)
+        self.assertEqual({'objects_written': 1, 'bytes_uploaded': size_exp, 'objects_listed': 1,
+                          'objects_read': 1, 'bytes_downloaded': size_exp, 'cache_hits': 1},
+                         metrics.summary()['counters'])
+
+    async def test_read_csv_to_df_local_cache_missing_key(self):
+        """
+        Tests the read_csv_to_df method with a local cache
+        raising NoSuchKey like without cache for a missing key
+        """
+        # Test init
+        with tempfile.TemporaryDirectory() as cache_dir:
+            s3_bucket_conn = AsyncS3BucketConnector(self.s3_access_key, self.s3_secret_key,
+                                                    self.s3_endpoint_url, self.s3_bucket_name,
+                                                    cache=LocalObjectCache(cache_dir))
+            # Method execution
+            async with s3_bucket_conn:
+                with self.assertRaises(s3_bucket_conn._client.exceptions.NoSuchKey):
+                    await s3_bucket_conn.read_csv_to_df('missing.csv')
+
+    async def test_read_csv_to_df_wrong_engine(self):
+        """
+        Tests the read_csv_to_df method
+        if a not supported parser engine is given as argument
+        """
+        # Method execution
+        async with self.s3_bucket_conn as s3_bucket_conn:
+            with self.assertRaises(WrongFormatException):
+                await s3_bucket_conn.read_csv_to_df('test.csv', engine='python')
+
+    async def test_write_df_to_s3_csv_and_parquet(self):
+        """
+        Tests the write_df_to_s3 method
+        if writing csv and parquet is successful
+        """
+        # Expected results
+        df_exp = pd.DataFrame([['A', 'B'], ['C', 'D']], columns=['col1', 'col2'])
+        # Method execution
+        async with self.s3_bucket_conn as s3_bucket_conn:
+            result_csv = await s3_bucket_conn.write_df_to_s3(df_exp, 'test.csv', 'csv')
+            result_parquet = await s3_bucket_conn.write_df_to_s3(df_exp, 'test.parquet',
+                                                                 'parquet')
+        # Test after method execution
+        data_csv = self.s3_bucket.Object(key='test.csv').get().get('Body').read()
+        data_parquet = self.s3_bucket.Object(key='test.parquet').get().get('Body').read()
+        self.assertTrue(result_csv)
+        self.assertTrue(result_parquet)
+        pd.testing.assert_frame_equal(df_exp, pd.read_csv(BytesIO(data_csv)), check_dtype=False)
+        pd.testing.assert_frame_equal(df_exp, pd.read_parquet(BytesIO(data_parquet)))
+
+    async def test_write_read_csv_compressed(self):
+        """
+        Tests that csv files are compressed by key suffix or compression argument
+        and decompressed when read, the Content-Encoding is only set without suffix
+        """
+        # Expected results
+        df_exp = pd.DataFrame({'col1': ['valA', 'valC'], 'col2': [1.5, 2.5]})
+        # Method execution
+        async with self.s3_bucket_conn as s3_bucket_conn:
+            await s3_bucket_conn.write_df_to_s3(df_exp, 'test.csv.zst', 'csv')
+            await s3_bucket_conn.write_df_to_s3(df_exp, 'test_zstd.csv', 'csv', compression='zstd')
+            df_result = await s3_bucket_conn.read_csv_to_df('test.csv.zst')
+            df_result_no_suffix = await s3_bucket_conn.read_csv_to_df('test_zstd.csv')
+        # Test after method execution
+        self.assertIsNone(self.s3_bucket.Object(key='test.csv.zst').content_encoding)
+        self.assertEqual('zstd', self.s3_bucket.Object(key='test_zstd.csv').content_encoding)
+        self.assertTrue(df_exp.equals(df_result))
+        self.assertTrue(df_exp.equals(df_result_no_suffix))
+
+    async def test_read_csv_to_df_compressed_chunks(self):
+        """
+        Tests that the read_csv_to_df method decompresses the body chunk by chunk
+        across several gzip members and zstd frames
+        """
+        # Expected results
+        df_exp = pd.DataFrame({'col1': [f'val{i}' for i in range(200)],
+                               'col2': [i / 4 for i in range(200)]})
+        csv_head = df_exp.iloc[:100].to_csv(index=False).encode('utf-8')
+        csv_tail = df_exp.iloc[100:].to_csv(index=False, header=False).encode('utf-8')
+        # Test init
+        self.s3_bucket.put_object(Body=gzip.compress(csv_head) + gzip.compress(csv_tail),
+                                  Key='test.csv.gz')
+        zstd_compressor = zstandard.ZstdCompressor()
+        self.s3_bucket.put_object(Body=zstd_compressor.compress(csv_head) +
+                                  zstd_compressor.compress(csv_tail), Key='test.csv.zst')
+        # Method execution
+        with patch('xetra.common.s3_async.READ_CHUNK_SIZE', 64), \
+                patch.object(StreamDecompressor, 'decompress', autospec=True,
+                             side_effect=StreamDecompressor.decompress) as decompress:
+            async with self.s3_bucket_conn as s3_bucket_conn:
+                df_gzip = await s3_bucket_conn.read_csv_to_df('test.csv.gz')
+                df_zstd = await s3_bucket_conn.read_csv_to_df('test.csv.zst')
+        # Test after method execution
+        self.assertTrue(all(len(call.args[1]) <= 64 for call in decompress.call_args_list))
+        self.assertGreater(decompress.call_count, 2)
+        pd.testing.assert_frame_equal(df_exp, df_gzip, check_dtype=False)
+        pd.testing.assert_frame_equal(df_exp, df_zstd, check_dtype=False)
+
+    async def test_write_df_to_s3_empty_and_wrong_format(self):
+        """
+        Tests the write_df_to_s3 method
+        with an empty DataFrame and with a not supported format
+        """
+        # Method execution
+        async with self.s3_bucket_conn as s3_bucket_conn:
+            result_empty = await s3_bucket_conn.write_df_to_s3(pd.DataFrame(), 'test.csv', 'csv')
+            with self.assertRaises(WrongFormatException):
+                await s3_bucket_conn.write_df_to_s3(
+                    pd.DataFrame({'col1': ['A']}), 'test.json', 'json')
+        # Test after method execution
+        self.assertIsNone(result_empty)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,71 @@
+"""TestTradingCalendar"""
+import unittest
+
+import pandas as pd
+
+from xetra.common.trading_calendar import TradingCalendar, XetraTradingCalendar,\
+    get_trading_calendar
+from xetra.common.custom_exceptions import WrongFormatException
+
+
+class TestTradingCalendar(unittest.TestCase):
+    """
+    Testing the trading calendars.
+    """
+
+    def test_trading_days_all_days(self):
+        """
+        Tests the trading_days method
+        of the calendar treating every day as trading day
+        """
+        # Expected results
+        days_exp = list(pd.date_range('2022-12-23', '2022-12-27'))
+        # Method execution
+        days_return = TradingCalendar().trading_days('2022-12-23', '2022-12-27')
+        # Test after method execution
+        self.assertEqual(days_exp, list(days_return))
+
+    def test_trading_days_xetra(self):
+        """
+        Tests the trading_days method
+        of the Xetra calendar skipping weekends and exchange holidays
+        """
+        # Expected results
+        days_exp = [pd.Timestamp(day) for day in ['2022-04-14', '2022-04-19',
+                                                   '2022-12-23', '2022-12-27',
+                                                   '2022-12-28', '2022-12-29',
+                                                   '2022-12-30', '2023-01-02']]
+        # Method execution
+        calendar = XetraTradingCalendar()
+        days_return = list(calendar.trading_days('2022-04-14', '2022-04-19')) + \
+            list(calendar.trading_days('2022-12-23', '2023-01-02'))
+        # Test after method execution
+        self.assertEqual(days_exp, days_return)
+
+    def test_previous_trading_day(self):
+        """
+        Tests the previous_trading_day method
+        """
+        # Method execution
+        prev_all_days = TradingCalendar().previous_trading_day('2022-12-27')
+        prev_xetra = XetraTradingCalendar().previous_trading_day('2022-12-27')
+        prev_xetra_year = XetraTradingCalendar().previous_trading_day('2023-01-02')
+        # Test after method execution
+        self.assertEqual(pd.Timestamp('2022-12-26'), prev_all_days)
+        self.assertEqual(pd.Timestamp('2022-12-23'), prev_xetra)
+        self.assertEqual(pd.Timestamp('2022-12-30'), prev_xetra_year)
+
+    def test_get_trading_calendar(self):
+        """
+        Tests the get_trading_calendar function
+        """
+        # Test after method execution
+        self.assertIs(type(get_trading_calendar()), TradingCalendar)
+        self.assertIs(type(get_trading_calendar('all_days')), TradingCalendar)
+        self.assertIsInstance(get_trading_calendar('xetra'), XetraTradingCalendar)
+        with self.assertRaises(WrongFormatException):
+            get_trading_calendar('nyse')
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,200 @@
+"""TestMultiReportETLMethods"""
+import os
+import unittest
+from unittest.mock import patch
+
+import boto3
+import pandas as pd
+from moto import mock_s3
+
+from xetra.common.s3 import S3BucketConnector
+from xetra.common.meta_process import MetaProcess
+from xetra.common.custom_exceptions import WrongFormatException
+from xetra.transformers.xetra_transformer import XetraSourceConfig, XetraTargetConfig
+from xetra.transformers.report_registry import MultiReportETL, ReportConfig, REPORTS,\
+    register_report, get_report
+
+
+def transform_volume(xetra_etl, data_frame):
+    """
+    Test report with the traded volume per date
+    """
+    return data_frame.groupby(xetra_etl.src_args.src_col_date, as_index=False, observed=True) \
+        .agg({'TradedVolume': 'sum', 'NumberOfTrades': 'sum'})
+
+
+class TestMultiReportETLMethods(unittest.TestCase):
+    """
+    Testing the MultiReportETL class
+    """
+
+    def setUp(self):
+        """
+        Setting up the environment
+        """
+        # mocking s3 connection start
+        self.mock_s3 = mock_s3()
+        self.mock_s3.start()
+        # Defining the class arguments
+        self.s3_access_key = 'AWS_ACCESS_KEY_ID'
+        self.s3_secret_key = 'AWS_SECRET_ACCESS_KEY'
+        self.s3_endpoint_url = 'https://s3.eu-central-1.amazonaws.com'
+        self.s3_bucket_name_src = 'src-bucket'
+        self.s3_bucket_name_trg = 'trg-bucket'
+        # Creating s3 access keys as environment variables
+        os.environ[self.s3_access_key] = 'KEY1'
+        os.environ[self.s3_secret_key] = 'KEY2'
+        # Creating the source and target bucket on the mocked s3
+        self.s3 = boto3.resource(service_name='s3', endpoint_url=self.s3_endpoint_url)
+        for bucket in (self.s3_bucket_name_src, self.s3_bucket_name_trg):
+            self.s3.create_bucket(Bucket=bucket,
+                                  CreateBucketConfiguration={
+                                      'LocationConstraint': 'eu-central-1'})
+        # Creating S3BucketConnector testing instances
+        self.s3_bucket_src = S3BucketConnector(self.s3_access_key,
+                                               self.s3_secret_key,
+                                               self.s3_endpoint_url,
+                                               self.s3_bucket_name_src)
+        self.s3_bucket_trg = S3BucketConnector(self.s3_access_key,
+                                               self.s3_secret_key,
+                                               self.s3_endpoint_url,
+                                               self.s3_bucket_name_trg)
+        # Creating source and target configuration
+        self.source_config = XetraSourceConfig(
+            src_first_extract_date='2021-04-01',
+            src_columns=['ISIN', 'Mnemonic', 'Date', 'Time', 'StartPrice', 'EndPrice',
+                         'MinPrice', 'MaxPrice', 'TradedVolume'],
+            src_col_date='Date',
+            src_col_isin='ISIN',
+            src_col_time='Time',
+            src_col_start_price='StartPrice',
+            src_col_min_price='MinPrice',
+            src_col_max_price='MaxPrice',
+            src_col_traded_vol='TradedVolume')
+        self.target_config = XetraTargetConfig(
+            trg_col_isin='isin',
+            trg_col_date='date',
+            trg_col_op_price='opening_price_eur',
+            trg_col_clos_price='closing_price_eur',
+            trg_col_min_price='minimum_price_eur',
+            trg_col_max_price='maximum_price_eur',
+            trg_col_dail_trad_vol='daily_traded_volume',
+            trg_col_ch_prev_clos='change_prev_closing_%',
+            trg_key='report1/xetra_daily_report1_',
+            trg_key_date_format='%Y%m%d_%H%M%S',
+            trg_format='parquet')
+        # Creating source files on mocked s3
+        columns_src = ['ISIN', 'Mnemonic', 'SecurityDesc', 'Date', 'Time', 'StartPrice',
+                       'EndPrice', 'MinPrice', 'MaxPrice', 'NumberOfTrades', 'TradedVolume']
+        data = [['AT0000A0E9W5', 'SANT', 'S+T AG', '2021-04-16', '15:00',
+                 18.27, 21.19, 18.27, 21.34, 3, 987],
+                ['AT0000A0E9W5', 'SANT', 'S+T AG', '2021-04-17', '13:00',
+                 20.21, 18.27, 18.21, 20.42, 2, 633],
+                ['AT0000A0E9W5', 'SANT', 'S+T AG', '2021-04-17', '14:00',
+                 18.27, 21.19, 18.27, 21.34, 1, 455],
+                ['AT0000A0E9W5', 'SANT', 'S+T AG', '2021-04-18', '07:00',
+                 20.58, 19.27, 18.89, 20.58, 5, 9066]]
+        self.df_src = pd.DataFrame(data, columns=columns_src)
+        for index, row in self.df_src.iterrows():
+            date, hour = row['Date'], row['Time'][:2]
+            self.s3_bucket_src.write_df_to_s3(self.df_src.loc[index:index],
+                                              f'{date}/{date}_BINS_XETR{hour}.csv', 'csv')
+        columns_report = ['ISIN', 'Date', 'opening_price_eur', 'closing_price_eur',
+                          'minimum_price_eur', 'maximum_price_eur', 'daily_traded_volume',
+                          'change_prev_closing_%']
+        data_report = [['AT0000A0E9W5', '2021-04-17', 20.21, 18.27, 18.21, 21.34, 1088, 10.62],
+                       ['AT0000A0E9W5', '2021-04-18', 20.58, 20.58, 18.89, 20.58, 9066, 1.83]]
+        self.df_report = pd.DataFrame(data_report, columns=columns_report)
+        # Registering the test report only for the test
+        self.reports_patch = patch.dict(REPORTS)
+        self.reports_patch.start()
+        register_report('volume', transform_volume,
+                        lambda src_args: [src_args.src_col_date, 'NumberOfTrades',
+                                          src_args.src_col_traded_vol])
+
+    def tearDown(self):
+        # Removing the test report and mocking s3 connection stop
+        self.reports_patch.stop()
+        self.mock_s3.stop()
+
+    def test_etl_reports(self):
+        """
+        Tests that etl_reports reads every source file once with the union
+        of the columns and dates and writes every report with its own meta file
+        """
+        # Expected results
+        columns_exp = ['ISIN', 'Mnemonic', 'Date', 'Time', 'StartPrice', 'EndPrice',
+                       'MinPrice', 'MaxPrice', 'TradedVolume', 'NumberOfTrades']
+        df_volume_exp = pd.DataFrame({'Date': ['2021-04-18'], 'TradedVolume': [9066],
+                                      'NumberOfTrades': [5]})
+        # Test init
+        reports = [
+            ReportConfig('report1', 'meta/report1.csv', self.target_config),
+            ReportConfig('volume', 'meta/volume.csv',
+                         self.target_config._replace(trg_key='volume/xetra_volume_'))]
+        date_lists = [['2021-04-17', ['2021-04-16', '2021-04-17', '2021-04-18']],
+                      ['2021-04-18', ['2021-04-18']]]
+        # Method execution
+        with patch.object(MetaProcess, "return_date_list", side_effect=date_lists):
+            multi_etl = MultiReportETL(self.s3_bucket_src, self.s3_bucket_trg,
+                                       self.source_config, reports)
+        with patch.object(self.s3_bucket_src, 'read_csv_to_df',
+                          wraps=self.s3_bucket_src.read_csv_to_df) as read_csv:
+            multi_etl.etl_reports()
+        df_extract = multi_etl.extract()
+        # Test after method execution
+        self.assertEqual(columns_exp, multi_etl.src_args.src_columns)
+        self.assertCountEqual(columns_exp, df_extract.columns)
+        self.assertNotIn('SecurityDesc', df_extract.columns)
+        self.assertEqual(['Date', 'NumberOfTrades', 'TradedVolume'],
+                         multi_etl.report_etls[1].src_args.src_columns)
+        self.assertEqual(len(self.df_src), read_csv.call_count)
+        trg_file = self.s3_bucket_trg.list_files_in_prefix('report1/')[0]
+        df_report1 = self.s3_bucket_trg.read_parquet_to_df(trg_file)
+        self.assertTrue(self.df_report.equals(df_report1))
+        trg_file = self.s3_bucket_trg.list_files_in_prefix('volume/')[0]
+        df_volume = self.s3_bucket_trg.read_parquet_to_df(trg_file)
+        pd.testing.assert_frame_equal(df_volume_exp, df_volume, check_dtype=False)
+        for meta_key, dates_exp in [('meta/report1.csv', ['2021-04-17', '2021-04-18']),
+                                    ('meta/volume.csv', ['2021-04-18'])]:
+            df_meta = self.s3_bucket_trg.read_csv_to_df(meta_key)
+            self.assertEqual(dates_exp, list(df_meta['source_date']))
+
+    def test_unsupported_modes(self):
+        """
+        Tests that MultiReportETL rejects the modes reducing the source per report
+        """
+        # Test init
+        reports = [ReportConfig('report1', 'meta/report1.csv', self.target_config)]
+        reports_cached = [ReportConfig('report1', 'meta/report1.csv', self.target_config._replace(
+            trg_agg_cache_key='cache/report1/'))]
+        for source_config, report_configs in [
+                (self.source_config._replace(src_streaming=True), reports),
+                (self.source_config._replace(src_pipelined=True), reports),
+                (self.source_config, reports_cached)]:
+            # Method execution
+            with self.assertLogs() as logm:
+                with self.assertRaises(WrongFormatException):
+                    MultiReportETL(self.s3_bucket_src, self.s3_bucket_trg,
+                                   source_config, report_configs)
+                # Log test after method execution
+                self.assertIn('not supported for several reports', logm.output[0])
+
+    def test_get_report_not_registered(self):
+        """
+        Tests get_report and MultiReportETL with a report that is not registered
+        """
+        # Expected results
+        log_exp = 'The report vwap is not registered!'
+        # Method execution
+        self.assertEqual(REPORTS['report1'], get_report('report1'))
+        with self.assertLogs() as logm:
+            with self.assertRaises(WrongFormatException):
+                MultiReportETL(self.s3_bucket_src, self.s3_bucket_trg, self.source_config,
+                               [ReportConfig('vwap', 'meta/vwap.csv', self.target_config)])
+            # Log test after method execution
+            self.assertIn(log_exp, logm.output[0])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -1,15 +1,26 @@
 """TestXetraETLMethods"""
 import os
+import socket
+import tempfile
 import unittest
 from unittest.mock import patch
 from io import BytesIO
+from datetime import datetime
 
 import boto3
+import numpy as np
 import pandas as pd
+from pyarrow import parquet as pq
+from botocore.exceptions import EndpointConnectionError
 from moto import mock_s3
+from moto.server import ThreadedMotoServer
 
 from xetra.common.s3 import S3BucketConnector
+from xetra.common.s3_async import AsyncS3BucketConnector
+from xetra.common.local_cache import LocalObjectCache
 from xetra.common.meta_process import MetaProcess
+from xetra.common.metrics import PipelineMetrics
+from xetra.common.custom_exceptions import WrongFormatException
 from xetra.transformers.xetra_transformer import XetraETL, XetraSourceConfig, XetraTargetConfig
 
 class TestXetraETLMethods(unittest.TestCase):
@@ -159,6 +170,232 @@ class TestXetraETLMethods(unittest.TestCase):
         # Test after method execution
         self.assertTrue(df_exp.equals(df_result))
 
+    def test_extract_files_concurrent(self):
+        """
+        Tests the extract method when the source files
+        are read concurrently by a thread pool
+        """
+        # Expected results
+        df_exp = self.df_src.loc[1:8].reset_index(drop=True)
+        # Test init
+        extract_date = '2021-04-17'
+        extract_date_list = ['2021-04-16', '2021-04-17', '2021-04-18', '2021-04-19', '2021-04-20']
+        source_config = self.source_config._replace(src_max_workers=4)
+        # Method execution
+        with patch.object(MetaProcess, "return_date_list",
+        return_value=[extract_date, extract_date_list]):
+            xetra_etl = XetraETL(self.s3_bucket_src, self.s3_bucket_trg,
+                         self.meta_key, source_config, self.target_config)
+            df_result = xetra_etl.extract()
+        # Test after method execution
+        self.assertTrue(df_exp.equals(df_result))
+
+    def test_extract_files_compact_dtypes(self):
+        """
+        Tests the extract method when the source files
+        are parsed with compact data types
+        """
+        # Expected results
+        df_exp = self.df_src.loc[1:8].reset_index(drop=True)
+        # Test init
+        extract_date = '2021-04-17'
+        extract_date_list = ['2021-04-16', '2021-04-17', '2021-04-18', '2021-04-19', '2021-04-20']
+        source_config = self.source_config._replace(
+            src_compact_dtypes=True, src_col_dtypes={'Mnemonic': 'category', 'EndPrice': 'float32'})
+        # Method execution
+        with patch.object(MetaProcess, "return_date_list",
+        return_value=[extract_date, extract_date_list]):
+            xetra_etl = XetraETL(self.s3_bucket_src, self.s3_bucket_trg,
+                         self.meta_key, source_config, self.target_config)
+            df_result = xetra_etl.extract()
+        # Test after method execution
+        self.assertEqual(df_result['ISIN'].dtype, 'category')
+        self.assertEqual(df_result['Date'].dtype, 'category')
+        self.assertEqual(df_result['Mnemonic'].dtype, 'category')
+        self.assertEqual(list(df_result['Date'].cat.categories),
+                         ['2021-04-16', '2021-04-17', '2021-04-18', '2021-04-19'])
+        self.assertEqual(df_result['StartPrice'].dtype, 'float32')
+        pd.testing.assert_frame_equal(df_exp, df_result, check_dtype=False,
+                                      check_categorical=False, atol=1e-5)
+
+    def test_etl_report1_compact_dtypes(self):
+        """
+        Tests that transform_report1 gives the same report
+        for source data parsed with compact data types
+        """
+        # Expected results
+        df_exp = self.df_report
+        # Test init
+        extract_date = '2021-04-17'
+        extract_date_list = ['2021-04-16', '2021-04-17', '2021-04-18', '2021-04-19']
+        source_config = self.source_config._replace(src_compact_dtypes=True)
+        # Method execution
+        with patch.object(MetaProcess, "return_date_list",
+        return_value=[extract_date, extract_date_list]):
+            xetra_etl = XetraETL(self.s3_bucket_src, self.s3_bucket_trg,
+                         self.meta_key, source_config, self.target_config)
+            df_result = xetra_etl.transform_report1(xetra_etl.extract())
+            xetra_etl.trg_args = self.target_config._replace(trg_transform_engine='single_pass')
+            df_result_single_pass = xetra_etl.transform_report1(xetra_etl.extract())
+            xetra_etl.src_args = source_config._replace(src_streaming=True)
+            df_result_streaming = xetra_etl.extract_transform_report1()
+        # Test after method execution
+        self.assertTrue(df_exp.equals(df_result))
+        self.assertTrue(df_exp.equals(df_result_single_pass))
+        self.assertTrue(df_exp.equals(df_result_streaming))
+
+    def test_extract_mirror(self):
+        """
+        Tests that extract mirrors the csv files of missing dates to parquet
+        and reads the mirror instead of the csv files afterwards
+        """
+        # Expected results
+        df_exp = self.df_report
+        mirror_keys_exp = [f'mirror/{date}.parquet'
+                           for date in ['2021-04-16', '2021-04-17', '2021-04-18', '2021-04-19']]
+        # Test init
+        extract_date = '2021-04-17'
+        extract_date_list = ['2021-04-16', '2021-04-17', '2021-04-18', '2021-04-19']
+        source_config = self.source_config._replace(src_mirror_key='mirror/',
+                                                    src_read_mirror=True)
+        # Method execution
+        with patch.object(MetaProcess, "return_date_list",
+        return_value=[extract_date, extract_date_list]):
+            xetra_etl = XetraETL(self.s3_bucket_src, self.s3_bucket_trg,
+                         self.meta_key, source_config, self.target_config)
+            df_first = xetra_etl.extract()
+            with patch.object(self.s3_bucket_src, 'read_csv_to_df') as read_csv:
+                df_mirror = xetra_etl.extract()
+        # Test after method execution
+        self.assertEqual(mirror_keys_exp, self.s3_bucket_trg.list_files_in_prefix('mirror/'))
+        read_csv.assert_not_called()
+        self.assertEqual(source_config.src_columns, list(df_mirror.columns))
+        self.assertIsInstance(df_mirror['ISIN'].dtype, pd.CategoricalDtype)
+        pd.testing.assert_frame_equal(df_first, df_mirror)
+        self.assertTrue(df_exp.equals(xetra_etl.transform_report1(df_mirror)))
+
+    def test_mirror_source(self):
+        """
+        Tests that the mirror stage converts every completed date only once
+        """
+        # Expected results
+        dates_exp = ['2021-04-16', '2021-04-17']
+        # Test init
+        extract_date = '2021-04-17'
+        extract_date_list = ['2021-04-16', '2021-04-17', '2021-04-20']
+        source_config = self.source_config._replace(src_mirror_key='mirror/')
+        # Method execution
+        with patch.object(MetaProcess, "return_date_list",
+        return_value=[extract_date, extract_date_list]):
+            xetra_etl = XetraETL(self.s3_bucket_src, self.s3_bucket_trg,
+                         self.meta_key, source_config, self.target_config)
+            dates_first = xetra_etl.mirror_source()
+            dates_second = xetra_etl.mirror_source()
+        # Test after method execution
+        self.assertEqual(dates_exp, dates_first)
+        self.assertEqual([], dates_second)
+        df_mirror = self.s3_bucket_trg.read_parquet_to_df(xetra_etl.mirror_key('2021-04-17'))
+        self.assertEqual(['13:00', '14:00'], list(df_mirror['Time']))
+
+    def test_etl_report1_pyarrow_engine(self):
+        """
+        Tests that the report is the same when the source
+        files are parsed with the pyarrow csv engine
+        """
+        # Expected results
+        df_exp = self.df_report
+        # Test init
+        extract_date = '2021-04-17'
+        extract_date_list = ['2021-04-16', '2021-04-17', '2021-04-18', '2021-04-19']
+        # Method execution
+        with patch.object(MetaProcess, "return_date_list",
+        return_value=[extract_date, extract_date_list]):
+            xetra_etl = XetraETL(self.s3_bucket_src, self.s3_bucket_trg,
+                         self.meta_key, self.source_config._replace(src_csv_engine='pyarrow'),
+                         self.target_config)
+            df_result = xetra_etl.transform_report1(xetra_etl.extract())
+            xetra_etl.src_args = self.source_config._replace(
+                src_csv_engine='pyarrow', src_compact_dtypes=True)
+            df_result_compact = xetra_etl.transform_report1(xetra_etl.extract())
+        # Test after method execution
+        self.assertTrue(df_exp.equals(df_result))
+        self.assertTrue(df_exp.equals(df_result_compact))
+
+    def test_list_files_concurrent(self):
+        """
+        Tests that listing the prefixes of all dates concurrently
+        returns the files grouped by date in the order of the dates
+        """
+        # Expected results
+        files_exp = ['2021-04-18/2021-04-18_BINS_XETR07.csv',
+                     '2021-04-18/2021-04-18_BINS_XETR08.csv',
+                     '2021-04-16/2021-04-16_BINS_XETR15.csv',
+                     '2021-04-17/2021-04-17_BINS_XETR13.csv',
+                     '2021-04-17/2021-04-17_BINS_XETR14.csv']
+        # Test init
+        extract_date = '2021-04-17'
+        extract_date_list = ['2021-04-18', '2021-04-20', '2021-04-16', '2021-04-17']
+        source_config = self.source_config._replace(src_max_workers=4)
+        # Method execution
+        with patch.object(MetaProcess, "return_date_list",
+        return_value=[extract_date, extract_date_list]):
+            xetra_etl = XetraETL(self.s3_bucket_src, self.s3_bucket_trg,
+                         self.meta_key, source_config, self.target_config)
+            files_result = xetra_etl._list_files(extract_date_list)
+        # Test after method execution
+        self.assertEqual(files_exp, files_result)
+
+    def test_extract_files_retry(self):
+        """
+        Tests the extract method when reading
+        a source file fails once with a transient error
+        """
+        # Expected results
+        df_exp = self.df_src.loc[2:3].reset_index(drop=True)
+        # Test init
+        extract_date = '2021-04-17'
+        extract_date_list = ['2021-04-17']
+        source_config = self.source_config._replace(src_read_retries=1)
+        read_csv_to_df = self.s3_bucket_src.read_csv_to_df
+        side_effect = [EndpointConnectionError(endpoint_url=self.s3_endpoint_url),
+                       read_csv_to_df('2021-04-17/2021-04-17_BINS_XETR13.csv'),
+                       read_csv_to_df('2021-04-17/2021-04-17_BINS_XETR14.csv')]
+        # Method execution
+        with patch.object(MetaProcess, "return_date_list",
+        return_value=[extract_date, extract_date_list]), \
+                patch('xetra.transformers.xetra_transformer.READ_RETRY_BACKOFF', 0), \
+                patch.object(self.s3_bucket_src, 'read_csv_to_df', side_effect=side_effect):
+            xetra_etl = XetraETL(self.s3_bucket_src, self.s3_bucket_trg,
+                         self.meta_key, source_config, self.target_config)
+            df_result = xetra_etl.extract()
+        # Test after method execution
+        self.assertTrue(df_exp.equals(df_result))
+
+    def test_extract_files_missing_cached(self):
+        """
+        Tests that the extract method does not retry
+        a missing source file with the local cache enabled
+        """
+        # Test init
+        extract_date = '2021-04-17'
+        extract_date_list = ['2021-04-17']
+        source_config = self.source_config._replace(src_read_retries=3)
+        # Method execution
+        with tempfile.TemporaryDirectory() as cache_dir:
+            s3_bucket_src = S3BucketConnector(self.s3_access_key, self.s3_secret_key,
+                                              self.s3_endpoint_url, self.s3_bucket_name_src,
+                                              cache=LocalObjectCache(cache_dir))
+            with patch.object(MetaProcess, "return_date_list",
+            return_value=[extract_date, extract_date_list]), \
+                    patch.object(XetraETL, '_list_files', return_value=['missing.csv']), \
+                    patch('xetra.transformers.xetra_transformer.time.sleep') as sleep_mock:
+                xetra_etl = XetraETL(s3_bucket_src, self.s3_bucket_trg,
+                             self.meta_key, source_config, self.target_config)
+                with self.assertRaises(s3_bucket_src.exceptions.NoSuchKey):
+                    xetra_etl.extract()
+        # Test after method execution
+        sleep_mock.assert_not_called()
+
     def test_transform_report1_emptydf(self):
         """
         Tests the transform_report1 method with
@@ -208,6 +445,286 @@ class TestXetraETLMethods(unittest.TestCase):
         # Test after method execution
         self.assertTrue(df_exp.equals(df_result))
 
+    def test_transform_report1_single_pass(self):
+        """
+        Tests the transform_report1 method with the
+        single pass aggregation engine
+        """
+        # Expected results
+        df_exp = self.df_report
+        # Test init
+        extract_date = '2021-04-17'
+        extract_date_list = ['2021-04-16', '2021-04-17', '2021-04-18', '2021-04-19']
+        df_input = self.df_src.loc[1:8].reset_index(drop=True)
+        target_config = self.target_config._replace(trg_transform_engine='single_pass')
+        # Method execution
+        with patch.object(MetaProcess, "return_date_list",
+        return_value=[extract_date, extract_date_list]):
+            xetra_etl = XetraETL(self.s3_bucket_src, self.s3_bucket_trg,
+                         self.meta_key, self.source_config, target_config)
+            df_result = xetra_etl.transform_report1(df_input)
+        # Test after method execution
+        self.assertTrue(df_exp.equals(df_result))
+
+    def test_transform_report1_engine_parity(self):
+        """
+        Tests that the single pass and the legacy aggregation
+        engine give the same report on random source data
+        """
+        # Test init
+        extract_date = '2021-04-17'
+        extract_date_list = ['2021-04-16', '2021-04-17', '2021-04-18', '2021-04-19']
+        rng = np.random.default_rng(42)
+        rows = 5000
+        df_input = pd.DataFrame({
+            'ISIN': rng.choice([f'DE000{i:07d}' for i in range(50)], rows),
+            'Mnemonic': 'MNE',
+            'Date': rng.choice(extract_date_list, rows),
+            'Time': [f'{minute // 60:02d}:{minute % 60:02d}' for minute in rng.permutation(rows)],
+            'StartPrice': rng.uniform(1, 100, rows).round(2),
+            'EndPrice': rng.uniform(1, 100, rows).round(2),
+            'MinPrice': rng.uniform(1, 100, rows).round(2),
+            'MaxPrice': rng.uniform(1, 100, rows).round(2),
+            'TradedVolume': rng.integers(0, 10000, rows)})
+        df_input.loc[rng.choice(rows, 20), 'StartPrice'] = np.nan
+        # Method execution
+        with patch.object(MetaProcess, "return_date_list",
+        return_value=[extract_date, extract_date_list]):
+            xetra_etl = XetraETL(self.s3_bucket_src, self.s3_bucket_trg,
+                         self.meta_key, self.source_config, self.target_config)
+            df_exp = xetra_etl.transform_report1(df_input.copy())
+            xetra_etl.trg_args = self.target_config._replace(trg_transform_engine='single_pass')
+            df_result = xetra_etl.transform_report1(df_input.copy())
+        # Test after method execution
+        pd.testing.assert_frame_equal(df_exp, df_result)
+
+    def test_transform_report1_sharded(self):
+        """
+        Tests that the single pass aggregation sharded by ISIN to a process pool
+        gives the same report as the in-process aggregation
+        """
+        # Test init
+        extract_date = '2021-04-17'
+        extract_date_list = ['2021-04-16', '2021-04-17', '2021-04-18']
+        rng = np.random.default_rng(7)
+        rows = 3000
+        df_input = pd.DataFrame({
+            'ISIN': pd.Categorical(rng.choice([f'DE000{i:07d}' for i in range(40)], rows)),
+            'Mnemonic': 'MNE',
+            'Date': rng.choice(extract_date_list, rows),
+            'Time': [f'{minute // 60:02d}:{minute % 60:02d}' for minute in rng.permutation(rows)],
+            'StartPrice': rng.uniform(1, 100, rows).round(2).astype('float32'),
+            'EndPrice': rng.uniform(1, 100, rows).round(2),
+            'MinPrice': rng.uniform(1, 100, rows).round(2),
+            'MaxPrice': rng.uniform(1, 100, rows).round(2),
+            'TradedVolume': rng.integers(0, 10000, rows)})
+        target_config = self.target_config._replace(trg_transform_engine='single_pass')
+        # Method execution
+        with patch.object(MetaProcess, "return_date_list",
+        return_value=[extract_date, extract_date_list]):
+            xetra_etl = XetraETL(self.s3_bucket_src, self.s3_bucket_trg,
+                         self.meta_key, self.source_config, target_config)
+            df_exp = xetra_etl.transform_report1(df_input.copy())
+            xetra_etl.trg_args = target_config._replace(trg_transform_workers=3)
+            df_result = xetra_etl.transform_report1(df_input.copy())
+        # Test after method execution
+        pd.testing.assert_frame_equal(df_exp, df_result)
+
+    def test_transform_report1_wrong_engine(self):
+        """
+        Tests the transform_report1 method if a not
+        supported aggregation engine is configured
+        """
+        # Test init
+        extract_date = '2021-04-17'
+        extract_date_list = ['2021-04-16', '2021-04-17', '2021-04-18', '2021-04-19']
+        df_input = self.df_src.loc[1:8].reset_index(drop=True)
+        target_config = self.target_config._replace(trg_transform_engine='wrong_engine')
+        # Method execution
+        with patch.object(MetaProcess, "return_date_list",
+        return_value=[extract_date, extract_date_list]):
+            xetra_etl = XetraETL(self.s3_bucket_src, self.s3_bucket_trg,
+                         self.meta_key, self.source_config, target_config)
+            with self.assertRaises(WrongFormatException):
+                xetra_etl.transform_report1(df_input)
+
+    def test_transform_report1_legacy_workers(self):
+        """
+        Tests the transform_report1 method if the legacy
+        aggregation engine is configured with several workers
+        """
+        # Test init
+        extract_date = '2021-04-17'
+        extract_date_list = ['2021-04-16', '2021-04-17', '2021-04-18', '2021-04-19']
+        df_input = self.df_src.loc[1:8].reset_index(drop=True)
+        target_config = self.target_config._replace(trg_transform_engine='legacy',
+                                                    trg_transform_workers=2)
+        # Method execution
+        with patch.object(MetaProcess, "return_date_list",
+        return_value=[extract_date, extract_date_list]):
+            xetra_etl = XetraETL(self.s3_bucket_src, self.s3_bucket_trg,
+                         self.meta_key, self.source_config, target_config)
+            with self.assertRaises(WrongFormatException):
+                xetra_etl.transform_report1(df_input)
+
+    def test_extract_transform_report1_streaming(self):
+        """
+        Tests the extract_transform_report1 method reducing
+        the source files date by date
+        """
+        # Expected results
+        df_exp = self.df_report
+        # Test init
+        extract_date = '2021-04-17'
+        extract_date_list = ['2021-04-16', '2021-04-17', '2021-04-18', '2021-04-19', '2021-04-20']
+        source_config = self.source_config._replace(src_streaming=True, src_max_workers=2)
+        # Method execution
+        with patch.object(MetaProcess, "return_date_list",
+        return_value=[extract_date, extract_date_list]):
+            xetra_etl = XetraETL(self.s3_bucket_src, self.s3_bucket_trg,
+                         self.meta_key, source_config, self.target_config)
+            df_result = xetra_etl.extract_transform_report1()
+        # Test after method execution
+        self.assertTrue(df_exp.equals(df_result))
+
+    def test_extract_transform_report1_streaming_no_files(self):
+        """
+        Tests the extract_transform_report1 method when
+        there are no files to be extracted
+        """
+        # Test init
+        extract_date = '2200-01-02'
+        extract_date_list = ['2200-01-01', '2200-01-02']
+        # Method execution
+        with patch.object(MetaProcess, "return_date_list",
+        return_value=[extract_date, extract_date_list]):
+            xetra_etl = XetraETL(self.s3_bucket_src, self.s3_bucket_trg,
+                         self.meta_key, self.source_config, self.target_config)
+            df_result = xetra_etl.extract_transform_report1()
+        # Test after method execution
+        self.assertTrue(df_result.empty)
+
+    def test_extract_transform_report1_cached(self):
+        """
+        Tests the extract_transform_report1_cached method: the first run caches
+        the daily aggregates of completed days, a rerun reads only the source
+        files of days without cached aggregates
+        """
+        # Expected results
+        df_exp = self.df_report
+        # Test init
+        extract_date = '2021-04-17'
+        extract_date_list = ['2021-04-16', '2021-04-17', '2021-04-18', '2021-04-19', '2021-04-20']
+        target_config = self.target_config._replace(trg_agg_cache_key='cache/report1/')
+        # Method execution
+        with patch.object(MetaProcess, "return_date_list",
+        return_value=[extract_date, extract_date_list]):
+            xetra_etl = XetraETL(self.s3_bucket_src, self.s3_bucket_trg,
+                         self.meta_key, self.source_config, target_config)
+            df_first = xetra_etl.extract_transform_report1_cached()
+            cached_keys = self.s3_bucket_trg.list_files_in_prefix('cache/report1/')
+            # Removing the source files of the cached days
+            self.src_bucket.objects.all().delete()
+            df_rerun = xetra_etl.extract_transform_report1_cached()
+        # Test after method execution
+        self.assertTrue(df_exp.equals(df_first))
+        self.assertTrue(df_exp.equals(df_rerun))
+        self.assertEqual([xetra_etl.agg_cache_key(date) for date in extract_date_list[:4]],
+                         sorted(cached_keys))
+
+    def test_extract_transform_report1_cached_configured(self):
+        """
+        Tests that the extract_transform_report1_cached method extracts the
+        days without cached aggregates with the configured extract and aggregates
+        them with the configured transform engine and workers
+        """
+        # Expected results
+        df_exp = self.df_report
+        mirror_keys_exp = [f'mirror/{date}.parquet'
+                           for date in ['2021-04-16', '2021-04-17', '2021-04-18', '2021-04-19']]
+        # Test init
+        extract_date = '2021-04-17'
+        extract_date_list = ['2021-04-16', '2021-04-17', '2021-04-18', '2021-04-19']
+        source_config = self.source_config._replace(src_mirror_key='mirror/',
+                                                    src_read_mirror=True)
+        target_config = self.target_config._replace(trg_agg_cache_key='cache/report1/',
+                                                    trg_transform_engine='single_pass',
+                                                    trg_transform_workers=2)
+        # Method execution
+        with patch.object(MetaProcess, "return_date_list",
+        return_value=[extract_date, extract_date_list]):
+            xetra_etl = XetraETL(self.s3_bucket_src, self.s3_bucket_trg,
+                         self.meta_key, source_config, target_config)
+            with patch.object(XetraETL, '_aggregate_report1_sharded', autospec=True,
+                              side_effect=XetraETL._aggregate_report1_sharded) as sharded:
+                df_result = xetra_etl.extract_transform_report1_cached()
+        # Test after method execution
+        self.assertTrue(df_exp.equals(df_result))
+        self.assertEqual(len(extract_date_list), sharded.call_count)
+        self.assertEqual(mirror_keys_exp, self.s3_bucket_trg.list_files_in_prefix('mirror/'))
+
+    def test_extract_transform_report1_cached_today(self):
+        """
+        Tests that the extract_transform_report1_cached method
+        does not cache the aggregates of today
+        """
+        # Test init
+        today = datetime.today().strftime('%Y-%m-%d')
+        extract_date_list = ['2021-04-19', today]
+        df_today = self.df_src.loc[8:8].assign(Date=today)
+        self.s3_bucket_src.write_df_to_s3(df_today, f'{today}/{today}_BINS_XETR09.csv', 'csv')
+        target_config = self.target_config._replace(trg_agg_cache_key='cache/report1/')
+        # Method execution
+        with patch.object(MetaProcess, "return_date_list",
+        return_value=[today, extract_date_list]):
+            xetra_etl = XetraETL(self.s3_bucket_src, self.s3_bucket_trg,
+                         self.meta_key, self.source_config, target_config)
+            df_result = xetra_etl.extract_transform_report1_cached()
+            cached_keys = self.s3_bucket_trg.list_files_in_prefix('cache/report1/')
+        # Test after method execution
+        self.assertEqual([today], df_result['Date'].tolist())
+        self.assertEqual([xetra_etl.agg_cache_key('2021-04-19')], cached_keys)
+
+    def test_agg_cache_key_config_change(self):
+        """
+        Tests that a changed aggregation configuration uses other cached aggregates
+        """
+        # Test init
+        target_config = self.target_config._replace(trg_agg_cache_key='cache/report1/')
+        with patch.object(MetaProcess, "return_date_list",
+        return_value=['2021-04-17', ['2021-04-16', '2021-04-17']]):
+            xetra_etl = XetraETL(self.s3_bucket_src, self.s3_bucket_trg,
+                         self.meta_key, self.source_config, target_config)
+            # Method execution
+            key = xetra_etl.agg_cache_key('2021-04-17')
+            xetra_etl.src_args = self.source_config._replace(src_compact_dtypes=True)
+            key_changed = xetra_etl.agg_cache_key('2021-04-17')
+        # Test after method execution
+        self.assertTrue(key.startswith('cache/report1/'))
+        self.assertTrue(key.endswith('/2021-04-17.parquet'))
+        self.assertNotEqual(key, key_changed)
+
+    def test_merge_report1_aggregates(self):
+        """
+        Tests that merging partial aggregates of single files
+        gives the same result as aggregating all files at once
+        """
+        # Test init
+        extract_date = '2021-04-17'
+        extract_date_list = ['2021-04-16', '2021-04-17', '2021-04-18', '2021-04-19']
+        df_input = self.df_src.loc[1:8].sample(frac=1, random_state=1)
+        # Method execution
+        with patch.object(MetaProcess, "return_date_list",
+        return_value=[extract_date, extract_date_list]):
+            xetra_etl = XetraETL(self.s3_bucket_src, self.s3_bucket_trg,
+                         self.meta_key, self.source_config, self.target_config)
+            df_exp = xetra_etl._aggregate_report1(df_input)
+            df_result = xetra_etl._merge_report1_aggregates(pd.concat(
+                [xetra_etl._aggregate_report1(df_input.loc[[index]]) for index in df_input.index],
+                ignore_index=True))
+        # Test after method execution
+        self.assertTrue(df_exp.equals(df_result))
+
     def test_load(self):
         """
         Tests the load method
@@ -254,6 +771,426 @@ class TestXetraETLMethods(unittest.TestCase):
             }
         )
 
+    def test_load_meta_compact_threshold(self):
+        """
+        Tests that load compacts the delta files of the append-only
+        meta store with the configured meta_compact_threshold
+        """
+        # Expected results
+        meta_exp = ['2021-04-17', '2021-04-18', '2021-04-19']
+        # Test init
+        extract_date = '2021-04-17'
+        extract_date_list = ['2021-04-16', '2021-04-17', '2021-04-18', '2021-04-19']
+        # Method execution
+        with patch.object(MetaProcess, "return_date_list",
+        return_value=[extract_date, extract_date_list]):
+            xetra_etl = XetraETL(self.s3_bucket_src, self.s3_bucket_trg,
+                         self.meta_key, self.source_config, self.target_config,
+                         meta_append_only=True, meta_compact_threshold=1)
+            xetra_etl.load(self.df_report)
+        # Test after method execution
+        self.assertEqual([self.meta_key, MetaProcess.date_index_key(self.meta_key)],
+                         self.s3_bucket_trg.list_files_in_prefix(self.meta_key))
+        df_meta_result = self.s3_bucket_trg.read_csv_to_df(self.meta_key)
+        self.assertEqual(meta_exp, list(df_meta_result['source_date']))
+
+    def test_load_csv_compressed(self):
+        """
+        Tests the load method writing a gzip compressed csv target file
+        and a compressed meta file named with the suffix of its compression
+        """
+        # Expected results
+        df_exp = self.df_report
+        meta_exp = ['2021-04-17', '2021-04-18', '2021-04-19']
+        # Test init
+        extract_date = '2021-04-17'
+        extract_date_list = ['2021-04-16', '2021-04-17', '2021-04-18', '2021-04-19']
+        meta_key = 'meta_file.csv.zst'
+        target_config = self.target_config._replace(trg_format='csv', trg_compression='gzip')
+        # Method execution
+        with patch.object(MetaProcess, "return_date_list",
+        return_value=[extract_date, extract_date_list]):
+            xetra_etl = XetraETL(self.s3_bucket_src, self.s3_bucket_trg,
+                         meta_key, self.source_config, target_config)
+            xetra_etl.load(self.df_report)
+        # Test after method execution
+        trg_file = self.s3_bucket_trg.list_files_in_prefix(self.target_config.trg_key)[0]
+        self.assertTrue(trg_file.endswith('.csv.gz'))
+        data = self.trg_bucket.Object(key=trg_file).get().get('Body').read()
+        df_result = pd.read_csv(BytesIO(data), compression='gzip')
+        self.assertTrue(df_exp.equals(df_result))
+        df_meta_result = self.s3_bucket_trg.read_csv_to_df(meta_key)
+        self.assertEqual(list(df_meta_result['source_date']), meta_exp)
+
+    def test_etl_report1_no_data_sort_keys(self):
+        """
+        Tests that a run without new data and with sort keys and parquet writer
+        options writes no target file, also in pipelined mode
+        """
+        # Test init
+        target_config = self.target_config._replace(trg_sort_keys=['ISIN'],
+                                                    trg_parquet_compression='zstd')
+        for source_config in (self.source_config,
+                              self.source_config._replace(src_pipelined=True)):
+            # Method execution
+            with patch.object(MetaProcess, "return_date_list",
+            return_value=['2200-01-01', []]):
+                xetra_etl = XetraETL(self.s3_bucket_src, self.s3_bucket_trg,
+                             self.meta_key, source_config, target_config)
+                with self.assertLogs() as logm:
+                    self.assertTrue(xetra_etl.etl_report1())
+            # Test after method execution
+            self.assertIn('The dataframe is empty! No file will be written!', ''.join(logm.output))
+            self.assertEqual([], self.s3_bucket_trg.list_files_in_prefix(
+                self.target_config.trg_key))
+
+    def test_load_parquet_writer_options(self):
+        """
+        Tests the load method writing the parquet target file
+        with the configured writer options and sort order
+        """
+        # Expected results
+        df_exp = self.df_report
+        # Test init
+        extract_date = '2021-04-17'
+        extract_date_list = ['2021-04-16', '2021-04-17', '2021-04-18', '2021-04-19']
+        target_config = self.target_config._replace(
+            trg_parquet_compression='zstd', trg_parquet_compression_level=9,
+            trg_parquet_row_group_size=2, trg_parquet_dictionary=['ISIN'],
+            trg_parquet_statistics=['ISIN', 'Date'], trg_sort_keys=['ISIN', 'Date'])
+        # Method execution
+        with patch.object(MetaProcess, "return_date_list",
+        return_value=[extract_date, extract_date_list]):
+            xetra_etl = XetraETL(self.s3_bucket_src, self.s3_bucket_trg,
+                         self.meta_key, self.source_config, target_config)
+            xetra_etl.load(self.df_report)
+        # Test after method execution
+        trg_file = self.s3_bucket_trg.list_files_in_prefix(self.target_config.trg_key)[0]
+        data = self.trg_bucket.Object(key=trg_file).get().get('Body').read()
+        self.assertTrue(df_exp.equals(pd.read_parquet(BytesIO(data))))
+        metadata = pq.ParquetFile(BytesIO(data)).metadata
+        self.assertEqual(2, metadata.num_row_groups)
+        row_group = metadata.row_group(0)
+        self.assertEqual('ZSTD', row_group.column(0).compression)
+        self.assertIn('RLE_DICTIONARY', row_group.column(0).encodings)
+        self.assertNotIn('RLE_DICTIONARY', row_group.column(2).encodings)
+        self.assertTrue(row_group.column(1).is_stats_set)
+        self.assertFalse(row_group.column(2).is_stats_set)
+        self.assertEqual((0, 1), tuple(column.column_index
+                                       for column in row_group.sorting_columns))
+
+    def test_load_partitioned(self):
+        """
+        Tests the load method writing one
+        partition per date sorted by ISIN
+        """
+        # Expected results
+        keys_exp = ['report1/date=2021-04-17/part-00000.parquet',
+                    'report1/date=2021-04-18/part-00000.parquet',
+                    'report1/date=2021-04-19/part-00000.parquet']
+        df_report = pd.concat([self.df_report, self.df_report.assign(ISIN='AA0000000001')],
+                              ignore_index=True)
+        # Test init
+        extract_date = '2021-04-17'
+        extract_date_list = ['2021-04-16', '2021-04-17', '2021-04-18', '2021-04-19']
+        target_config = self.target_config._replace(trg_partition_key='report1/',
+                                                    trg_sort_keys=['ISIN'])
+        # Method execution
+        with patch.object(MetaProcess, "return_date_list",
+        return_value=[extract_date, extract_date_list]):
+            xetra_etl = XetraETL(self.s3_bucket_src, self.s3_bucket_trg,
+                         self.meta_key, self.source_config, target_config)
+            xetra_etl.load(df_report)
+        # Test after method execution
+        self.assertEqual(keys_exp, self.s3_bucket_trg.list_files_in_prefix('report1/'))
+        for key, (date, df_exp) in zip(keys_exp, df_report.groupby('Date')):
+            data = self.trg_bucket.Object(key=key).get().get('Body').read()
+            df_result = pd.read_parquet(BytesIO(data))
+            self.assertEqual(xetra_etl.partition_key(date), key)
+            self.assertEqual(['AA0000000001', 'AT0000A0E9W5'], list(df_result['ISIN']))
+            self.assertTrue(df_exp.sort_values(by='ISIN').reset_index(drop=True).equals(df_result))
+
+    def test_etl_report1_prev_clos_state(self):
+        """
+        Tests the etl_report1 method when the previous closing price
+        state replaces extracting the day before extract_date
+        """
+        # Expected results
+        df_exp = self.df_report
+        extract_date_list_exp = ['2021-04-17', '2021-04-18', '2021-04-19']
+        state_exp = [['AT0000A0E9W5', '2021-04-19', 23.58, 24.22]]
+        # Test init
+        extract_date = '2021-04-17'
+        extract_date_list = ['2021-04-16', '2021-04-17', '2021-04-18', '2021-04-19']
+        state_key = 'state/prev_clos.csv'
+        target_config = self.target_config._replace(trg_prev_clos_key=state_key)
+        df_state = pd.DataFrame([['AT0000A0E9W5', '2021-04-16', 18.27, 18.27],
+                                 ['DE0000000001', '2021-04-15', 10.0, 11.0]],
+                                columns=['ISIN', 'Date', 'opening_price_eur', 'closing_price_eur'])
+        self.s3_bucket_trg.write_df_to_s3(df_state, state_key, 'csv')
+        # Method execution
+        with patch.object(MetaProcess, "return_date_list",
+        return_value=[extract_date, extract_date_list]):
+            xetra_etl = XetraETL(self.s3_bucket_src, self.s3_bucket_trg,
+                         self.meta_key, self.source_config, target_config)
+            with patch.object(self.s3_bucket_src, 'list_files_in_prefix',
+                              wraps=self.s3_bucket_src.list_files_in_prefix) as list_files:
+                xetra_etl.etl_report1()
+        # Test after method execution
+        self.assertEqual(extract_date_list_exp, xetra_etl.extract_date_list)
+        self.assertNotIn('2021-04-16', [call.args[0] for call in list_files.call_args_list])
+        trg_file = self.s3_bucket_trg.list_files_in_prefix(self.target_config.trg_key)[0]
+        data = self.trg_bucket.Object(key=trg_file).get().get('Body').read()
+        df_result = pd.read_parquet(BytesIO(data))
+        self.assertTrue(df_exp.equals(df_result))
+        df_state_result = self.s3_bucket_trg.read_csv_to_df(state_key)
+        self.assertEqual(state_exp + [['DE0000000001', '2021-04-15', 10.0, 11.0]],
+                         df_state_result.values.tolist())
+
+    def test_prev_clos_state_outdated(self):
+        """
+        Tests that the day before extract_date is extracted if the
+        previous closing price state was not written for that day
+        """
+        # Expected results
+        extract_date_list_exp = ['2021-04-16', '2021-04-17', '2021-04-18', '2021-04-19']
+        # Test init
+        extract_date = '2021-04-17'
+        state_key = 'state/prev_clos.csv'
+        target_config = self.target_config._replace(trg_prev_clos_key=state_key)
+        df_state = pd.DataFrame([['AT0000A0E9W5', '2021-04-15', 20.19, 20.19]],
+                                columns=['ISIN', 'Date', 'opening_price_eur', 'closing_price_eur'])
+        self.s3_bucket_trg.write_df_to_s3(df_state, state_key, 'csv')
+        # Method execution
+        with patch.object(MetaProcess, "return_date_list",
+        return_value=[extract_date, list(extract_date_list_exp)]):
+            xetra_etl = XetraETL(self.s3_bucket_src, self.s3_bucket_trg,
+                         self.meta_key, self.source_config, target_config)
+            df_result = xetra_etl.transform_report1(xetra_etl.extract())
+        # Test after method execution
+        self.assertEqual(extract_date_list_exp, xetra_etl.extract_date_list)
+        self.assertIsNone(xetra_etl.prev_clos_seed)
+        self.assertTrue(self.df_report.equals(df_result))
+
+    def test_etl_report1_prev_clos_state_daily(self):
+        """
+        Tests that consecutive daily runs take the prices of the day
+        before extract_date from the state written by the previous run
+        """
+        # Expected results
+        df_exp = self.df_report
+        run_dates = ['2021-04-17', '2021-04-18', '2021-04-19']
+        for pipelined in (False, True):
+            # Test init
+            state_key = f'state/prev_clos_{pipelined}.csv'
+            partition_key = f'report1_{pipelined}/'
+            source_config = self.source_config._replace(src_pipelined=pipelined)
+            target_config = self.target_config._replace(trg_prev_clos_key=state_key,
+                                                        trg_partition_key=partition_key)
+            listed_dates = []
+            # Method execution
+            for prev_date, run_date in zip(['2021-04-16'] + run_dates, run_dates):
+                # Every run is on its day and marks it as processed,
+                # the next run starts the day after
+                with patch.object(MetaProcess, "return_date_list",
+                return_value=[run_date, [prev_date, run_date]]), \
+                        patch.object(XetraETL, '_today', return_value=run_date):
+                    xetra_etl = XetraETL(self.s3_bucket_src, self.s3_bucket_trg,
+                                 self.meta_key, source_config, target_config)
+                    with patch.object(self.s3_bucket_src, 'list_files_in_prefix',
+                                      wraps=self.s3_bucket_src.list_files_in_prefix) as list_files:
+                        xetra_etl.etl_report1()
+                listed_dates.append([call.args[0] for call in list_files.call_args_list])
+            # Test after method execution
+            self.assertEqual([['2021-04-16', '2021-04-17'], ['2021-04-18'], ['2021-04-19']],
+                             listed_dates)
+            df_result = pd.concat([
+                self.s3_bucket_trg.read_parquet_to_df(xetra_etl.partition_key(date))
+                for date in run_dates], ignore_index=True)
+            self.assertTrue(df_exp.equals(df_result))
+
+    def test_etl_report1_streaming(self):
+        """
+        Tests the etl_report1 method in streaming mode
+        """
+        # Expected results
+        df_exp = self.df_report
+        # Test init
+        extract_date = '2021-04-17'
+        extract_date_list = ['2021-04-16', '2021-04-17', '2021-04-18', '2021-04-19']
+        source_config = self.source_config._replace(src_streaming=True)
+        # Method execution
+        with patch.object(MetaProcess, "return_date_list",
+        return_value=[extract_date, extract_date_list]):
+            xetra_etl = XetraETL(self.s3_bucket_src, self.s3_bucket_trg,
+                         self.meta_key, source_config, self.target_config)
+            xetra_etl.etl_report1()
+        # Test after method execution
+        trg_file = self.s3_bucket_trg.list_files_in_prefix(self.target_config.trg_key)[0]
+        data = self.trg_bucket.Object(key=trg_file).get().get('Body').read()
+        df_result = pd.read_parquet(BytesIO(data))
+        self.assertTrue(df_exp.equals(df_result))
+
+    def test_etl_report1_pipelined(self):
+        """
+        Tests the etl_report1 method in pipelined mode
+        """
+        # Expected results
+        df_exp = self.df_report
+        meta_exp = ['2021-04-17', '2021-04-18', '2021-04-19']
+        # Test init
+        extract_date = '2021-04-17'
+        extract_date_list = ['2021-04-16', '2021-04-17', '2021-04-18', '2021-04-19']
+        source_config = self.source_config._replace(src_pipelined=True, src_pipeline_depth=1)
+        # Method execution
+        with patch.object(MetaProcess, "return_date_list",
+        return_value=[extract_date, extract_date_list]):
+            xetra_etl = XetraETL(self.s3_bucket_src, self.s3_bucket_trg,
+                         self.meta_key, source_config, self.target_config)
+            self.assertTrue(xetra_etl.etl_report1())
+        # Test after method execution
+        trg_file = self.s3_bucket_trg.list_files_in_prefix(self.target_config.trg_key)[0]
+        data = self.trg_bucket.Object(key=trg_file).get().get('Body').read()
+        df_result = pd.read_parquet(BytesIO(data))
+        self.assertTrue(df_exp.equals(df_result))
+        meta_file = self.s3_bucket_trg.list_files_in_prefix(self.meta_key)[0]
+        df_meta_result = self.s3_bucket_trg.read_csv_to_df(meta_file)
+        self.assertEqual(list(df_meta_result['source_date']), meta_exp)
+
+    def test_etl_report1_pipelined_partitioned(self):
+        """
+        Tests the etl_report1 method in pipelined mode writing one partition
+        per date and carrying the previous closing price state over
+        """
+        # Expected results
+        df_exp = self.df_report
+        state_exp = [['AT0000A0E9W5', '2021-04-19', 23.58, 24.22],
+                     ['DE0000000001', '2021-04-15', 10.0, 11.0]]
+        # Test init
+        extract_date = '2021-04-17'
+        extract_date_list = ['2021-04-16', '2021-04-17', '2021-04-18', '2021-04-19']
+        state_key = 'state/prev_clos.csv'
+        source_config = self.source_config._replace(src_pipelined=True)
+        target_config = self.target_config._replace(trg_partition_key='report1/',
+                                                    trg_prev_clos_key=state_key)
+        df_state = pd.DataFrame([['AT0000A0E9W5', '2021-04-16', 18.27, 18.27],
+                                 ['DE0000000001', '2021-04-15', 10.0, 11.0]],
+                                columns=['ISIN', 'Date', 'opening_price_eur', 'closing_price_eur'])
+        self.s3_bucket_trg.write_df_to_s3(df_state, state_key, 'csv')
+        # Method execution
+        with patch.object(MetaProcess, "return_date_list",
+        return_value=[extract_date, extract_date_list]):
+            xetra_etl = XetraETL(self.s3_bucket_src, self.s3_bucket_trg,
+                         self.meta_key, source_config, target_config)
+            xetra_etl.etl_report1()
+        # Test after method execution
+        df_result = pd.concat([
+            self.s3_bucket_trg.read_parquet_to_df(xetra_etl.partition_key(date))
+            for date in ['2021-04-17', '2021-04-18', '2021-04-19']], ignore_index=True)
+        self.assertTrue(df_exp.equals(df_result))
+        df_state_result = self.s3_bucket_trg.read_csv_to_df(state_key)
+        self.assertEqual(state_exp, df_state_result.values.tolist())
+
+    def test_etl_report1_pipelined_failure(self):
+        """
+        Tests that a failing stage stops the pipeline without updating the meta file
+        """
+        # Test init
+        extract_date = '2021-04-17'
+        extract_date_list = ['2021-04-16', '2021-04-17', '2021-04-18', '2021-04-19']
+        source_config = self.source_config._replace(src_pipelined=True)
+        # Method execution
+        with patch.object(MetaProcess, "return_date_list",
+        return_value=[extract_date, extract_date_list]):
+            xetra_etl = XetraETL(self.s3_bucket_src, self.s3_bucket_trg,
+                         self.meta_key, source_config, self.target_config)
+            with patch.object(self.s3_bucket_trg, 'write_df_to_s3',
+                              side_effect=ValueError('upload failed')):
+                with self.assertRaises(ValueError):
+                    xetra_etl.etl_report1()
+        # Test after method execution
+        self.assertEqual([], self.s3_bucket_trg.list_files_in_prefix(self.meta_key))
+
+    def test_etl_report1_pipelined_configured(self):
+        """
+        Tests that the pipelined mode extracts with the configured extract and
+        aggregates with the configured transform engine and workers
+        """
+        # Expected results
+        df_exp = self.df_report
+        mirror_keys_exp = [f'mirror/{date}.parquet'
+                           for date in ['2021-04-16', '2021-04-17', '2021-04-18', '2021-04-19']]
+        # Test init
+        extract_date = '2021-04-17'
+        extract_date_list = ['2021-04-16', '2021-04-17', '2021-04-18', '2021-04-19']
+        source_config = self.source_config._replace(src_pipelined=True, src_mirror_key='mirror/',
+                                                    src_read_mirror=True)
+        cases = [(self.target_config._replace(trg_transform_engine='legacy'),
+                  '_aggregate_report1_legacy'),
+                 (self.target_config._replace(trg_transform_engine='single_pass',
+                                              trg_transform_workers=2),
+                  '_aggregate_report1_sharded')]
+        for target_config, aggregate in cases:
+            # Method execution
+            with patch.object(MetaProcess, "return_date_list",
+            return_value=[extract_date, list(extract_date_list)]):
+                xetra_etl = XetraETL(self.s3_bucket_src, self.s3_bucket_trg,
+                             self.meta_key, source_config, target_config)
+                with patch.object(XetraETL, aggregate, autospec=True,
+                                  side_effect=getattr(XetraETL, aggregate)) as aggregate_mock:
+                    xetra_etl.etl_report1()
+            # Test after method execution
+            self.assertEqual(len(extract_date_list), aggregate_mock.call_count)
+            trg_file = self.s3_bucket_trg.list_files_in_prefix(self.target_config.trg_key)[-1]
+            df_result = self.s3_bucket_trg.read_parquet_to_df(trg_file)
+            self.assertTrue(df_exp.equals(df_result))
+            self.assertEqual(mirror_keys_exp, self.s3_bucket_trg.list_files_in_prefix('mirror/'))
+
+    def test_etl_report1_pipelined_agg_cache(self):
+        """
+        Tests that the pipelined mode rejects the cached daily aggregates
+        """
+        # Expected results
+        log_exp = 'The aggregate cache is not supported for the pipelined ETL!'
+        # Test init
+        source_config = self.source_config._replace(src_pipelined=True)
+        target_config = self.target_config._replace(trg_agg_cache_key='cache/report1/')
+        # Method execution
+        with patch.object(MetaProcess, "return_date_list",
+        return_value=['2021-04-17', ['2021-04-16', '2021-04-17']]):
+            xetra_etl = XetraETL(self.s3_bucket_src, self.s3_bucket_trg,
+                         self.meta_key, source_config, target_config)
+            with self.assertLogs() as logm:
+                with self.assertRaises(WrongFormatException):
+                    xetra_etl.etl_report1()
+                # Log test after method execution
+                self.assertIn(log_exp, logm.output[0])
+
+    def test_etl_report1_metrics(self):
+        """
+        Tests that etl_report1 records the stage times and row counts
+        and emits the run summary at the end
+        """
+        # Test init
+        extract_date = '2021-04-17'
+        extract_date_list = ['2021-04-16', '2021-04-17', '2021-04-18', '2021-04-19']
+        metrics = PipelineMetrics()
+        # Method execution
+        with patch.object(MetaProcess, "return_date_list",
+        return_value=[extract_date, extract_date_list]):
+            xetra_etl = XetraETL(self.s3_bucket_src, self.s3_bucket_trg,
+                         self.meta_key, self.source_config, self.target_config,
+                         metrics=metrics)
+            with self.assertLogs() as logm:
+                xetra_etl.etl_report1()
+                # Log test after method execution
+                self.assertIn('Xetra ETL run summary', logm.output[-1])
+        summary = metrics.summary()
+        # Test after method execution
+        self.assertEqual({'extract', 'transform', 'load'}, set(summary['stages']))
+        self.assertEqual(8, summary['counters']['rows_read'])
+        self.assertEqual(3, summary['counters']['rows_written'])
+
     def test_etl_report1(self):
         """
         Tests the etl_report1 method
@@ -293,5 +1230,121 @@ class TestXetraETLMethods(unittest.TestCase):
             }
         )
 
+
+class TestXetraETLExtractAsync(unittest.TestCase):
+    """
+    Testing XetraETL.extract with an AsyncS3BucketConnector against a local moto server
+    """
+
+    def setUp(self):
+        """
+        Setting up the environment
+        """
+        with socket.socket() as sock:
+            sock.bind(('127.0.0.1', 0))
+            port = sock.getsockname()[1]
+        self.server = ThreadedMotoServer(ip_address='127.0.0.1', port=port, verbose=False)
+        self.server.start()
+        # The moto server does not decode aws-chunked request bodies
+        self.env_patch = patch.dict(os.environ, {
+            'AWS_REQUEST_CHECKSUM_CALCULATION': 'when_required',
+            'AWS_DEFAULT_REGION': 'eu-central-1',
+            'AWS_ACCESS_KEY_ID': 'KEY1',
+            'AWS_SECRET_ACCESS_KEY': 'KEY2'})
+        self.env_patch.start()
+        self.s3_endpoint_url = f'http://127.0.0.1:{port}'
+        self.s3 = boto3.resource(service_name='s3', endpoint_url=self.s3_endpoint_url)
+        self.s3.create_bucket(Bucket='async-src-bucket',
+                              CreateBucketConfiguration={'LocationConstraint': 'eu-central-1'})
+        self.s3_bucket_src = S3BucketConnector('AWS_ACCESS_KEY_ID', 'AWS_SECRET_ACCESS_KEY',
+                                               self.s3_endpoint_url, 'async-src-bucket')
+        self.s3_bucket_src_async = AsyncS3BucketConnector('AWS_ACCESS_KEY_ID',
+                                                          'AWS_SECRET_ACCESS_KEY',
+                                                          self.s3_endpoint_url, 'async-src-bucket')
+        self.source_config = XetraSourceConfig(
+            src_first_extract_date='2021-04-01',
+            src_columns=['ISIN', 'Date', 'Time', 'StartPrice', 'MinPrice', 'MaxPrice',
+                         'TradedVolume'],
+            src_col_date='Date', src_col_isin='ISIN', src_col_time='Time',
+            src_col_start_price='StartPrice', src_col_min_price='MinPrice',
+            src_col_max_price='MaxPrice', src_col_traded_vol='TradedVolume',
+            src_async_concurrency=3)
+        self.target_config = XetraTargetConfig(
+            trg_col_isin='isin', trg_col_date='date', trg_col_op_price='opening_price_eur',
+            trg_col_clos_price='closing_price_eur', trg_col_min_price='minimum_price_eur',
+            trg_col_max_price='maximum_price_eur', trg_col_dail_trad_vol='daily_traded_volume',
+            trg_col_ch_prev_clos='change_prev_closing_%', trg_key='report1/xetra_daily_report1_',
+            trg_key_date_format='%Y%m%d_%H%M%S', trg_format='parquet')
+        rng = np.random.default_rng(3)
+        self.df_src = pd.DataFrame({
+            'ISIN': [f'DE000{i % 7:07d}' for i in range(60)],
+            'Date': ['2021-04-16'] * 30 + ['2021-04-17'] * 30,
+            'Time': [f'{i % 24:02d}:00' for i in range(60)],
+            'StartPrice': rng.uniform(1, 100, 60).round(2),
+            'MinPrice': rng.uniform(1, 100, 60).round(2),
+            'MaxPrice': rng.uniform(1, 100, 60).round(2),
+            'TradedVolume': rng.integers(0, 10000, 60)})
+        # One small file per hour like the hourly Xetra source objects
+        for start in range(0, 60, 5):
+            date = self.df_src.loc[start, 'Date']
+            self.s3_bucket_src.write_df_to_s3(self.df_src.loc[start:start + 4],
+                                              f'{date}/{date}_BINS_XETR{start:02d}.csv', 'csv')
+
+    def tearDown(self):
+        self.s3.Bucket('async-src-bucket').objects.all().delete()
+        self.s3.Bucket('async-src-bucket').delete()
+        self.env_patch.stop()
+        self.server.stop()
+
+    def test_extract_async(self):
+        """
+        Tests that the asynchronous extract gives the same DataFrame as the threaded one
+        """
+        # Test init
+        extract_date = '2021-04-17'
+        extract_date_list = ['2021-04-16', '2021-04-17', '2021-04-18']
+        # Method execution
+        with patch.object(MetaProcess, "return_date_list",
+        return_value=[extract_date, extract_date_list]):
+            df_exp = XetraETL(self.s3_bucket_src, self.s3_bucket_src, 'meta_key',
+                              self.source_config, self.target_config).extract()
+            df_result = XetraETL(self.s3_bucket_src, self.s3_bucket_src, 'meta_key',
+                                 self.source_config, self.target_config,
+                                 s3_bucket_src_async=self.s3_bucket_src_async).extract()
+        # Test after method execution
+        pd.testing.assert_frame_equal(df_exp, df_result)
+        self.assertEqual(len(self.df_src), len(df_result))
+
+    def test_extract_async_no_files(self):
+        """
+        Tests the asynchronous extract when there are no source files
+        """
+        # Method execution
+        with patch.object(MetaProcess, "return_date_list",
+        return_value=['2021-04-20', ['2021-04-19', '2021-04-20']]):
+            df_result = XetraETL(self.s3_bucket_src, self.s3_bucket_src, 'meta_key',
+                                 self.source_config, self.target_config,
+                                 s3_bucket_src_async=self.s3_bucket_src_async).extract()
+        # Test after method execution
+        self.assertTrue(df_result.empty)
+
+
+    def test_extract_async_read_mirror(self):
+        """
+        Tests that the asynchronous extract rejects reading the mirror
+        """
+        # Test init
+        source_config = self.source_config._replace(src_read_mirror=True)
+        # Method execution
+        with patch.object(MetaProcess, "return_date_list",
+        return_value=['2021-04-17', ['2021-04-16', '2021-04-17']]):
+            xetra_etl = XetraETL(self.s3_bucket_src, self.s3_bucket_src, 'meta_key',
+                                 source_config, self.target_config,
+                                 s3_bucket_src_async=self.s3_bucket_src_async)
+            with self.assertLogs() as logm, self.assertRaises(WrongFormatException):
+                xetra_etl.extract()
+        # Test after method execution
+        self.assertIn('Reading the mirror is not supported', logm.output[0])
+
 if __name__ == '__main__':
     unittest.main()
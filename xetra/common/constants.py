@@ -11,6 +11,38 @@ class S3FileTypes(Enum):
     PARQUET = 'parquet'
 
 
+class CsvParserEngines(Enum):
+    """
+    supported csv parser backends for S3BucketConnector.read_csv_to_df
+    """
+    C = 'c'
+    PYARROW = 'pyarrow'
+
+
+class CompressionTypes(Enum):
+    """
+    supported csv compressions for S3BucketConnector
+    """
+    GZIP = 'gzip'
+    ZSTD = 'zstd'
+
+
+class TransformEngines(Enum):
+    """
+    supported aggregation engines for XetraETL.transform_report1
+    """
+    LEGACY = 'legacy'
+    SINGLE_PASS = 'single_pass'
+
+
+class TradingCalendars(Enum):
+    """
+    supported trading calendars for MetaProcess.return_date_list
+    """
+    ALL_DAYS = 'all_days'
+    XETRA = 'xetra'
+
+
 class MetaProcessFormat(Enum):
     """
     formation for MetaProcess class
@@ -19,4 +51,7 @@ class MetaProcessFormat(Enum):
     META_PROCESS_DATE_FORMAT = '%Y-%m-%d %H:%M:%S'
     META_SOURCE_DATE_COL = 'source_date'
     META_PROCESS_COL = 'datetime_of_processing'
-    META_FILE_FORMAT = 'csv'
\ No newline at end of file
+    META_FILE_FORMAT = 'csv'
+    META_DELTA_SUFFIX = '.delta/'
+    META_DELTA_KEY_FORMAT = '%Y%m%d_%H%M%S_%f'
+    META_DATE_INDEX_SUFFIX = '.dates.parquet'
\ No newline at end of file
@@ -0,0 +1,107 @@
+"""Local on-disk cache for parsed S3 objects"""
+import hashlib
+import json
+import os
+import threading
+import uuid
+
+import pandas as pd
+
+
+class LocalObjectCache:
+    """
+    Size-bounded LRU cache storing parsed S3 objects as parquet files
+
+    Entries are addressed by the hash of bucket, key, ETag and the read arguments,
+    so a changed object or different parser settings never hit an old entry.
+    """
+
+    def __init__(self, directory: str, max_bytes: int = 2 * 1024 ** 3):
+        """
+        Constructor for LocalObjectCache
+
+        :param directory: directory the cache files are stored in, created if missing
+        :param max_bytes: size of all cache files from which on the least recently
+                          used ones are deleted
+        """
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        os.makedirs(directory, exist_ok=True)
+
+    @staticmethod
+    def entry_key(bucket: str, key: str, etag: str, **read_args) -> str:
+        """
+        Returns the content address of a parsed S3 object
+
+        :param bucket: S3 bucket name
+        :param key: key of the object
+        :param etag: ETag of the object
+        :param read_args: arguments the object is parsed with
+        """
+        content = json.dumps([bucket, key, etag, read_args], sort_keys=True, default=str)
+        return hashlib.sha256(content.encode('utf-8')).hexdigest()
+
+    def get(self, entry_key: str):
+        """
+        Returns the cached DataFrame of an entry, None if it is not cached
+
+        :param entry_key: content address from entry_key
+        """
+        path = self.__path(entry_key)
+        try:
+            data_frame = pd.read_parquet(path)
+        except FileNotFoundError:
+            return None
+        try:
+            # The modification time is the last access for the LRU eviction
+            os.utime(path)
+        except FileNotFoundError:
+            pass
+        return data_frame
+
+    def put(self, entry_key: str, data_frame: pd.DataFrame):
+        """
+        Stores a DataFrame and evicts the least recently used entries above max_bytes
+
+        :param entry_key: content address from entry_key
+        :param data_frame: parsed content of the S3 object
+        """
+        path = self.__path(entry_key)
+        # Writing to a temporary file first, so readers never see a partial entry
+        tmp_path = f'{path}.{uuid.uuid4().hex}.tmp'
+        data_frame.to_parquet(tmp_path, index=False)
+        os.replace(tmp_path, path)
+        self.__evict()
+
+    def __path(self, entry_key: str) -> str:
+        """
+        Helper function returning the file of an entry
+
+        :param entry_key: content address from entry_key
+        """
+        return os.path.join(self.directory, f'{entry_key}.parquet')
+
+    def __evict(self):
+        """
+        Helper function for self.put()
+        deleting the least recently used entries until all fit into max_bytes
+        """
+        with self._lock:
+            entries = []
+            for entry in os.scandir(self.directory):
+                if entry.name.endswith('.parquet'):
+                    try:
+                        stat = entry.stat()
+                    except FileNotFoundError:
+                        continue
+                    entries.append((stat.st_mtime, stat.st_size, entry.path))
+            total_bytes = sum(size for _, size, _ in entries)
+            for _, size, path in sorted(entries):
+                if total_bytes <= self.max_bytes:
+                    break
+                try:
+                    os.remove(path)
+                except FileNotFoundError:
+                    pass
+                total_bytes -= size
@@ -2,14 +2,18 @@
 Methods for processing the meta file
 """
 import collections
-from datetime import datetime, timedelta
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
 
 import pandas as pd
 
 from xetra.common.s3 import S3BucketConnector
-from xetra.common.constants import MetaProcessFormat
+from xetra.common.constants import MetaProcessFormat, S3FileTypes
+from xetra.common.trading_calendar import TradingCalendar
 from xetra.common.custom_exceptions import WrongMetaFileException
 
+# Number of threads reading the delta files of the append-only meta store
+META_READ_WORKERS = 16
 
 class MetaProcess:
     """
@@ -17,13 +21,17 @@ class MetaProcess:
     """
 
     @staticmethod
-    def update_meta_file(extract_date_list: list, meta_key: str, s3_bucket_meta: S3BucketConnector):
+    def update_meta_file(extract_date_list: list, meta_key: str, s3_bucket_meta: S3BucketConnector,
+                         append_only: bool = False, compact_threshold: int = 30):
         """
         Updating the meta file with the processed Xetra dates and todays date as processed date
 
         :param: extract_date_list -> a list of dates that are extracted from the source
         :param: meta_key -> key of the meta file on the S3 bucket
         :param: s3_bucket_meta -> S3BucketConnector for the bucket with the meta file
+        :param: append_only -> writes a small delta file per run instead of rewriting the meta file
+        :param: compact_threshold -> number of delta files from which on they are
+                                     compacted into the meta file
         """
         # Creating an empty DataFrame using the meta file column names
         df_new = pd.DataFrame(columns=[
@@ -34,13 +42,26 @@ class MetaProcess:
         # Filling the processed column
         df_new[MetaProcessFormat.META_PROCESS_COL.value] = \
             datetime.today().strftime(MetaProcessFormat.META_PROCESS_DATE_FORMAT.value)
+        if append_only:
+            # Writing only the new dates as delta file next to the meta file
+            delta_key = (
+                f'{meta_key}{MetaProcessFormat.META_DELTA_SUFFIX.value}'
+                f'{datetime.today().strftime(MetaProcessFormat.META_DELTA_KEY_FORMAT.value)}.'
+                f'{MetaProcessFormat.META_FILE_FORMAT.value}'
+            )
+            s3_bucket_meta.write_df_to_s3(df_new, delta_key, MetaProcessFormat.META_FILE_FORMAT.value)
+            delta_keys = s3_bucket_meta.list_files_in_prefix(
+                f'{meta_key}{MetaProcessFormat.META_DELTA_SUFFIX.value}')
+            if len(delta_keys) >= compact_threshold:
+                MetaProcess.compact_meta_file(meta_key, s3_bucket_meta)
+            return True
         try:
             # If meta file exists -> union DataFrame of old and new meta data is created
             df_old = s3_bucket_meta.read_csv_to_df(meta_key)
             if collections.Counter(df_old.columns) != collections.Counter(df_new.columns):
                 raise WrongMetaFileException
             df_all = pd.concat([df_old, df_new])
-        except s3_bucket_meta.session.client('s3').exceptions.NoSuchKey:
+        except s3_bucket_meta.exceptions.NoSuchKey:
             # No meta file exists -> only the new data is used
             df_all = df_new
         # Writing to S3
@@ -48,55 +69,188 @@ class MetaProcess:
         return True
 
     @staticmethod
-    def return_date_list(first_date: str, meta_key: str, s3_bucket_meta: S3BucketConnector):
+    def compact_meta_file(meta_key: str, s3_bucket_meta: S3BucketConnector):
+        """
+        Merging the delta files of the append-only meta store into the meta file
+        and deleting them afterwards
+
+        :param: meta_key -> key of the meta file on the S3 bucket
+        :param: s3_bucket_meta -> S3BucketConnector for the bucket with the meta file
+        """
+        delta_keys = s3_bucket_meta.list_files_in_prefix(
+            f'{meta_key}{MetaProcessFormat.META_DELTA_SUFFIX.value}')
+        if not delta_keys:
+            return True
+        df_all = MetaProcess.read_meta_file(meta_key, s3_bucket_meta, append_only=True)
+        if collections.Counter(df_all.columns) != collections.Counter([
+                MetaProcessFormat.META_SOURCE_DATE_COL.value,
+                MetaProcessFormat.META_PROCESS_COL.value]):
+            raise WrongMetaFileException
+        s3_bucket_meta.write_df_to_s3(df_all, meta_key, MetaProcessFormat.META_FILE_FORMAT.value)
+        MetaProcess.write_date_index(df_all, meta_key, s3_bucket_meta)
+        # A crash before deleting only leaves duplicate dates, which are harmless
+        s3_bucket_meta.delete_files(delta_keys)
+        return True
+
+    @staticmethod
+    def date_index_key(meta_key: str):
+        """
+        Creating the key of the processed dates index of the append-only meta store
+
+        :param: meta_key -> key of the meta file on the S3 bucket
+
+        :returns:
+          index_key: e.g. meta.csv.dates.parquet
+        """
+        return f'{meta_key}{MetaProcessFormat.META_DATE_INDEX_SUFFIX.value}'
+
+    @staticmethod
+    def write_date_index(df_meta: pd.DataFrame, meta_key: str, s3_bucket_meta: S3BucketConnector):
+        """
+        Writing the sorted unique source dates of the meta file as small parquet file,
+        so the processed dates are read without the processing times of the whole history
+
+        :param: df_meta -> Pandas DataFrame with the content of the meta file
+        :param: meta_key -> key of the meta file on the S3 bucket
+        :param: s3_bucket_meta -> S3BucketConnector for the bucket with the meta file
+        """
+        df_dates = df_meta[[MetaProcessFormat.META_SOURCE_DATE_COL.value]] \
+            .drop_duplicates() \
+            .sort_values(by=MetaProcessFormat.META_SOURCE_DATE_COL.value) \
+            .reset_index(drop=True)
+        s3_bucket_meta.write_df_to_s3(df_dates, MetaProcess.date_index_key(meta_key),
+                                      S3FileTypes.PARQUET.value)
+        return True
+
+    @staticmethod
+    def read_processed_dates(first_date: str, meta_key: str, s3_bucket_meta: S3BucketConnector,
+                             append_only: bool = False):
+        """
+        Reading the processed source dates from first_date on. The append-only store
+        answers from the date index written at compaction and the outstanding delta
+        files, the meta file is only read if there is no index yet. After editing the
+        meta file of the append-only store by hand, the index has to be deleted.
+
+        :param: first_date -> the earliest date that is of interest
+        :param: meta_key -> key of the meta file on the S3 bucket
+        :param: s3_bucket_meta -> S3BucketConnector for the bucket with the meta file
+        :param: append_only -> reads the date index and delta files of the append-only store
+
+        :returns:
+          src_dates: Pandas Series with the processed dates from first_date on,
+                     None if there is no meta file
+        """
+        if not append_only:
+            df_meta = MetaProcess.read_meta_file(meta_key, s3_bucket_meta)
+        else:
+            # One listing finds the meta file, the date index and the delta files
+            keys = s3_bucket_meta.list_files_in_prefix(meta_key)
+            index_key = MetaProcess.date_index_key(meta_key)
+            data_frames = []
+            if index_key in keys:
+                data_frames.append(s3_bucket_meta.read_parquet_to_df(
+                    index_key, filters=[
+                        (MetaProcessFormat.META_SOURCE_DATE_COL.value, '>=', first_date)]))
+            elif meta_key in keys:
+                data_frames.append(s3_bucket_meta.read_csv_to_df(meta_key))
+            delta_prefix = f'{meta_key}{MetaProcessFormat.META_DELTA_SUFFIX.value}'
+            data_frames.extend(MetaProcess.read_delta_files(
+                [key for key in keys if key.startswith(delta_prefix)], s3_bucket_meta))
+            df_meta = pd.concat(data_frames, ignore_index=True) if data_frames else None
+        if df_meta is None:
+            return None
+        src_dates = df_meta[MetaProcessFormat.META_SOURCE_DATE_COL.value].astype(str)
+        # Dates in META_DATE_FORMAT compare like strings, filtering before parsing
+        return src_dates[src_dates >= first_date]
+
+    @staticmethod
+    def read_delta_files(delta_keys: list, s3_bucket_meta: S3BucketConnector):
+        """
+        Reading the small delta files of the append-only store concurrently
+        instead of one GET after another
+
+        :param: delta_keys -> keys of the delta files
+        :param: s3_bucket_meta -> S3BucketConnector for the bucket with the meta file
+
+        :returns:
+          data_frames: list of Pandas DataFrames in the order of delta_keys
+        """
+        if not delta_keys:
+            return []
+        with ThreadPoolExecutor(max_workers=META_READ_WORKERS) as executor:
+            return list(executor.map(s3_bucket_meta.read_csv_to_df, delta_keys))
+
+    @staticmethod
+    def read_meta_file(meta_key: str, s3_bucket_meta: S3BucketConnector, append_only: bool = False):
+        """
+        Reading the meta file and, for the append-only store, its delta files
+
+        :param: meta_key -> key of the meta file on the S3 bucket
+        :param: s3_bucket_meta -> S3BucketConnector for the bucket with the meta file
+        :param: append_only -> reads the delta files of the append-only store as well
+
+        :returns:
+          df_meta: Pandas DataFrame with the content of the meta file, None if there is none
+        """
+        data_frames = []
+        try:
+            data_frames.append(s3_bucket_meta.read_csv_to_df(meta_key))
+        except s3_bucket_meta.exceptions.NoSuchKey:
+            pass
+        if append_only:
+            data_frames.extend(MetaProcess.read_delta_files(
+                s3_bucket_meta.list_files_in_prefix(
+                    f'{meta_key}{MetaProcessFormat.META_DELTA_SUFFIX.value}'),
+                s3_bucket_meta))
+        if not data_frames:
+            return None
+        return pd.concat(data_frames, ignore_index=True)
+
+    @staticmethod
+    def return_date_list(first_date: str, meta_key: str, s3_bucket_meta: S3BucketConnector,
+                         append_only: bool = False, calendar: TradingCalendar = None):
         """
         Creating a list of dates based on the input first_date and the already
-        processed dates in the meta file
+        processed dates in the meta file, see read_processed_dates
 
         :param: first_date -> the earliest date Xetra data should be processed
         :param: meta_key -> key of the meta file on the S3 bucket
         :param: s3_bucket_meta -> S3BucketConnector for the bucket with the meta file
+        :param: append_only -> reads the delta files of the append-only store as well
+        :param: calendar -> TradingCalendar, only its trading days are returned,
+                            every calendar day if None
 
         :returns:
           min_date: first date that should be processed
           return_date_list: list of all dates from min_date till today
+                            with the previous trading day of min_date as first date
         """
-        start = datetime.strptime(first_date,
-                                  MetaProcessFormat.META_DATE_FORMAT.value).date() - timedelta(days=1)
-        today = datetime.today().date()
-        try:
+        calendar = calendar or TradingCalendar()
+        first = pd.Timestamp(first_date)
+        today = pd.Timestamp(datetime.today().date())
+        # Creating an index of all trading days from first_date until today
+        dates = calendar.trading_days(first, today)
+        # Reading the processed dates from first_date on
+        src_dates = MetaProcess.read_processed_dates(first_date, meta_key, s3_bucket_meta,
+                                                     append_only)
+        if src_dates is not None:
             # If meta file exists create return_date_list using the content of the meta file
-            # Reading meta file
-            df_meta = s3_bucket_meta.read_csv_to_df(meta_key)
-            # Creating a list of dates from first_date until today
-            dates = [start + timedelta(days=x) for x in range(0, (today - start).days + 1)]
-            # Creating set of all dates in meta file
-            src_dates = set(pd.to_datetime(
-                df_meta[MetaProcessFormat.META_SOURCE_DATE_COL.value]
-            ).dt.date)
-            dates_missing = set(dates[1:]) - src_dates
-            if dates_missing:
-                # Determining the earliest date that should be extracted
-                min_date = min(set(dates[1:]) - src_dates) - timedelta(days=1)
-                # Creating a list of dates from min_date until today
-                return_min_date = (min_date + timedelta(days=1)) \
-                    .strftime(MetaProcessFormat.META_DATE_FORMAT.value)
-                return_dates = [
-                    date.strftime(MetaProcessFormat.META_DATE_FORMAT.value) \
-                    for date in dates if date >= min_date
-                ]
-            else:
+            src_dates = pd.to_datetime(src_dates).dt.normalize()
+            dates_missing = dates[~dates.isin(src_dates)]
+            if dates_missing.empty:
                 # Setting values for the earliest date and the list of dates
-                return_dates = []
-                return_min_date = datetime(2200, 1, 1).date() \
-                    .strftime(MetaProcessFormat.META_DATE_FORMAT.value)
-        except s3_bucket_meta.session.client('s3').exceptions.NoSuchKey:
-            # No meta file found -> creating a date list from first_date - 1 day until today
-            return_min_date = first_date
-            return_dates = [
-                (start + timedelta(days=x)).strftime(
-                    MetaProcessFormat.META_DATE_FORMAT.value
-                )
-                for x in range((today - start).days + 1)
-            ]
-        return return_min_date, return_dates
+                return (datetime(2200, 1, 1).date()
+                        .strftime(MetaProcessFormat.META_DATE_FORMAT.value), [])
+            # Determining the earliest date that should be extracted
+            min_date = dates_missing[0]
+        else:
+            # No meta file found -> creating a date list from first_date until today
+            min_date = first
+        # Creating a list of dates from the trading day before min_date until today
+        prev_date = calendar.previous_trading_day(min_date)
+        return_dates = dates[dates >= min_date]
+        if prev_date <= today:
+            return_dates = return_dates.insert(0, prev_date)
+        return_min_date = first_date if src_dates is None else \
+            min_date.strftime(MetaProcessFormat.META_DATE_FORMAT.value)
+        return return_min_date, list(return_dates.strftime(MetaProcessFormat.META_DATE_FORMAT.value))
@@ -0,0 +1,208 @@
+"""Timing and throughput instrumentation of an ETL run"""
+import json
+import logging
+import os
+import resource
+import sys
+import threading
+import time
+from collections import defaultdict
+from contextlib import contextmanager
+
+# Upper bounds in seconds of the S3 request latency histogram buckets
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, float('inf'))
+
+
+class PipelineMetrics:
+    """
+    Collects stage times, counters and S3 request latencies of one ETL run
+
+    All methods are thread-safe, one instance is shared by the XetraETL
+    instance and its S3BucketConnectors.
+    """
+
+    def __init__(self, json_path: str = None, prometheus_textfile: str = None):
+        """
+        Constructor for PipelineMetrics
+
+        :param json_path: file the JSON run summary is written to by emit, only logged if None
+        :param prometheus_textfile: file in the Prometheus text format written by emit,
+                                    e.g. for the node exporter textfile collector
+        """
+        self._logger = logging.getLogger(__name__)
+        self.json_path = json_path
+        self.prometheus_textfile = prometheus_textfile
+        self._lock = threading.Lock()
+        self._stages = {}
+        self._counters = defaultdict(int)
+        self._latencies = {}
+
+    @contextmanager
+    def stage(self, name: str):
+        """
+        Context manager measuring wall and CPU time of a pipeline stage,
+        the CPU time includes finished child processes, e.g. of a process pool
+
+        :param name: name of the stage, times of stages with the same name are added up
+        """
+        wall_start = time.perf_counter()
+        cpu_start = self.__cpu_time()
+        try:
+            yield
+        finally:
+            wall = time.perf_counter() - wall_start
+            cpu = self.__cpu_time() - cpu_start
+            with self._lock:
+                stage = self._stages.setdefault(name, {'wall_seconds': 0.0, 'cpu_seconds': 0.0})
+                stage['wall_seconds'] += wall
+                stage['cpu_seconds'] += cpu
+
+    def increment(self, name: str, value: int = 1):
+        """
+        Adds value to a counter, e.g. bytes_downloaded or rows_read
+
+        :param name: name of the counter
+        :param value: amount the counter is increased by
+        """
+        with self._lock:
+            self._counters[name] += value
+
+    def observe_latency(self, operation: str, seconds: float):
+        """
+        Records the latency of one S3 request in the histogram of its operation
+
+        :param operation: S3 operation, e.g. GetObject
+        :param seconds: duration of the request
+        """
+        with self._lock:
+            histogram = self._latencies.setdefault(operation, {
+                'count': 0, 'sum': 0.0, 'buckets': [0] * len(LATENCY_BUCKETS)})
+            histogram['count'] += 1
+            histogram['sum'] += seconds
+            for index, bound in enumerate(LATENCY_BUCKETS):
+                if seconds <= bound:
+                    histogram['buckets'][index] += 1
+                    break
+
+    def register_s3_client(self, client):
+        """
+        Measures the latency of every request of a boto3 S3 client,
+        registering twice for the same client has no effect
+
+        :param client: boto3 S3 client
+        """
+        def before_call(context, **_kwargs):
+            context['metrics_start'] = time.perf_counter()
+
+        def after_call(context, model, **_kwargs):
+            if 'metrics_start' in context:
+                self.observe_latency(model.name, time.perf_counter() - context['metrics_start'])
+
+        client.meta.events.register('before-call.s3', before_call,
+                                    unique_id=f'xetra-metrics-before-{id(self)}')
+        client.meta.events.register('after-call.s3', after_call,
+                                    unique_id=f'xetra-metrics-after-{id(self)}')
+
+    def summary(self) -> dict:
+        """
+        Returns the run summary
+
+        :returns:
+          summary: dict with stages, counters, peak RSS and S3 latency histograms
+        """
+        with self._lock:
+            return {
+                'stages': {name: dict(stage) for name, stage in self._stages.items()},
+                'counters': dict(self._counters),
+                'peak_rss_bytes': self.peak_rss_bytes(),
+                's3_latency_seconds': {
+                    operation: {
+                        'count': histogram['count'],
+                        'sum': histogram['sum'],
+                        'buckets': {str(bound): count for bound, count
+                                    in zip(LATENCY_BUCKETS, histogram['buckets'])}}
+                    for operation, histogram in self._latencies.items()}
+            }
+
+    def emit(self):
+        """
+        Logs the JSON run summary and writes it to json_path and prometheus_textfile
+
+        :returns:
+          summary: dict with the run summary
+        """
+        summary = self.summary()
+        summary_json = json.dumps(summary, sort_keys=True)
+        self._logger.info('Xetra ETL run summary: %s', summary_json)
+        if self.json_path:
+            self.__write_atomic(self.json_path, summary_json)
+        if self.prometheus_textfile:
+            self.__write_atomic(self.prometheus_textfile, self.to_prometheus(summary))
+        return summary
+
+    @staticmethod
+    def to_prometheus(summary: dict) -> str:
+        """
+        Formats a run summary in the Prometheus text format
+
+        :param summary: dict from summary
+
+        :returns:
+          text: metrics in the Prometheus text exposition format
+        """
+        lines = ['# TYPE xetra_stage_wall_seconds gauge']
+        lines += [f'xetra_stage_wall_seconds{{stage="{name}"}} {stage["wall_seconds"]}'
+                  for name, stage in sorted(summary['stages'].items())]
+        lines.append('# TYPE xetra_stage_cpu_seconds gauge')
+        lines += [f'xetra_stage_cpu_seconds{{stage="{name}"}} {stage["cpu_seconds"]}'
+                  for name, stage in sorted(summary['stages'].items())]
+        for name, value in sorted(summary['counters'].items()):
+            lines.append(f'# TYPE xetra_{name}_total counter')
+            lines.append(f'xetra_{name}_total {value}')
+        lines.append('# TYPE xetra_peak_rss_bytes gauge')
+        lines.append(f'xetra_peak_rss_bytes {summary["peak_rss_bytes"]}')
+        lines.append('# TYPE xetra_s3_request_duration_seconds histogram')
+        for operation, histogram in sorted(summary['s3_latency_seconds'].items()):
+            cumulative = 0
+            for bound, count in histogram['buckets'].items():
+                cumulative += count
+                bound = '+Inf' if bound == 'inf' else bound
+                lines.append(f'xetra_s3_request_duration_seconds_bucket'
+                             f'{{operation="{operation}",le="{bound}"}} {cumulative}')
+            lines.append(f'xetra_s3_request_duration_seconds_sum'
+                         f'{{operation="{operation}"}} {histogram["sum"]}')
+            lines.append(f'xetra_s3_request_duration_seconds_count'
+                         f'{{operation="{operation}"}} {histogram["count"]}')
+        return '\n'.join(lines) + '\n'
+
+    @staticmethod
+    def peak_rss_bytes() -> int:
+        """
+        Returns the peak resident set size of the process in bytes
+        """
+        max_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        # ru_maxrss is in bytes on macOS and in kilobytes on Linux
+        return max_rss if sys.platform == 'darwin' else max_rss * 1024
+
+    @staticmethod
+    def __cpu_time() -> float:
+        """
+        Helper function for self.stage()
+        returning the CPU time of the process and its finished child processes
+        """
+        times = os.times()
+        return times.user + times.system + times.children_user + times.children_system
+
+    @staticmethod
+    def __write_atomic(path: str, content: str):
+        """
+        Helper function for self.emit()
+        writing a file via a temporary file, so readers never see a partial file
+
+        :param path: path of the file
+        :param content: text that should be written
+        """
+        tmp_path = f'{path}.tmp'
+        with open(tmp_path, 'w', encoding='utf-8') as file:
+            file.write(content)
+        os.replace(tmp_path, path)
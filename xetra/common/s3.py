@@ -1,21 +1,43 @@
 """Connector and methods accessing S3"""
+import codecs
+import gzip
 import os
 import logging
-from io import StringIO, BytesIO
+import threading
+import zlib
+from concurrent.futures import ThreadPoolExecutor
+from io import BytesIO, RawIOBase, TextIOWrapper
 
 import boto3
 import pandas as pd
+from botocore.config import Config
+import pyarrow as pa
+from pyarrow import csv as pa_csv
+from pyarrow import parquet as pq
+import zstandard
 
-from xetra.common.constants import S3FileTypes
+from xetra.common.constants import S3FileTypes, CsvParserEngines, CompressionTypes
+from xetra.common.local_cache import LocalObjectCache
+from xetra.common.metrics import PipelineMetrics
 from xetra.common.custom_exceptions import WrongFormatException
 
+# Filter operators of read_df and the pandas Series methods evaluating them
+FILTER_OPERATORS = {'==': 'eq', '=': 'eq', '!=': 'ne', '<': 'lt', '<=': 'le',
+                    '>': 'gt', '>=': 'ge', 'in': 'isin', 'not in': 'isin'}
+# Key suffixes of compressed csv files and their compression
+COMPRESSION_SUFFIXES = {'.gz': CompressionTypes.GZIP.value, '.gzip': CompressionTypes.GZIP.value,
+                        '.zst': CompressionTypes.ZSTD.value, '.zstd': CompressionTypes.ZSTD.value}
+
 
 class S3BucketConnector:
     """
     Class for interacting with S3 Buckets
     """
 
-    def __init__(self, access_key: str, secret_key: str, endpoint_url: str, bucket: str):
+    def __init__(self, access_key: str, secret_key: str, endpoint_url: str, bucket: str,
+                 multipart_part_size: int = None, multipart_concurrency: int = 4,
+                 connection_factory: 'S3ConnectionFactory' = None,
+                 cache: LocalObjectCache = None, metrics: PipelineMetrics = None):
         """
         Constructor for S3BucketConnector
 
@@ -23,13 +45,33 @@ class S3BucketConnector:
         :param secret_key: secret key for accessing S3
         :param endpoint_url: endpoint url to S3
         :param bucket: S3 bucket name
+        :param multipart_part_size: part size in bytes for streamed multipart uploads,
+                                    single put_object uploads if None
+        :param multipart_concurrency: number of parts uploaded in parallel
+        :param connection_factory: S3ConnectionFactory the session and S3 resource are
+                                   shared from, own ones are created if None
+        :param cache: LocalObjectCache parsed csv files are kept in, read_csv_to_df
+                      always downloads if None
+        :param metrics: PipelineMetrics S3 request latencies and transferred bytes
+                        and objects are recorded in, nothing is recorded if None
         """
         self._logger = logging.getLogger(__name__)
         self.endpoint_url = endpoint_url
-        self.session = boto3.Session(aws_access_key_id=os.environ[access_key],
-                                     aws_secret_access_key=os.environ[secret_key])
-        self._s3 = self.session.resource(service_name='s3', endpoint_url=endpoint_url)
+        self.multipart_part_size = multipart_part_size
+        self.multipart_concurrency = multipart_concurrency
+        self.cache = cache
+        self.metrics = metrics
+        # ETags of listed keys, used to address cache entries
+        self._etags = {}
+        if connection_factory is None:
+            connection_factory = S3ConnectionFactory(access_key, secret_key)
+        self.session = connection_factory.session
+        self._s3 = connection_factory.resource(endpoint_url)
         self._bucket = self._s3.Bucket(bucket)
+        # Exception classes of the client, resolved once instead of creating a client per lookup
+        self.exceptions = self._s3.meta.client.exceptions
+        if metrics is not None:
+            metrics.register_s3_client(self._s3.meta.client)
 
     def list_files_in_prefix(self, prefix: str):
         """
@@ -40,26 +82,374 @@ class S3BucketConnector:
         returns:
           files: list of all the file names containing the prefix in the key
         """
-        return [obj.key for obj in self._bucket.objects.filter(Prefix=prefix)]
+        objects = list(self._bucket.objects.filter(Prefix=prefix))
+        self.__count('objects_listed', len(objects))
+        if self.cache is not None:
+            self._etags.update((obj.key, obj.e_tag) for obj in objects)
+        return [obj.key for obj in objects]
+
+    def delete_files(self, keys: list):
+        """
+        deleting files from the S3 bucket
+
+        :param keys: keys of the files that should be deleted
+        """
+        # delete_objects accepts at most 1000 keys per request
+        for start in range(0, len(keys), 1000):
+            self._logger.info('Deleting %s files from %s/%s', len(keys[start:start + 1000]),
+                              self.endpoint_url, self._bucket.name)
+            self._bucket.delete_objects(Delete={
+                'Objects': [{'Key': key} for key in keys[start:start + 1000]]})
+        return True
 
-    def read_csv_to_df(self, key: str, encoding: str = 'utf-8', sep: str = ',') -> pd.DataFrame:
+    def read_csv_to_df(self, key: str, encoding: str = 'utf-8', sep: str = ',',
+                       usecols: list = None, dtype: dict = None,
+                       engine: str = CsvParserEngines.C.value,
+                       compression: str = None) -> pd.DataFrame:
         """
         reading a csv file from the S3 bucket and returning a dataframe
 
         :param sep: separator of the csv file
         :param encoding: encoding of the data inside the csv file
         :param key: key of the file that should be read
+        :param usecols: columns that should be parsed, all columns if None
+        :param dtype: data types per column, inferred by pandas if None
+        :param engine: csv parser backend, 'c' or 'pyarrow'
+        :param compression: compression of the file, 'gzip' or 'zstd', detected by
+                            the key suffix or the Content-Encoding of the object if None
 
 
         returns:
           data_frame: Pandas DataFrame containing the data of the csv file
         """
+        if engine not in (CsvParserEngines.C.value, CsvParserEngines.PYARROW.value):
+            self._logger.info('The csv parser engine %s is not supported!', engine)
+            raise WrongFormatException
+        self.check_compression(compression)
+        if self.cache is None:
+            self._logger.info('Reading file %s/%s/%s', self.endpoint_url, self._bucket.name, key)
+            return self.__read_csv(key, {}, encoding, sep, usecols, dtype, engine, compression)
+        # The ETag seen by list_files_in_prefix saves the HEAD request
+        etag = self._etags.get(key) or self.__head_etag(key)
+        entry_key = self.cache.entry_key(self._bucket.name, key, etag, encoding=encoding, sep=sep,
+                                         usecols=usecols, dtype=dtype, engine=engine,
+                                         compression=compression)
+        data_frame = self.cache.get(entry_key)
+        if data_frame is not None:
+            self._logger.info('Reading file %s/%s/%s from the local cache',
+                              self.endpoint_url, self._bucket.name, key)
+            self.__count('cache_hits')
+            return data_frame
         self._logger.info('Reading file %s/%s/%s', self.endpoint_url, self._bucket.name, key)
-        csv_obj = self._bucket.Object(key=key).get().get('Body').read().decode(encoding)
-        data = StringIO(csv_obj)
-        return pd.read_csv(data, sep=sep)
+        # IfMatch makes sure the cached content belongs to the ETag of the entry
+        data_frame = self.__read_csv(key, {'IfMatch': etag}, encoding, sep, usecols, dtype, engine,
+                                     compression)
+        self.cache.put(entry_key, data_frame)
+        return data_frame
+
+    def __head_etag(self, key: str):
+        """
+        Helper function for self.read_csv_to_df()
+        requesting the ETag of a file, NoSuchKey is raised if it is missing
+
+        :key: key of the file
+        """
+        try:
+            return self._bucket.Object(key=key).e_tag
+        except self.exceptions.ClientError as error:
+            missing_key_error = self.missing_key_error(error, self.exceptions)
+            if missing_key_error is None:
+                raise
+            raise missing_key_error from error
+
+    @staticmethod
+    def missing_key_error(error: Exception, exceptions):
+        """
+        mapping the 404 of a HEAD request, which has no error code in its empty body,
+        to the NoSuchKey error a GET request raises for a missing key
 
-    def write_df_to_s3(self, data_frame: pd.DataFrame, key: str, file_format: str):
+        :param error: ClientError raised by the HEAD request
+        :param exceptions: exceptions of the S3 client
+
+        returns:
+          missing_key_error: NoSuchKey error if the key is missing, None otherwise
+        """
+        if error.response.get('Error', {}).get('Code') not in ('404', 'NoSuchKey'):
+            return None
+        response = {**error.response, 'Error': {'Code': 'NoSuchKey',
+                                                'Message': 'The specified key does not exist.'}}
+        return exceptions.NoSuchKey(response, error.operation_name)
+
+    def __read_csv(self, key: str, get_args: dict, encoding: str, sep: str,
+                   usecols: list, dtype: dict, engine: str, compression: str) -> pd.DataFrame:
+        """
+        Helper function for self.read_csv_to_df()
+        downloading and parsing a csv file
+
+        :key: key of the file that should be read
+        :get_args: further arguments of the GetObject request
+        :encoding: encoding of the data inside the csv file
+        :sep: separator of the csv file
+        :usecols: columns that should be parsed, all columns if None
+        :dtype: data types per column, inferred if None
+        :engine: csv parser backend, 'c' or 'pyarrow'
+        :compression: compression of the file, detected if None
+        """
+        response = self._bucket.Object(key=key).get(**get_args)
+        self.__count_download(response)
+        body = response.get('Body')
+        compression = compression or self.infer_compression(key, response.get('ContentEncoding'))
+        if compression is not None:
+            # Decompressing the response body stream while it is read
+            body = self.decompressing_reader(body, compression)
+        if engine == CsvParserEngines.C.value:
+            # The response body stream is decoded incrementally while parsing
+            # instead of holding the raw bytes and a decoded copy
+            return pd.read_csv(codecs.getreader(encoding)(body), sep=sep,
+                               usecols=usecols, dtype=dtype)
+        return self.csv_bytes_to_df(body.read(), encoding, sep, usecols, dtype, engine)
+
+    def read_df(self, key: str, file_format: str, columns: list = None,
+                filters: list = None, **read_args) -> pd.DataFrame:
+        """
+        reading a file from the S3 bucket in one of the S3FileTypes and returning a dataframe
+
+        :param key: key of the file that should be read
+        :param file_format: format of the file, 'csv' or 'parquet'
+        :param columns: columns that should be read, all columns if None
+        :param filters: list of (column, operator, value) conditions the rows have to meet,
+                        e.g. [('ISIN', 'in', ['DE0005190003'])], all rows if None
+        :param read_args: further arguments of read_csv_to_df
+
+        returns:
+          data_frame: Pandas DataFrame containing the data of the file
+        """
+        if file_format == S3FileTypes.CSV.value:
+            data_frame = self.read_csv_to_df(key, usecols=columns, **read_args)
+            return self.filter_df(data_frame, filters) if filters else data_frame
+        if file_format == S3FileTypes.PARQUET.value:
+            return self.read_parquet_to_df(key, columns=columns, filters=filters)
+        self._logger.info('The file format %s is not '
+                          'supported to be read from s3!', file_format)
+        raise WrongFormatException
+
+    def read_parquet_to_df(self, key: str, columns: list = None,
+                           filters: list = None) -> pd.DataFrame:
+        """
+        reading a parquet file from the S3 bucket and returning a dataframe
+        Only the footer and the column chunks of the requested columns in the
+        row groups whose statistics can match the filters are downloaded
+        with byte-range requests.
+
+        :param key: key of the file that should be read
+        :param columns: columns that should be read, all columns if None
+        :param filters: list of (column, operator, value) conditions the rows have to meet,
+                        all rows if None
+
+        returns:
+          data_frame: Pandas DataFrame containing the data of the parquet file
+        """
+        self._logger.info('Reading file %s/%s/%s', self.endpoint_url, self._bucket.name, key)
+        expression = None
+        if filters:
+            self.__check_filters(filters)
+            expression = pq.filters_to_expression(filters)
+        reader = S3RangeReader(self._s3.meta.client, self._bucket.name, key, self.metrics)
+        self.__count('objects_read')
+        with pa.PythonFile(reader, mode='r') as parquet_file:
+            table = pq.read_table(parquet_file, columns=columns, filters=expression)
+        return table.to_pandas()
+
+    @staticmethod
+    def filter_df(data_frame: pd.DataFrame, filters: list) -> pd.DataFrame:
+        """
+        keeping the rows of a dataframe meeting all filters like read_parquet_to_df
+
+        :param data_frame: Pandas DataFrame that should be filtered
+        :param filters: list of (column, operator, value) conditions the rows have to meet
+
+        returns:
+          data_frame: Pandas DataFrame with the matching rows
+        """
+        S3BucketConnector.__check_filters(filters)
+        mask = pd.Series(True, index=data_frame.index)
+        for column, operator, value in filters:
+            values = data_frame[column]
+            if operator in ('in', 'not in'):
+                condition = values.isin(list(value))
+                mask &= ~condition if operator == 'not in' else condition
+            else:
+                mask &= getattr(values, FILTER_OPERATORS[operator])(value)
+        return data_frame[mask].reset_index(drop=True)
+
+    @staticmethod
+    def __check_filters(filters: list):
+        """
+        Helper function raising WrongFormatException for unsupported filter operators
+
+        :filters: list of (column, operator, value) conditions
+        """
+        for _, operator, _ in filters:
+            if operator not in FILTER_OPERATORS:
+                logging.getLogger(__name__).info('The filter operator %s is not supported!',
+                                                 operator)
+                raise WrongFormatException
+
+    @staticmethod
+    def infer_compression(key: str, content_encoding: str = None):
+        """
+        detecting the compression of a csv file by its key suffix or Content-Encoding
+
+        :param key: key of the file
+        :param content_encoding: Content-Encoding of the object
+
+        returns:
+          compression: 'gzip' or 'zstd', None if the file is not compressed
+        """
+        if S3BucketConnector.has_compression_suffix(key):
+            return COMPRESSION_SUFFIXES[os.path.splitext(key)[1].lower()]
+        # Content-Encoding is a list of encodings, e.g. gzip,aws-chunked
+        encodings = [encoding.strip() for encoding in (content_encoding or '').split(',')]
+        for compression in CompressionTypes:
+            if compression.value in encodings:
+                return compression.value
+        return None
+
+    @staticmethod
+    def has_compression_suffix(key: str):
+        """
+        checking if the key of a file ends with the suffix of a compression
+
+        :param key: key of the file
+
+        returns:
+          True if the key ends e.g. with .gz or .zst
+        """
+        return os.path.splitext(key)[1].lower() in COMPRESSION_SUFFIXES
+
+    @staticmethod
+    def check_compression(compression: str):
+        """
+        raising WrongFormatException for an unsupported compression
+
+        :param compression: compression of a csv file, None for detection
+        """
+        if compression is not None and compression not in [
+                compression_type.value for compression_type in CompressionTypes]:
+            logging.getLogger(__name__).info('The compression %s is not supported!', compression)
+            raise WrongFormatException
+
+    @staticmethod
+    def decompressing_reader(stream, compression: str):
+        """
+        wrapping a binary stream into a reader decompressing it incrementally
+
+        :param stream: binary file-like object with compressed data
+        :param compression: 'gzip' or 'zstd'
+
+        returns:
+          reader: binary file-like object with the decompressed data
+        """
+        if compression == CompressionTypes.GZIP.value:
+            return gzip.GzipFile(fileobj=stream, mode='rb')
+        return zstandard.ZstdDecompressor().stream_reader(stream)
+
+    @staticmethod
+    def compressing_writer(stream, compression: str):
+        """
+        wrapping a binary stream into a writer compressing the written data incrementally,
+        closing the writer completes the compressed data without closing stream
+
+        :param stream: binary file-like object the compressed data is written to
+        :param compression: 'gzip' or 'zstd'
+
+        returns:
+          writer: binary file-like object
+        """
+        if compression == CompressionTypes.GZIP.value:
+            return gzip.GzipFile(fileobj=stream, mode='wb')
+        return zstandard.ZstdCompressor().stream_writer(stream, closefd=False)
+
+    def __count(self, name: str, value: int = 1):
+        """
+        Helper function increasing a counter of self.metrics if there is one
+
+        :name: name of the counter
+        :value: amount the counter is increased by
+        """
+        if self.metrics is not None:
+            self.metrics.increment(name, value)
+
+    def __count_download(self, response: dict):
+        """
+        Helper function counting a downloaded object and its bytes
+
+        :response: response of a GetObject request
+        """
+        self.__count('objects_read')
+        self.__count('bytes_downloaded', response.get('ContentLength', 0))
+
+    @staticmethod
+    def csv_bytes_to_df(csv_obj: bytes, encoding: str = 'utf-8', sep: str = ',',
+                        usecols: list = None, dtype: dict = None,
+                        engine: str = CsvParserEngines.C.value,
+                        compression: str = None) -> pd.DataFrame:
+        """
+        parsing the content of a csv file like read_csv_to_df
+
+        :param csv_obj: content of the csv file
+        :param encoding: encoding of the data inside the csv file
+        :param sep: separator of the csv file
+        :param usecols: columns that should be parsed, all columns if None
+        :param dtype: data types per column, inferred if None
+        :param engine: csv parser backend, 'c' or 'pyarrow'
+        :param compression: compression of csv_obj, 'gzip' or 'zstd', uncompressed if None
+
+        returns:
+          data_frame: Pandas DataFrame containing the data of the csv file
+        """
+        if compression is not None:
+            with S3BucketConnector.decompressing_reader(BytesIO(csv_obj), compression) as reader:
+                csv_obj = reader.read()
+        if engine == CsvParserEngines.C.value:
+            return pd.read_csv(BytesIO(csv_obj), encoding=encoding, sep=sep,
+                               usecols=usecols, dtype=dtype)
+        if engine == CsvParserEngines.PYARROW.value:
+            return S3BucketConnector.__read_csv_pyarrow(csv_obj, encoding, sep, usecols, dtype)
+        logging.getLogger(__name__).info('The csv parser engine %s is not supported!', engine)
+        raise WrongFormatException
+
+    @staticmethod
+    def __read_csv_pyarrow(csv_obj: bytes, encoding: str, sep: str,
+                           usecols: list, dtype: dict) -> pd.DataFrame:
+        """
+        Helper function for self.csv_bytes_to_df()
+        parsing csv bytes with the multithreaded pyarrow csv reader
+
+        :csv_obj: content of the csv file
+        :encoding: encoding of the data inside the csv file
+        :sep: separator of the csv file
+        :usecols: columns that should be parsed, all columns if None
+        :dtype: data types per column, inferred if None
+        """
+        read_options = pa_csv.ReadOptions(encoding=encoding)
+        parse_options = pa_csv.ParseOptions(delimiter=sep)
+        # pyarrow infers dates and times which the C engine keeps as strings
+        # -> the schema inferred from the first block decides which columns are read as string
+        schema = pa_csv.open_csv(pa.BufferReader(csv_obj), read_options=read_options,
+                                 parse_options=parse_options).schema
+        column_types = {field.name: pa.string() for field in schema
+                        if pa.types.is_temporal(field.type)}
+        convert_options = pa_csv.ConvertOptions(column_types=column_types,
+                                                include_columns=usecols,
+                                                strings_can_be_null=True)
+        data_frame = pa_csv.read_csv(pa.BufferReader(csv_obj), read_options=read_options,
+                                     parse_options=parse_options,
+                                     convert_options=convert_options).to_pandas()
+        return data_frame.astype(dtype) if dtype else data_frame
+
+    def write_df_to_s3(self, data_frame: pd.DataFrame, key: str, file_format: str,
+                       parquet_args: dict = None, compression: str = None):
         """
         writing a Pandas DataFrame to S3
         supported formats: .csv, .parquet
@@ -67,34 +457,407 @@ class S3BucketConnector:
         :data_frame: Pandas DataFrame that should be written
         :key: target key of the saved file
         :file_format: format of the saved file
+        :parquet_args: further arguments of DataFrame.to_parquet, e.g. compression
+        :compression: compression of a csv file, 'gzip' or 'zstd',
+                      detected by the key suffix if None
         """
         if data_frame.empty:
             self._logger.info('The dataframe is empty! No file will be written!')
             return None
+        if file_format not in (S3FileTypes.CSV.value, S3FileTypes.PARQUET.value):
+            self._logger.info('The file format %s is not '
+                              'supported to be written to s3!', file_format)
+            raise WrongFormatException
+        self.check_compression(compression)
+        put_args = {}
         if file_format == S3FileTypes.CSV.value:
-            out_buffer = StringIO()
+            compression = compression or self.infer_compression(key)
+            if compression is not None and not self.has_compression_suffix(key):
+                # Readers detect the compression of keys without suffix by the Content-Encoding.
+                # Keys with suffix are compressed files, HTTP clients must not decompress them.
+                put_args['ContentEncoding'] = compression
+        else:
+            compression = None
+        if self.multipart_part_size:
+            return self.__upload_multipart(data_frame, key, file_format, parquet_args,
+                                           compression, put_args)
+        out_buffer = BytesIO()
+        self.serialize_df(data_frame, out_buffer, file_format, parquet_args, compression)
+        return self.__put_object(out_buffer, key, put_args)
+
+    @staticmethod
+    def serialize_df(data_frame: pd.DataFrame, out_buffer, file_format: str,
+                     parquet_args: dict = None, compression: str = None):
+        """
+        serializing a Pandas DataFrame like write_df_to_s3
+
+        :data_frame: Pandas DataFrame that should be written
+        :out_buffer: binary file-like object the serialized data is written to
+        :file_format: format of the saved file
+        :parquet_args: further arguments of DataFrame.to_parquet, e.g. compression
+        :compression: compression of a csv file, 'gzip' or 'zstd', uncompressed if None
+        """
+        if file_format == S3FileTypes.CSV.value and compression is not None:
+            # The csv text is compressed while it is written,
+            # so the uncompressed data is never held in memory
+            with TextIOWrapper(S3BucketConnector.compressing_writer(out_buffer, compression),
+                               encoding='utf-8', newline='') as text_buffer:
+                data_frame.to_csv(text_buffer, index=False)
+        elif file_format == S3FileTypes.CSV.value:
             data_frame.to_csv(out_buffer, index=False)
-            return self.__put_object(out_buffer, key)
-        if file_format == S3FileTypes.PARQUET.value:
-            out_buffer = BytesIO()
-            data_frame.to_parquet(out_buffer, index=False)
-            return self.__put_object(out_buffer, key)
-        self._logger.info('The file format %s is not '
-                          'supported to be written to s3!', file_format)
-        raise WrongFormatException
+        else:
+            data_frame.to_parquet(out_buffer, index=False, **(parquet_args or {}))
+
+    def __put_object(self, out_buffer: BytesIO, key: str, put_args: dict):
+        """
+        Helper function for self.write_df_to_s3()
+
+        :out_buffer: BytesIO that should be written, uploaded without copying its content
+        :key: target key of the saved file
+        :put_args: further arguments of the PutObject request
+        """
+        self._logger.info('Writing file to %s/%s/%s', self.endpoint_url, self._bucket.name, key)
+        out_buffer.seek(0)
+        self._bucket.put_object(Body=out_buffer, Key=key, **put_args)
+        self.__count('objects_written')
+        self.__count('bytes_uploaded', out_buffer.getbuffer().nbytes)
+        return True
 
-    def __put_object(self, out_buffer: StringIO or BytesIO, key: str):
+    def __upload_multipart(self, data_frame: pd.DataFrame, key: str, file_format: str,
+                           parquet_args: dict, compression: str, put_args: dict):
         """
         Helper function for self.write_df_to_s3()
+        streaming the serialized data to S3 as multipart upload
 
-        :out_buffer: StringIO | BytesIO that should be written
+        :data_frame: Pandas DataFrame that should be written
         :key: target key of the saved file
+        :file_format: format of the saved file
+        :parquet_args: further arguments of DataFrame.to_parquet
+        :compression: compression of a csv file
+        :put_args: further arguments of the upload requests
         """
         self._logger.info('Writing file to %s/%s/%s', self.endpoint_url, self._bucket.name, key)
-        self._bucket.put_object(Body=out_buffer.getvalue(), Key=key)
+        writer = S3MultipartWriter(self._s3.meta.client, self._bucket.name, key,
+                                   self.multipart_part_size, self.multipart_concurrency,
+                                   put_args)
+        try:
+            self.serialize_df(data_frame, writer, file_format, parquet_args, compression)
+        except Exception:
+            writer.abort()
+            raise
+        writer.close()
+        self.__count('objects_written')
+        self.__count('bytes_uploaded', writer.tell())
         return True
 
 
+class S3ConnectionFactory:
+    """
+    Creates S3BucketConnectors sharing one boto3 session and one S3 resource per endpoint
+
+    Building a client loads the endpoint and service model data, so source, target
+    and meta connectors of one run reuse the same clients and connection pools.
+    """
+
+    def __init__(self, access_key: str, secret_key: str, max_pool_connections: int = 10,
+                 tcp_keepalive: bool = False, retry_max_attempts: int = None,
+                 retry_mode: str = None):
+        """
+        Constructor for S3ConnectionFactory
+
+        :param access_key: access key for accessing S3
+        :param secret_key: secret key for accessing S3
+        :param max_pool_connections: maximum number of pooled HTTP connections per endpoint,
+                                     should cover all threads using the clients
+        :param tcp_keepalive: enables TCP keep-alive on the pooled connections
+        :param retry_max_attempts: maximum number of attempts per request,
+                                   botocore default if None
+        :param retry_mode: botocore retry mode, 'legacy', 'standard' or 'adaptive',
+                           botocore default if None
+        """
+        self.access_key = access_key
+        self.secret_key = secret_key
+        self.session = boto3.Session(aws_access_key_id=os.environ[access_key],
+                                     aws_secret_access_key=os.environ[secret_key])
+        retries = {}
+        if retry_mode is not None:
+            retries['mode'] = retry_mode
+        if retry_max_attempts is not None:
+            retries['max_attempts'] = retry_max_attempts
+        self.config = Config(max_pool_connections=max_pool_connections,
+                             tcp_keepalive=tcp_keepalive, retries=retries or None)
+        self._resources = {}
+        self._lock = threading.Lock()
+
+    def resource(self, endpoint_url: str):
+        """
+        Returns the shared S3 resource of an endpoint, created on first use
+
+        :param endpoint_url: endpoint url to S3
+        """
+        with self._lock:
+            if endpoint_url not in self._resources:
+                self._resources[endpoint_url] = self.session.resource(
+                    service_name='s3', endpoint_url=endpoint_url, config=self.config)
+            return self._resources[endpoint_url]
+
+    def connector(self, endpoint_url: str, bucket: str, **kwargs) -> S3BucketConnector:
+        """
+        Creates an S3BucketConnector using the shared session and S3 resource
+
+        :param endpoint_url: endpoint url to S3
+        :param bucket: S3 bucket name
+        :param kwargs: further keyword arguments of S3BucketConnector
+        """
+        return S3BucketConnector(self.access_key, self.secret_key, endpoint_url, bucket,
+                                 connection_factory=self, **kwargs)
+
+
+class S3RangeReader(RawIOBase):
+    """
+    Seekable binary file-like object reading an S3 object with byte-range requests
+
+    Every read downloads only the requested range, so readers seeking to the parts
+    they need, like the parquet reader, never download the whole object.
+    """
+
+    def __init__(self, client, bucket: str, key: str, metrics: PipelineMetrics = None):
+        """
+        Constructor for S3RangeReader
+
+        :param client: boto3 S3 client
+        :param bucket: S3 bucket name
+        :param key: key of the file that should be read
+        :param metrics: PipelineMetrics the range requests and downloaded bytes are
+                        recorded in, nothing is recorded if None
+        """
+        super().__init__()
+        self._client = client
+        self._bucket = bucket
+        self._key = key
+        self._metrics = metrics
+        response = client.head_object(Bucket=bucket, Key=key)
+        self.size = response['ContentLength']
+        # All ranges have to belong to the same version of the object
+        self._etag = response['ETag']
+        self._position = 0
+
+    def readable(self):
+        return True
+
+    def seekable(self):
+        return True
+
+    def tell(self):
+        return self._position
+
+    def seek(self, offset: int, whence: int = 0):
+        """
+        Changes the position, nothing is downloaded
+
+        :param offset: offset relative to whence
+        :param whence: 0 for the start, 1 for the current position, 2 for the end
+        """
+        if whence == 0:
+            position = offset
+        elif whence == 1:
+            position = self._position + offset
+        elif whence == 2:
+            position = self.size + offset
+        else:
+            raise ValueError(f'Invalid whence {whence}')
+        if position < 0:
+            raise ValueError('Negative seek position')
+        self._position = position
+        return self._position
+
+    def readinto(self, buffer):
+        """
+        Downloads the range from the current position into buffer
+
+        :param buffer: writable bytes-like object
+        """
+        end = min(self._position + len(buffer), self.size)
+        if end <= self._position:
+            return 0
+        response = self._client.get_object(Bucket=self._bucket, Key=self._key,
+                                           Range=f'bytes={self._position}-{end - 1}',
+                                           IfMatch=self._etag)
+        data = response['Body'].read()
+        memoryview(buffer)[:len(data)] = data
+        self._position += len(data)
+        if self._metrics is not None:
+            self._metrics.increment('range_requests')
+            self._metrics.increment('bytes_downloaded', len(data))
+        return len(data)
+
+
+class S3MultipartWriter(RawIOBase):
+    """
+    Binary file-like object uploading everything written to it as S3 multipart upload
+
+    Data is cut into parts of part_size bytes which are uploaded by a thread pool
+    while the writer keeps serializing, so at most max_concurrency parts are held
+    in memory. Objects smaller than one part are written with a single put_object.
+    """
+
+    def __init__(self, client, bucket: str, key: str, part_size: int, max_concurrency: int = 4,
+                 put_args: dict = None):
+        """
+        Constructor for S3MultipartWriter
+
+        :param client: boto3 S3 client
+        :param bucket: S3 bucket name
+        :param key: target key of the saved file
+        :param part_size: size of one part in bytes, at least 5 MiB on AWS S3
+        :param max_concurrency: maximum number of parts uploaded in parallel
+        :param put_args: further arguments of the object, e.g. ContentEncoding
+        """
+        super().__init__()
+        self._client = client
+        self._bucket = bucket
+        self._key = key
+        self._part_size = part_size
+        self._put_args = put_args or {}
+        self._buffer = bytearray()
+        self._position = 0
+        self._upload_id = None
+        self._futures = []
+        self._slots = threading.BoundedSemaphore(max_concurrency)
+        self._executor = ThreadPoolExecutor(max_workers=max_concurrency)
+
+    def writable(self):
+        return True
+
+    def tell(self):
+        return self._position
+
+    def write(self, data):
+        """
+        Buffers data and uploads every complete part
+
+        :param data: bytes-like object that should be written
+        """
+        self._buffer += data
+        self._position += len(data)
+        while len(self._buffer) >= self._part_size:
+            self.__upload_part(bytes(self._buffer[:self._part_size]))
+            del self._buffer[:self._part_size]
+        return len(data)
+
+    def close(self):
+        """
+        Uploads the remaining data and completes the multipart upload
+        """
+        if self.closed:
+            return
+        try:
+            if self._upload_id is None:
+                self._client.put_object(Bucket=self._bucket, Key=self._key,
+                                        Body=bytes(self._buffer), **self._put_args)
+            else:
+                if self._buffer:
+                    self.__upload_part(bytes(self._buffer))
+                parts = [future.result() for future in self._futures]
+                self._client.complete_multipart_upload(Bucket=self._bucket, Key=self._key,
+                                                       UploadId=self._upload_id,
+                                                       MultipartUpload={'Parts': parts})
+        except Exception:
+            self.abort()
+            raise
+        finally:
+            self._buffer = bytearray()
+            self._executor.shutdown()
+            super().close()
+
+    def abort(self):
+        """
+        Aborts the multipart upload, so no incomplete parts are kept on S3
+        """
+        if self._upload_id is not None:
+            for future in self._futures:
+                future.cancel()
+            self._executor.shutdown()
+            self._client.abort_multipart_upload(Bucket=self._bucket, Key=self._key,
+                                                UploadId=self._upload_id)
+            self._upload_id = None
+        self._buffer = bytearray()
+        super().close()
+
+    def __upload_part(self, data: bytes):
+        """
+        Submits one part to the thread pool, waiting while max_concurrency parts are in flight
+
+        :param data: content of the part
+        """
+        if self._upload_id is None:
+            self._upload_id = self._client.create_multipart_upload(
+                Bucket=self._bucket, Key=self._key, **self._put_args)['UploadId']
+        self._slots.acquire()
+        part_number = len(self._futures) + 1
+        self._futures.append(self._executor.submit(self.__send_part, part_number, data))
+
+    def __send_part(self, part_number: int, data: bytes):
+        """
+        Uploads one part, executed by the thread pool
+
+        :param part_number: number of the part starting with 1
+        :param data: content of the part
+        """
+        try:
+            response = self._client.upload_part(Bucket=self._bucket, Key=self._key,
+                                                UploadId=self._upload_id,
+                                                PartNumber=part_number, Body=data)
+            return {'PartNumber': part_number, 'ETag': response['ETag']}
+        finally:
+            self._slots.release()
+
+
+
+class StreamDecompressor:
+    """
+    Incremental decompressor of a gzip or zstd stream fed chunk by chunk
+
+    Counterpart of S3BucketConnector.decompressing_reader for streams that are not
+    file-like, like the asynchronous response body. Only the decompressed data is
+    kept, several gzip members or zstd frames are decompressed one after another.
+    """
+
+    def __init__(self, compression: str):
+        """
+        Constructor for StreamDecompressor
+
+        :param compression: 'gzip' or 'zstd'
+        """
+        self._compression = compression
+        self._decompressor = self.__new_decompressor()
+
+    def decompress(self, chunk: bytes) -> bytes:
+        """
+        Decompresses the next chunk of the stream
+
+        :param chunk: next chunk of compressed data
+
+        returns:
+          data: decompressed data available after this chunk
+        """
+        data = [self._decompressor.decompress(chunk)]
+        if self._compression == CompressionTypes.GZIP.value:
+            # A further gzip member starts after the end of the current one
+            while self._decompressor.eof and self._decompressor.unused_data:
+                unused_data = self._decompressor.unused_data
+                self._decompressor = self.__new_decompressor()
+                data.append(self._decompressor.decompress(unused_data))
+        return b''.join(data)
+
+    def __new_decompressor(self):
+        """
+        Creates the decompressor of one gzip member or of all zstd frames
+        """
+        if self._compression == CompressionTypes.GZIP.value:
+            return zlib.decompressobj(wbits=zlib.MAX_WBITS | 16)
+        return zstandard.ZstdDecompressor().decompressobj(read_across_frames=True)
+
 if __name__ == '__main__':
     logging.basicConfig(level=logging.INFO)
     logger = logging.getLogger(__name__)
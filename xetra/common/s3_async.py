@@ -0,0 +1,237 @@
+"""Asynchronous connector and methods accessing S3"""
+import asyncio
+import os
+import logging
+from contextlib import AsyncExitStack
+from io import BytesIO
+
+import pandas as pd
+from aiobotocore.config import AioConfig
+from aiobotocore.session import get_session
+
+from xetra.common.s3 import S3BucketConnector, StreamDecompressor
+from xetra.common.local_cache import LocalObjectCache
+from xetra.common.metrics import PipelineMetrics
+from xetra.common.constants import S3FileTypes, CsvParserEngines
+from xetra.common.custom_exceptions import WrongFormatException
+
+# Size of the chunks the response body of read_csv_to_df is read in
+READ_CHUNK_SIZE = 1024 * 1024
+
+
+class AsyncS3BucketConnector:
+    """
+    Class for interacting with S3 Buckets from asyncio code
+
+    Counterpart of S3BucketConnector on an aiobotocore client, so many requests
+    can be in flight on one thread. The client is opened with 'async with'.
+    Parsing and the local cache run in worker threads, so they do not block the
+    event loop. Only the transfer counters of the metrics are recorded, no latencies.
+    """
+
+    def __init__(self, access_key: str, secret_key: str, endpoint_url: str, bucket: str,
+                 max_pool_connections: int = 100, cache: LocalObjectCache = None,
+                 metrics: PipelineMetrics = None):
+        """
+        Constructor for AsyncS3BucketConnector
+
+        :param access_key: access key for accessing S3
+        :param secret_key: secret key for accessing S3
+        :param endpoint_url: endpoint url to S3
+        :param bucket: S3 bucket name
+        :param max_pool_connections: maximum number of open HTTP connections
+        :param cache: LocalObjectCache parsed csv files are kept in, read_csv_to_df
+                      always downloads if None
+        :param metrics: PipelineMetrics transferred bytes and objects are recorded in,
+                        nothing is recorded if None
+        """
+        self._logger = logging.getLogger(__name__)
+        self.endpoint_url = endpoint_url
+        self.bucket = bucket
+        self.max_pool_connections = max_pool_connections
+        self.cache = cache
+        self.metrics = metrics
+        # ETags of listed keys, used to address cache entries
+        self._etags = {}
+        self.session = get_session()
+        self._access_key = os.environ[access_key]
+        self._secret_key = os.environ[secret_key]
+        self._exit_stack = None
+        self._client = None
+
+    async def __aenter__(self):
+        self._exit_stack = AsyncExitStack()
+        self._client = await self._exit_stack.enter_async_context(self.session.create_client(
+            's3', endpoint_url=self.endpoint_url,
+            aws_access_key_id=self._access_key,
+            aws_secret_access_key=self._secret_key,
+            config=AioConfig(max_pool_connections=self.max_pool_connections)))
+        return self
+
+    async def __aexit__(self, *exc_info):
+        await self._exit_stack.aclose()
+        self._exit_stack = None
+        self._client = None
+
+    async def list_files_in_prefix(self, prefix: str):
+        """
+        listing all files with a prefix on the S3 bucket
+
+        :param prefix: prefix on the S3 bucket that should be filtered with
+
+        returns:
+          files: list of all the file names containing the prefix in the key
+        """
+        paginator = self._client.get_paginator('list_objects_v2')
+        objects = []
+        async for page in paginator.paginate(Bucket=self.bucket, Prefix=prefix):
+            objects.extend(page.get('Contents', []))
+        self.__count('objects_listed', len(objects))
+        if self.cache is not None:
+            self._etags.update((obj['Key'], obj['ETag']) for obj in objects)
+        return [obj['Key'] for obj in objects]
+
+    async def read_csv_to_df(self, key: str, encoding: str = 'utf-8', sep: str = ',',
+                             usecols: list = None, dtype: dict = None,
+                             engine: str = CsvParserEngines.C.value,
+                             compression: str = None) -> pd.DataFrame:
+        """
+        reading a csv file from the S3 bucket and returning a dataframe
+
+        :param key: key of the file that should be read
+        :param encoding: encoding of the data inside the csv file
+        :param sep: separator of the csv file
+        :param usecols: columns that should be parsed, all columns if None
+        :param dtype: data types per column, inferred by pandas if None
+        :param engine: csv parser backend, 'c' or 'pyarrow'
+        :param compression: compression of the file, 'gzip' or 'zstd', detected by
+                            the key suffix or the Content-Encoding of the object if None
+
+        returns:
+          data_frame: Pandas DataFrame containing the data of the csv file
+        """
+        if engine not in (CsvParserEngines.C.value, CsvParserEngines.PYARROW.value):
+            self._logger.info('The csv parser engine %s is not supported!', engine)
+            raise WrongFormatException
+        S3BucketConnector.check_compression(compression)
+        if self.cache is None:
+            self._logger.info('Reading file %s/%s/%s', self.endpoint_url, self.bucket, key)
+            return await self.__read_csv(key, {}, encoding, sep, usecols, dtype, engine,
+                                         compression)
+        # The ETag seen by list_files_in_prefix saves the HEAD request
+        etag = self._etags.get(key) or await self.__head_etag(key)
+        entry_key = self.cache.entry_key(self.bucket, key, etag, encoding=encoding, sep=sep,
+                                         usecols=usecols, dtype=dtype, engine=engine,
+                                         compression=compression)
+        data_frame = await asyncio.to_thread(self.cache.get, entry_key)
+        if data_frame is not None:
+            self._logger.info('Reading file %s/%s/%s from the local cache',
+                              self.endpoint_url, self.bucket, key)
+            self.__count('cache_hits')
+            return data_frame
+        self._logger.info('Reading file %s/%s/%s', self.endpoint_url, self.bucket, key)
+        # IfMatch makes sure the cached content belongs to the ETag of the entry
+        data_frame = await self.__read_csv(key, {'IfMatch': etag}, encoding, sep, usecols, dtype,
+                                           engine, compression)
+        await asyncio.to_thread(self.cache.put, entry_key, data_frame)
+        return data_frame
+
+    async def __head_etag(self, key: str):
+        """
+        Helper function for self.read_csv_to_df()
+        requesting the ETag of a file, NoSuchKey is raised if it is missing
+
+        :key: key of the file
+        """
+        try:
+            return (await self._client.head_object(Bucket=self.bucket, Key=key))['ETag']
+        except self._client.exceptions.ClientError as error:
+            missing_key_error = S3BucketConnector.missing_key_error(error,
+                                                                    self._client.exceptions)
+            if missing_key_error is None:
+                raise
+            raise missing_key_error from error
+
+    async def __read_csv(self, key: str, get_args: dict, encoding: str, sep: str,
+                         usecols: list, dtype: dict, engine: str,
+                         compression: str) -> pd.DataFrame:
+        """
+        Helper function for self.read_csv_to_df()
+        downloading a csv file in chunks, decompressing every chunk right away,
+        so the whole compressed file is never held, and parsing it in a worker thread
+
+        :key: key of the file that should be read
+        :get_args: further arguments of the GetObject request
+        :encoding: encoding of the data inside the csv file
+        :sep: separator of the csv file
+        :usecols: columns that should be parsed, all columns if None
+        :dtype: data types per column, inferred if None
+        :engine: csv parser backend, 'c' or 'pyarrow'
+        :compression: compression of the file, detected if None
+        """
+        response = await self._client.get_object(Bucket=self.bucket, Key=key, **get_args)
+        compression = compression or S3BucketConnector.infer_compression(
+            key, response.get('ContentEncoding'))
+        decompressor = StreamDecompressor(compression) if compression is not None else None
+        csv_buffer = BytesIO()
+        bytes_downloaded = 0
+        async with response['Body'] as body:
+            async for chunk in body.iter_chunks(READ_CHUNK_SIZE):
+                bytes_downloaded += len(chunk)
+                if decompressor is not None:
+                    # Decompressing is CPU bound like parsing
+                    chunk = await asyncio.to_thread(decompressor.decompress, chunk)
+                csv_buffer.write(chunk)
+        self.__count('objects_read')
+        self.__count('bytes_downloaded', bytes_downloaded)
+        # Parsing is CPU bound, the event loop keeps serving the other requests meanwhile
+        return await asyncio.to_thread(S3BucketConnector.csv_bytes_to_df, csv_buffer.getvalue(),
+                                       encoding, sep, usecols, dtype, engine)
+
+    async def write_df_to_s3(self, data_frame: pd.DataFrame, key: str, file_format: str,
+                             compression: str = None):
+        """
+        writing a Pandas DataFrame to S3
+        supported formats: .csv, .parquet
+
+        :data_frame: Pandas DataFrame that should be written
+        :key: target key of the saved file
+        :file_format: format of the saved file
+        :compression: compression of a csv file, 'gzip' or 'zstd',
+                      detected by the key suffix if None
+        """
+        if data_frame.empty:
+            self._logger.info('The dataframe is empty! No file will be written!')
+            return None
+        if file_format not in (S3FileTypes.CSV.value, S3FileTypes.PARQUET.value):
+            self._logger.info('The file format %s is not '
+                              'supported to be written to s3!', file_format)
+            raise WrongFormatException
+        S3BucketConnector.check_compression(compression)
+        put_args = {}
+        if file_format == S3FileTypes.CSV.value:
+            compression = compression or S3BucketConnector.infer_compression(key)
+            if compression is not None and not S3BucketConnector.has_compression_suffix(key):
+                # Like S3BucketConnector.write_df_to_s3 only for keys without suffix
+                put_args['ContentEncoding'] = compression
+        else:
+            compression = None
+        out_buffer = BytesIO()
+        await asyncio.to_thread(S3BucketConnector.serialize_df, data_frame, out_buffer,
+                                file_format, compression=compression)
+        self._logger.info('Writing file to %s/%s/%s', self.endpoint_url, self.bucket, key)
+        out_buffer.seek(0)
+        await self._client.put_object(Bucket=self.bucket, Key=key, Body=out_buffer, **put_args)
+        self.__count('objects_written')
+        self.__count('bytes_uploaded', out_buffer.getbuffer().nbytes)
+        return True
+
+    def __count(self, name: str, value: int = 1):
+        """
+        Helper function increasing a counter of self.metrics if there is one
+
+        :name: name of the counter
+        :value: amount the counter is increased by
+        """
+        if self.metrics is not None:
+            self.metrics.increment(name, value)
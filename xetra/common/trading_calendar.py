@@ -0,0 +1,81 @@
+"""Trading calendars deciding which days can have Xetra source data"""
+from datetime import date, timedelta
+
+import pandas as pd
+from dateutil.easter import easter
+
+from xetra.common.constants import TradingCalendars
+from xetra.common.custom_exceptions import WrongFormatException
+
+
+class TradingCalendar:
+    """
+    Calendar treating every calendar day as trading day
+    """
+
+    def trading_days(self, start: date, end: date) -> pd.DatetimeIndex:
+        """
+        Returns all trading days between start and end
+
+        :param start: first day of the range, inclusive
+        :param end: last day of the range, inclusive
+        """
+        return pd.date_range(start, end, freq='D')
+
+    def previous_trading_day(self, day: date) -> pd.Timestamp:
+        """
+        Returns the last trading day before day
+
+        :param day: day the previous trading day is searched for
+        """
+        day = pd.Timestamp(day)
+        return self.trading_days(day - timedelta(days=14), day - timedelta(days=1))[-1]
+
+
+class XetraTradingCalendar(TradingCalendar):
+    """
+    Calendar of the Xetra trading days: Monday to Friday without the exchange holidays
+    """
+
+    @staticmethod
+    def holidays(start: date, end: date) -> list:
+        """
+        Returns the Xetra exchange holidays of all years from start to end
+
+        :param start: day within the first year
+        :param end: day within the last year
+        """
+        days = []
+        for year in range(pd.Timestamp(start).year, pd.Timestamp(end).year + 1):
+            easter_sunday = easter(year)
+            days += [date(year, 1, 1),
+                     easter_sunday - timedelta(days=2),
+                     easter_sunday + timedelta(days=1),
+                     date(year, 5, 1),
+                     date(year, 12, 24),
+                     date(year, 12, 25),
+                     date(year, 12, 26),
+                     date(year, 12, 31)]
+        return days
+
+    def trading_days(self, start: date, end: date) -> pd.DatetimeIndex:
+        """
+        Returns all Xetra trading days between start and end
+
+        :param start: first day of the range, inclusive
+        :param end: last day of the range, inclusive
+        """
+        return pd.bdate_range(start, end, freq='C', holidays=self.holidays(start, end))
+
+
+def get_trading_calendar(name: str = None) -> TradingCalendar:
+    """
+    Returns the trading calendar with the given name
+
+    :param name: 'all_days' or 'xetra', every calendar day is a trading day if None
+    """
+    if name is None or name == TradingCalendars.ALL_DAYS.value:
+        return TradingCalendar()
+    if name == TradingCalendars.XETRA.value:
+        return XetraTradingCalendar()
+    raise WrongFormatException
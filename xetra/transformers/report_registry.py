@@ -0,0 +1,177 @@
+"""Registry of reports computed from one shared extract of the Xetra source"""
+import copy
+import logging
+from typing import Callable, NamedTuple
+
+import pandas as pd
+
+from xetra.common.s3 import S3BucketConnector
+from xetra.common.s3_async import AsyncS3BucketConnector
+from xetra.common.metrics import PipelineMetrics
+from xetra.common.custom_exceptions import WrongFormatException
+from xetra.transformers.xetra_transformer import XetraETL, XetraSourceConfig, XetraTargetConfig
+
+
+class ReportDefinition(NamedTuple):
+    """
+    Class for the definition of a registered report
+
+    transform: function(xetra_etl, data_frame) creating the report from the source data
+               of the dates of xetra_etl.extract_date_list
+    columns: function(src_args) returning the source columns the report needs
+    """
+    transform: Callable
+    columns: Callable
+
+
+class ReportConfig(NamedTuple):
+    """
+    Class for configuration data of one report of a MultiReportETL run
+
+    report: name of the registered report
+    meta_key: key of the meta file of the report
+    trg_args: NamedTuple class with target configuration data of the report
+    """
+    report: str
+    meta_key: str
+    trg_args: XetraTargetConfig
+
+
+# Registered reports by name
+REPORTS = {}
+
+
+def register_report(name: str, transform: Callable, columns: Callable):
+    """
+    Registers a report, so it can be computed by MultiReportETL
+
+    :param name: name of the report used in ReportConfig
+    :param transform: function(xetra_etl, data_frame) creating the report
+    :param columns: function(src_args) returning the source columns the report needs
+    """
+    REPORTS[name] = ReportDefinition(transform, columns)
+
+
+def get_report(name: str) -> ReportDefinition:
+    """
+    Returns the definition of a registered report
+
+    :param name: name of the report
+    """
+    if name not in REPORTS:
+        logging.getLogger(__name__).info('The report %s is not registered!', name)
+        raise WrongFormatException
+    return REPORTS[name]
+
+
+register_report('report1', XetraETL.transform_report1,
+                lambda src_args: src_args.src_columns)
+
+
+class MultiReportETL:
+    """
+    Reads the Xetra data once and creates several reports from it
+
+    Every report keeps its own target and meta file, so it is processed for
+    the dates of its own meta file. The source files of the union of these
+    dates are extracted once with the union of the columns all reports need.
+    The streaming, pipelined and cached modes of XetraETL reduce the source
+    per report and are not supported.
+    """
+
+    def __init__(self, s3_bucket_src: S3BucketConnector,
+                 s3_bucket_trg: S3BucketConnector,
+                 src_args: XetraSourceConfig, reports: list,
+                 meta_append_only: bool = False,
+                 s3_bucket_src_async: AsyncS3BucketConnector = None,
+                 metrics: PipelineMetrics = None,
+                 meta_compact_threshold: int = 30):
+        """
+        Constructor for MultiReportETL
+
+        :param s3_bucket_src: connection to source S3 bucket
+        :param s3_bucket_trg: connection to target S3 bucket
+        :param src_args: NamedTuple class with source configuration data
+        :param reports: list of ReportConfig of the reports that should be created
+        :param meta_append_only: uses the append-only meta store with delta files per run
+        :param s3_bucket_src_async: asynchronous connection to source S3 bucket,
+                                    used by extract instead of threads if given
+        :param metrics: PipelineMetrics of the run, a new instance is used if None
+        :param meta_compact_threshold: number of delta files of the append-only meta store
+                                       from which on they are compacted into the meta file
+        """
+        self._logger = logging.getLogger(__name__)
+        if src_args.src_streaming or src_args.src_pipelined:
+            self._logger.info('Streaming and pipelined extraction are not supported '
+                              'for several reports!')
+            raise WrongFormatException
+        for report in reports:
+            if report.trg_args.trg_agg_cache_key:
+                self._logger.info('The aggregate cache of report %s is not supported '
+                                  'for several reports!', report.report)
+                raise WrongFormatException
+        self.metrics = metrics or PipelineMetrics()
+        self.reports = reports
+        self.definitions = [get_report(report.report) for report in reports]
+        # Union of the source columns of all reports in the order they are first needed,
+        # only these columns are parsed from the source files
+        self.src_args = src_args._replace(src_usecols=True, src_columns=list(dict.fromkeys(
+            column for definition in self.definitions
+            for column in definition.columns(src_args))))
+        # Every report only sees its own source columns, e.g. for dropping missing values
+        self.report_etls = [
+            XetraETL(s3_bucket_src, s3_bucket_trg, report.meta_key,
+                     src_args._replace(src_columns=definition.columns(src_args)),
+                     report.trg_args, meta_append_only=meta_append_only,
+                     s3_bucket_src_async=s3_bucket_src_async, metrics=self.metrics,
+                     meta_compact_threshold=meta_compact_threshold)
+            for report, definition in zip(reports, self.definitions)]
+        self.extract_date_list = sorted(set().union(
+            *(report_etl.extract_date_list for report_etl in self.report_etls)))
+
+    def extract(self):
+        """
+        Reads the source data of all reports in one pass
+
+        :returns:
+          data_frame: Pandas DataFrame with the union of the columns and dates of all reports
+        """
+        if not self.report_etls:
+            return pd.DataFrame()
+        # Extracting with the settings of the first report for the union of columns and dates
+        extract_etl = copy.copy(self.report_etls[0])
+        extract_etl.src_args = self.src_args
+        extract_etl.extract_date_list = self.extract_date_list
+        return extract_etl.extract()
+
+    def _report_source(self, data_frame: pd.DataFrame, report_etl: XetraETL):
+        """
+        Selects the source data of the dates of one report
+
+        :param data_frame: Pandas DataFrame with the shared extract
+        :param report_etl: XetraETL of the report
+
+        :returns:
+          data_frame: Pandas DataFrame with the rows of the dates of the report
+        """
+        if data_frame.empty or report_etl.extract_date_list == self.extract_date_list:
+            return data_frame
+        dates = data_frame[self.src_args.src_col_date]
+        return data_frame[dates.isin(report_etl.extract_date_list)].reset_index(drop=True)
+
+    def etl_reports(self):
+        """
+        Extract once, then transform and load every report
+        """
+        with self.metrics.stage('extract'):
+            data_frame = self.extract()
+        for report, definition, report_etl in zip(self.reports, self.definitions,
+                                                  self.report_etls):
+            with self.metrics.stage(f'transform_{report.report}'):
+                data_frame_report = definition.transform(
+                    report_etl, self._report_source(data_frame, report_etl))
+            with self.metrics.stage(f'load_{report.report}'):
+                report_etl.load(data_frame_report)
+            self._logger.info('Xetra report %s created.', report.report)
+        self.metrics.emit()
+        return True
@@ -1,12 +1,36 @@
 """Xetra ETL Component"""
+import asyncio
+import copy
+import hashlib
+import json
 import logging
+import queue
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
 from datetime import datetime
-from typing import NamedTuple
+from typing import NamedTuple, Union
 
 import pandas as pd
+import pyarrow as pa
+from pyarrow import parquet as pq
+from pandas.api.types import union_categoricals
+from botocore.exceptions import BotoCoreError, ClientError
 
 from xetra.common.s3 import S3BucketConnector
+from xetra.common.s3_async import AsyncS3BucketConnector
 from xetra.common.meta_process import MetaProcess
+from xetra.common.metrics import PipelineMetrics
+from xetra.common.trading_calendar import get_trading_calendar
+from xetra.common.constants import CompressionTypes, CsvParserEngines, MetaProcessFormat,\
+    S3FileTypes, TransformEngines
+from xetra.common.custom_exceptions import WrongFormatException
+
+# Base delay in seconds between retries of a failed source file read
+READ_RETRY_BACKOFF = 0.5
+# Helper columns of partial report 1 aggregates: times of the opening and closing price
+FIRST_TIME_COL = '_first_time'
+LAST_TIME_COL = '_last_time'
 
 
 class XetraSourceConfig(NamedTuple):
@@ -22,6 +46,24 @@ class XetraSourceConfig(NamedTuple):
     src_col_min_price: column name for minimum price in source
     src_col_max_price: column name for maximum price in source
     src_col_traded_vol: column name for traded volumne in source
+    src_max_workers: number of threads reading source files concurrently
+    src_read_retries: number of retries for reading a single source file
+    src_streaming: reduces the source files date by date instead of extracting all at once
+    src_compact_dtypes: parses only src_columns with explicit, compact data types
+    src_price_dtype: data type of the price columns if src_compact_dtypes is set
+    src_col_dtypes: data types of further source columns if src_compact_dtypes is set
+    src_csv_engine: csv parser backend for the source files, 'c' or 'pyarrow'
+    src_trading_calendar: calendar of the days with source data, 'all_days' or 'xetra'
+    src_async_concurrency: maximum number of requests in flight in extract_async
+    src_pipelined: runs etl_report1 as pipeline of download, transform and upload per date
+    src_pipeline_depth: number of dates buffered between two pipeline stages
+    src_mirror_key: basic key of the parquet mirror of the source on the target bucket,
+                    one compressed file with the typed src_columns per date
+    src_read_mirror: extract reads the mirror instead of the csv files and mirrors
+                     completed dates that are missing in it, not supported
+                     with the asynchronous source connector
+    src_mirror_compression: parquet compression codec of the mirror files
+    src_usecols: parses only src_columns of the source files, also without src_compact_dtypes
     """
     src_first_extract_date: str
     src_columns: list
@@ -32,6 +74,21 @@ class XetraSourceConfig(NamedTuple):
     src_col_min_price: str
     src_col_max_price: str
     src_col_traded_vol: str
+    src_max_workers: int = 1
+    src_read_retries: int = 0
+    src_streaming: bool = False
+    src_compact_dtypes: bool = False
+    src_price_dtype: str = 'float32'
+    src_col_dtypes: dict = None
+    src_csv_engine: str = CsvParserEngines.C.value
+    src_trading_calendar: str = None
+    src_async_concurrency: int = 100
+    src_pipelined: bool = False
+    src_pipeline_depth: int = 2
+    src_mirror_key: str = None
+    src_read_mirror: bool = False
+    src_mirror_compression: str = 'zstd'
+    src_usecols: bool = False
 
 
 class XetraTargetConfig(NamedTuple):
@@ -49,6 +106,24 @@ class XetraTargetConfig(NamedTuple):
     trg_key: basic key of target file
     trg_key_date_format: date format of target file key
     trg_format: file format of the target file
+    trg_transform_engine: aggregation engine of transform_report1, 'legacy' or 'single_pass'
+    trg_partition_key: basic key of a target dataset partitioned by date, single file if None
+    trg_sort_keys: columns the target data is sorted by before writing
+    trg_prev_clos_key: key of the csv file with the last prices per ISIN, used instead
+                       of extracting the day before extract_date if it is up to date
+    trg_transform_workers: number of processes the single pass aggregation is
+                           sharded to by ISIN, in-process if 1, the legacy engine only
+                           supports 1
+    trg_agg_cache_key: basic key of the daily aggregates cached on the target bucket,
+                       no caching if None
+    trg_compression: compression of csv target files, 'gzip' or 'zstd', uncompressed if None
+    trg_parquet_compression: compression codec of parquet target files, e.g. 'zstd'
+    trg_parquet_compression_level: level of trg_parquet_compression
+    trg_parquet_row_group_size: maximum number of rows per row group of parquet target files
+    trg_parquet_dictionary: dictionary encoding of parquet target files,
+                            true/false for all columns or list of columns
+    trg_parquet_statistics: column statistics of parquet target files,
+                            true/false for all columns or list of columns
     """
     trg_col_isin: str
     trg_col_date: str
@@ -61,6 +136,18 @@ class XetraTargetConfig(NamedTuple):
     trg_key: str
     trg_key_date_format: str
     trg_format: str
+    trg_transform_engine: str = TransformEngines.LEGACY.value
+    trg_partition_key: str = None
+    trg_sort_keys: list = None
+    trg_prev_clos_key: str = None
+    trg_transform_workers: int = 1
+    trg_agg_cache_key: str = None
+    trg_compression: str = None
+    trg_parquet_compression: str = None
+    trg_parquet_compression_level: int = None
+    trg_parquet_row_group_size: int = None
+    trg_parquet_dictionary: Union[bool, list] = None
+    trg_parquet_statistics: Union[bool, list] = None
 
 
 class XetraETL:
@@ -70,7 +157,11 @@ class XetraETL:
 
     def __init__(self, s3_bucket_src: S3BucketConnector,
                  s3_bucket_trg: S3BucketConnector, meta_key: str,
-                 src_args: XetraSourceConfig, trg_args: XetraTargetConfig):
+                 src_args: XetraSourceConfig, trg_args: XetraTargetConfig,
+                 meta_append_only: bool = False,
+                 s3_bucket_src_async: AsyncS3BucketConnector = None,
+                 metrics: PipelineMetrics = None,
+                 meta_compact_threshold: int = 30):
         """
         Constructor for XetraTransformer
 
@@ -79,17 +170,72 @@ class XetraETL:
         :param meta_key: used as self.meta_key -> key of meta file
         :param src_args: NamedTuple class with source configuration data
         :param trg_args: NamedTuple class with target configuration data
+        :param meta_append_only: uses the append-only meta store with delta files per run
+        :param s3_bucket_src_async: asynchronous connection to source S3 bucket,
+                                    used by extract instead of threads if given,
+                                    not together with src_read_mirror
+        :param metrics: PipelineMetrics of the run, a new instance is used if None
+        :param meta_compact_threshold: number of delta files of the append-only meta store
+                                       from which on they are compacted into the meta file
         """
         self._logger = logging.getLogger(__name__)
         self.s3_bucket_src = s3_bucket_src
+        self.s3_bucket_src_async = s3_bucket_src_async
+        self.metrics = metrics or PipelineMetrics()
         self.s3_bucket_trg = s3_bucket_trg
         self.meta_key = meta_key
+        self.meta_append_only = meta_append_only
+        self.meta_compact_threshold = meta_compact_threshold
         self.src_args = src_args
         self.trg_args = trg_args
         self.extract_date, self.extract_date_list = MetaProcess.return_date_list(
-            self.src_args.src_first_extract_date, self.meta_key, self.s3_bucket_trg)
+            self.src_args.src_first_extract_date, self.meta_key, self.s3_bucket_trg,
+            append_only=self.meta_append_only,
+            calendar=get_trading_calendar(self.src_args.src_trading_calendar))
         self.meta_update_list = [date for date in self.extract_date_list \
                                  if date >= self.extract_date]
+        # Last prices per ISIN persisted by the previous run
+        self.prev_clos_state = None
+        # Prices of the day before extract_date taken from the state instead of the source
+        self.prev_clos_seed = None
+        # Last prices per ISIN of this run, merged into the state by load
+        self.prev_clos_update = None
+        if self.trg_args.trg_prev_clos_key and self.extract_date_list:
+            self._seed_prev_clos()
+
+    @staticmethod
+    def _today():
+        """
+        Returns today's date, the source files of today are still incomplete
+
+        :returns:
+          date: e.g. 2021-04-17
+        """
+        return datetime.today().strftime(MetaProcessFormat.META_DATE_FORMAT.value)
+
+    def _seed_prev_clos(self):
+        """
+        Reads the previous closing price state of the last run. If it was written
+        for the day before extract_date, the prices of that day are taken from the
+        state and the day is removed from extract_date_list.
+        """
+        prev_date = self.extract_date_list[0]
+        try:
+            self.prev_clos_state = self.s3_bucket_trg.read_csv_to_df(
+                self.trg_args.trg_prev_clos_key)
+        except self.s3_bucket_trg.exceptions.NoSuchKey:
+            self._logger.info('No previous closing price state found.')
+            return
+        state_date = self.prev_clos_state[self.src_args.src_col_date].max() \
+            if not self.prev_clos_state.empty else None
+        if prev_date >= self.extract_date or state_date != prev_date:
+            # Falling back to extracting the day before extract_date
+            self._logger.info('The previous closing price state of %s does not match %s.',
+                              state_date, prev_date)
+            return
+        self.prev_clos_seed = self.prev_clos_state[
+            self.prev_clos_state[self.src_args.src_col_date] == prev_date]
+        self.extract_date_list = self.extract_date_list[1:]
 
     def extract(self):
         """
@@ -98,17 +244,313 @@ class XetraETL:
         :returns:
           data_frame: Pandas DataFrame with the extracted data
         """
+        if self.s3_bucket_src_async is not None:
+            if self.src_args.src_read_mirror:
+                self._logger.info('Reading the mirror is not supported '
+                                  'with the asynchronous source connector!')
+                raise WrongFormatException
+            return asyncio.run(self.extract_async())
+        if self.src_args.src_read_mirror:
+            return self.extract_mirror()
         self._logger.info('Extracting Xetra source files started...')
-        files = [key for date in self.extract_date_list \
-                 for key in self.s3_bucket_src.list_files_in_prefix(date)]
+        files = self._list_files(self.extract_date_list)
         if not files:
             data_frame = pd.DataFrame()
         else:
-            data_frame = pd.concat([self.s3_bucket_src.read_csv_to_df(file) \
-                                    for file in files], ignore_index=True)
+            data_frame = self._concat(self._read_files(files))
+        self._logger.info('Extracting Xetra source files finished.')
+        return data_frame
+
+    async def extract_async(self):
+        """
+        Asynchronous alternative to extract using s3_bucket_src_async.
+        All listings and reads run on one thread with at most
+        src_async_concurrency requests in flight.
+
+        :returns:
+          data_frame: Pandas DataFrame with the extracted data
+        """
+        self._logger.info('Extracting Xetra source files started...')
+        semaphore = asyncio.Semaphore(self.src_args.src_async_concurrency)
+
+        async def bounded(func, item):
+            async with semaphore:
+                return await func(item)
+
+        async with self.s3_bucket_src_async as s3_bucket_src:
+            files_per_date = await asyncio.gather(*(
+                bounded(s3_bucket_src.list_files_in_prefix, date)
+                for date in self.extract_date_list))
+            files = [key for keys in files_per_date for key in keys]
+            if not files:
+                data_frame = pd.DataFrame()
+            else:
+                data_frame = self._concat(await asyncio.gather(*(
+                    bounded(self._read_file_async, key) for key in files)))
         self._logger.info('Extracting Xetra source files finished.')
         return data_frame
 
+    @staticmethod
+    def _concat(data_frames: list):
+        """
+        Concatenates DataFrames keeping categorical columns categorical
+
+        :param data_frames: list of Pandas DataFrames with the same columns
+
+        :returns:
+          data_frame: concatenated Pandas DataFrame
+        """
+        for column in data_frames[0].select_dtypes('category').columns:
+            # pd.concat falls back to object columns if the categories differ
+            categories = union_categoricals(
+                [frame[column] for frame in data_frames], sort_categories=True).categories
+            data_frames = [frame.assign(**{column: frame[column].cat.set_categories(categories)})
+                           for frame in data_frames]
+        return pd.concat(data_frames, ignore_index=True)
+
+    def extract_mirror(self):
+        """
+        Alternative to extract reading the source data from the parquet mirror
+        below src_mirror_key. Completed dates missing in the mirror are read from
+        the csv files and mirrored, today's incomplete files are read but not mirrored.
+        The data has the typed src_columns of the mirror like with src_compact_dtypes.
+
+        :returns:
+          data_frame: Pandas DataFrame with the extracted data
+        """
+        self._logger.info('Extracting Xetra source data from the parquet mirror started...')
+        mirrored_keys = set(self.s3_bucket_trg.list_files_in_prefix(self.src_args.src_mirror_key))
+        data_frames = [data_frame for data_frame in self._map_concurrent(
+            lambda date: self._read_mirror_date(date, mirrored_keys), self.extract_date_list)
+                       if data_frame is not None]
+        data_frame = self._concat(data_frames) if data_frames else pd.DataFrame()
+        self._logger.info('Extracting Xetra source data from the parquet mirror finished.')
+        return data_frame
+
+    def mirror_source(self):
+        """
+        Mirror stage converting the csv files of every completed date of
+        extract_date_list once to one parquet file below src_mirror_key
+
+        :returns:
+          dates: list of the dates mirrored by this call
+        """
+        mirrored_keys = set(self.s3_bucket_trg.list_files_in_prefix(self.src_args.src_mirror_key))
+        today = self._today()
+        dates = [date for date in self.extract_date_list
+                 if date < today and self.mirror_key(date) not in mirrored_keys]
+        data_frames = self._map_concurrent(self._mirror_date, dates)
+        return [date for date, data_frame in zip(dates, data_frames) if data_frame is not None]
+
+    def mirror_key(self, date: str):
+        """
+        Creates the key of the mirror file of a date
+
+        :param date: date of the source files
+
+        :returns:
+          key: e.g. mirror/xetra/2021-04-17.parquet
+        """
+        return f'{self.src_args.src_mirror_key}{date}.{S3FileTypes.PARQUET.value}'
+
+    def _read_mirror_date(self, date: str, mirrored_keys: set):
+        """
+        Reads the source data of one date from the mirror, mirroring a missing completed date
+
+        :param date: date of the source files
+        :param mirrored_keys: keys of all mirror files
+
+        :returns:
+          data_frame: Pandas DataFrame with the data of the date, None if there is none
+        """
+        if self.mirror_key(date) in mirrored_keys:
+            data_frame = self.s3_bucket_trg.read_parquet_to_df(
+                self.mirror_key(date), columns=self.src_args.src_columns)
+            self.metrics.increment('rows_read', len(data_frame))
+            return data_frame
+        today = self._today()
+        if date < today:
+            return self._mirror_date(date)
+        files = self.s3_bucket_src.list_files_in_prefix(date)
+        if not files:
+            return None
+        return self._concat(self._map_concurrent(
+            lambda key: self._read_file(key, self._mirror_read_args()), files))
+
+    def _mirror_date(self, date: str):
+        """
+        Converts the csv files of one date to its mirror file. The rows are sorted by
+        ISIN, so the row group statistics allow filtering ISINs when reading the mirror.
+
+        :param date: date of the source files
+
+        :returns:
+          data_frame: Pandas DataFrame with the mirrored data, None if there are no files
+        """
+        files = self.s3_bucket_src.list_files_in_prefix(date)
+        if not files:
+            return None
+        data_frame = self._concat(self._map_concurrent(
+            lambda key: self._read_file(key, self._mirror_read_args()), files)) \
+            .sort_values(by=[self.src_args.src_col_isin], kind='stable') \
+            .reset_index(drop=True)
+        self.s3_bucket_trg.write_df_to_s3(
+            data_frame, self.mirror_key(date), S3FileTypes.PARQUET.value,
+            parquet_args={'compression': self.src_args.src_mirror_compression})
+        self._logger.info('Xetra source files of %s mirrored.', date)
+        return data_frame
+
+    def _mirror_read_args(self):
+        """
+        Creates the keyword arguments of S3BucketConnector.read_csv_to_df for mirroring
+
+        :returns:
+          read_args: dict with the parser engine, usecols and dtype
+        """
+        return {'engine': self.src_args.src_csv_engine,
+                'usecols': self.src_args.src_columns,
+                'dtype': self._compact_dtypes()}
+
+    def _read_csv_args(self):
+        """
+        Creates the keyword arguments of S3BucketConnector.read_csv_to_df for source files
+
+        :returns:
+          read_args: dict with the parser engine, usecols if src_usecols or
+                     src_compact_dtypes is set and dtype if src_compact_dtypes is set
+        """
+        read_args = {'engine': self.src_args.src_csv_engine}
+        if self.src_args.src_usecols or self.src_args.src_compact_dtypes:
+            read_args['usecols'] = self.src_args.src_columns
+        if self.src_args.src_compact_dtypes:
+            read_args['dtype'] = self._compact_dtypes()
+        return read_args
+
+    def _compact_dtypes(self):
+        """
+        Creates the compact data types of the src_columns
+
+        :returns:
+          dtype: dict with the data type per column
+        """
+        dtype = {
+            self.src_args.src_col_isin: 'category',
+            self.src_args.src_col_date: 'category',
+            self.src_args.src_col_start_price: self.src_args.src_price_dtype,
+            self.src_args.src_col_min_price: self.src_args.src_price_dtype,
+            self.src_args.src_col_max_price: self.src_args.src_price_dtype,
+            self.src_args.src_col_traded_vol: 'int64'
+        }
+        dtype.update(self.src_args.src_col_dtypes or {})
+        return {column: col_type for column, col_type in dtype.items()
+                if column in self.src_args.src_columns}
+
+    def _list_files(self, dates: list):
+        """
+        Lists the source files of all dates, concurrently if src_max_workers is greater than 1
+
+        :param dates: dates used as prefixes on the source bucket
+
+        :returns:
+          files: list of all file keys, grouped by date in the order of dates
+        """
+        return [key for keys in self._map_concurrent(self.s3_bucket_src.list_files_in_prefix, dates)
+                for key in keys]
+
+    def _read_files(self, files: list):
+        """
+        Reads the source files, concurrently if src_max_workers is greater than 1
+
+        :param files: keys of the source files
+
+        :returns:
+          data_frames: list of Pandas DataFrames in the same order as files
+        """
+        return self._map_concurrent(self._read_file, files)
+
+    def _map_concurrent(self, func, items: list):
+        """
+        Applies func to every item using a pool of src_max_workers threads
+
+        :param func: function that is called with every item
+        :param items: list of arguments for func
+
+        :returns:
+          results: list of the results in the same order as items
+        """
+        if self.src_args.src_max_workers <= 1 or len(items) <= 1:
+            return [func(item) for item in items]
+        with ThreadPoolExecutor(max_workers=self.src_args.src_max_workers) as executor:
+            futures = [executor.submit(func, item) for item in items]
+            try:
+                return [future.result() for future in futures]
+            except Exception:
+                # Not starting the remaining calls if one of them failed
+                for future in futures:
+                    future.cancel()
+                raise
+
+    def _read_file(self, key: str, read_args: dict = None):
+        """
+        Reads one source file, retrying transient S3 errors src_read_retries times
+
+        :param key: key of the source file
+        :param read_args: arguments of S3BucketConnector.read_csv_to_df,
+                          _read_csv_args if None
+
+        :returns:
+          data_frame: Pandas DataFrame with the data of the file
+        """
+        read_args = read_args or self._read_csv_args()
+        attempt = 0
+        while True:
+            try:
+                data_frame = self.s3_bucket_src.read_csv_to_df(key, **read_args)
+                self.metrics.increment('rows_read', len(data_frame))
+                return data_frame
+            except (BotoCoreError, ClientError) as error:
+                attempt += 1
+                time.sleep(self._read_retry_delay(key, error, attempt))
+
+    async def _read_file_async(self, key: str):
+        """
+        Reads one source file with s3_bucket_src_async, retrying like _read_file
+
+        :param key: key of the source file
+
+        :returns:
+          data_frame: Pandas DataFrame with the data of the file
+        """
+        attempt = 0
+        while True:
+            try:
+                data_frame = await self.s3_bucket_src_async.read_csv_to_df(
+                    key, **self._read_csv_args())
+                self.metrics.increment('rows_read', len(data_frame))
+                return data_frame
+            except (BotoCoreError, ClientError) as error:
+                attempt += 1
+                await asyncio.sleep(self._read_retry_delay(key, error, attempt))
+
+    def _read_retry_delay(self, key: str, error: Exception, attempt: int):
+        """
+        Decides if a failed read of a source file is retried
+
+        :param key: key of the source file
+        :param error: exception raised by the read
+        :param attempt: number of the retry that would follow
+
+        :returns:
+          delay: seconds to wait before the retry, error is raised if there is none
+        """
+        # Missing keys are not transient -> no retry
+        error_code = getattr(error, 'response', {}).get('Error', {}).get('Code')
+        if attempt > self.src_args.src_read_retries or error_code == 'NoSuchKey':
+            raise error
+        self._logger.warning('Reading file %s failed (%s), retry %s of %s.',
+                             key, error, attempt, self.src_args.src_read_retries)
+        return READ_RETRY_BACKOFF * 2 ** (attempt - 1)
+
     def transform_report1(self, data_frame: pd.DataFrame):
         """
         Applies the necessary transformation to create report 1
@@ -122,6 +564,47 @@ class XetraETL:
             self._logger.info('The dataframe is empty. No transformations will be applied.')
             return data_frame
         self._logger.info('Applying transformations to Xetra source data for report 1 started...')
+        data_frame = self._report1_from_aggregates(self._aggregate_report1_engine(data_frame))
+        self._logger.info('Applying transformations to Xetra source data finished...')
+        return data_frame
+
+    def _aggregate_report1_engine(self, data_frame: pd.DataFrame):
+        """
+        Aggregates source data per ISIN and day with trg_transform_engine,
+        sharded to trg_transform_workers processes by the single pass engine,
+        the legacy engine is not sharded and rejects more than one worker
+
+        :param data_frame: Pandas DataFrame with source data
+
+        :returns:
+          data_frame: Pandas DataFrame with one row per ISIN and day
+        """
+        if self.trg_args.trg_transform_engine == TransformEngines.SINGLE_PASS.value:
+            if self.trg_args.trg_transform_workers > 1:
+                data_frame = self._aggregate_report1_sharded(data_frame)
+            else:
+                data_frame = self._aggregate_report1(data_frame)
+            return data_frame.drop(columns=[FIRST_TIME_COL, LAST_TIME_COL])
+        if self.trg_args.trg_transform_engine == TransformEngines.LEGACY.value:
+            if self.trg_args.trg_transform_workers > 1:
+                self._logger.info('The legacy transform engine does not support '
+                                  'trg_transform_workers > 1!')
+                raise WrongFormatException
+            return self._aggregate_report1_legacy(data_frame)
+        self._logger.info('The transform engine %s is not supported!',
+                          self.trg_args.trg_transform_engine)
+        raise WrongFormatException
+
+    def _aggregate_report1_legacy(self, data_frame: pd.DataFrame):
+        """
+        Aggregates source data per ISIN and day by broadcasting the opening and
+        closing price to every row before grouping
+
+        :param data_frame: Pandas DataFrame with source data
+
+        :returns:
+          data_frame: Pandas DataFrame with one row per ISIN and day
+        """
         # Filtering necessary source columns
         data_frame = data_frame.loc[:, self.src_args.src_columns]
         # Removing rows with missing values
@@ -132,7 +615,7 @@ class XetraETL:
             .groupby([
             self.src_args.src_col_isin,
             self.src_args.src_col_date
-        ])[self.src_args.src_col_start_price] \
+        ], observed=True)[self.src_args.src_col_start_price] \
             .transform('first')
         # Calculating closing price per ISIN and day
         data_frame[self.trg_args.trg_col_clos_price] = data_frame \
@@ -140,7 +623,7 @@ class XetraETL:
             .groupby([
             self.src_args.src_col_isin,
             self.src_args.src_col_date
-        ])[self.src_args.src_col_start_price] \
+        ], observed=True)[self.src_args.src_col_start_price] \
             .transform('last')
         # Renaming columns
         data_frame.rename(columns={
@@ -152,16 +635,263 @@ class XetraETL:
         # minimum price, maximum price, traded volume
         data_frame = data_frame.groupby([
             self.src_args.src_col_isin,
-            self.src_args.src_col_date], as_index=False) \
+            self.src_args.src_col_date], as_index=False, observed=True) \
             .agg({
             self.trg_args.trg_col_op_price: 'min',
             self.trg_args.trg_col_clos_price: 'min',
             self.trg_args.trg_col_min_price: 'min',
             self.trg_args.trg_col_max_price: 'max',
             self.trg_args.trg_col_dail_trad_vol: 'sum'})
+        return data_frame
+
+    def extract_transform_report1(self):
+        """
+        Streaming alternative to extract and transform_report1.
+        The source files are read date by date and every file is reduced directly
+        to partial aggregates per ISIN and day, so the source data of the whole
+        date range is never held in memory at once.
+
+        :returns:
+          data_frame: Transformed Pandas DataFrame as Output
+        """
+        self._logger.info('Streaming Xetra source files date by date for report 1 started...')
+        files_per_date = self._map_concurrent(self.s3_bucket_src.list_files_in_prefix,
+                                              self.extract_date_list)
+        daily_aggregates = []
+        for date, files in zip(self.extract_date_list, files_per_date):
+            if not files:
+                continue
+            daily_aggregates.append(self._aggregate_files(files))
+            self._logger.info('Xetra source files of %s aggregated.', date)
+        if not daily_aggregates:
+            self._logger.info('No Xetra source files found. No transformations will be applied.')
+            return pd.DataFrame()
+        data_frame = self._merge_report1_aggregates(
+            pd.concat(daily_aggregates, ignore_index=True)) \
+            .drop(columns=[FIRST_TIME_COL, LAST_TIME_COL])
+        data_frame = self._report1_from_aggregates(data_frame)
+        self._logger.info('Streaming Xetra source files for report 1 finished.')
+        return data_frame
+
+    def _aggregate_files(self, files: list):
+        """
+        Reads source files one by one and reduces them to aggregates per ISIN and day
+
+        :param files: keys of the source files
+
+        :returns:
+          data_frame: Pandas DataFrame with the merged aggregates of all files
+        """
+        partial_aggregates = self._map_concurrent(self._read_and_aggregate_file, files)
+        return self._merge_report1_aggregates(pd.concat(partial_aggregates, ignore_index=True))
+
+    def extract_transform_report1_cached(self):
+        """
+        Alternative to extract and transform_report1 reusing daily aggregates.
+        The aggregates per ISIN of every completed day are kept below trg_agg_cache_key
+        on the target bucket, so only days without cached aggregates are read from
+        the source. Today's source files are incomplete and never cached.
+        The missing days are extracted date by date like with extract and
+        aggregated with trg_transform_engine.
+
+        :returns:
+          data_frame: Transformed Pandas DataFrame as Output
+        """
+        self._logger.info('Assembling report 1 from cached daily aggregates started...')
+        cached_keys = set(self.s3_bucket_trg.list_files_in_prefix(self._agg_cache_prefix()))
+        cached_dates = [date for date in self.extract_date_list
+                        if self.agg_cache_key(date) in cached_keys]
+        missing_dates = [date for date in self.extract_date_list if date not in cached_dates]
+        daily_aggregates = self._map_concurrent(
+            lambda date: self.s3_bucket_trg.read_parquet_to_df(self.agg_cache_key(date)),
+            cached_dates)
+        today = self._today()
+        for date in missing_dates:
+            data_frame = self._extract_date(date)
+            if data_frame.empty:
+                continue
+            aggregates = self._plain_key_columns(self._aggregate_report1_engine(data_frame))
+            if date < today:
+                self.s3_bucket_trg.write_df_to_s3(aggregates, self.agg_cache_key(date),
+                                                  S3FileTypes.PARQUET.value)
+            daily_aggregates.append(aggregates)
+            self._logger.info('Xetra source files of %s aggregated.', date)
+        if not daily_aggregates:
+            self._logger.info('No Xetra source files found. No transformations will be applied.')
+            return pd.DataFrame()
+        # Same order as the aggregation of all days at once
+        data_frame = pd.concat(
+            [self._plain_key_columns(aggregates) for aggregates in daily_aggregates],
+            ignore_index=True) \
+            .sort_values(by=[self.src_args.src_col_isin, self.src_args.src_col_date]) \
+            .reset_index(drop=True)
+        data_frame = self._report1_from_aggregates(data_frame)
+        self._logger.info('Assembling report 1 from cached daily aggregates finished.')
+        return data_frame
+
+    def _extract_date(self, date: str):
+        """
+        Extracts the source data of one date with the configured extract
+
+        :param date: date of the source files
+
+        :returns:
+          data_frame: Pandas DataFrame with the extracted data of the date
+        """
+        extract_etl = copy.copy(self)
+        extract_etl.extract_date_list = [date]
+        return extract_etl.extract()
+
+    def _agg_cache_prefix(self):
+        """
+        Creates the prefix of the cached daily aggregates. It contains a fingerprint
+        of the configuration the aggregates depend on, so a changed configuration
+        does not reuse aggregates created with the old one.
+
+        :returns:
+          prefix: e.g. cache/report1/3f2a9c81d0e4/
+        """
+        fingerprint = hashlib.sha1(json.dumps([
+            self.src_args.src_columns,
+            self.src_args.src_col_isin,
+            self.src_args.src_col_date,
+            self.src_args.src_col_time,
+            self.src_args.src_col_start_price,
+            self.src_args.src_col_min_price,
+            self.src_args.src_col_max_price,
+            self.src_args.src_col_traded_vol,
+            # The mirror has the compact data types
+            self.src_args.src_compact_dtypes or self.src_args.src_read_mirror,
+            self.src_args.src_price_dtype,
+            self.trg_args.trg_col_op_price,
+            self.trg_args.trg_col_clos_price,
+            self.trg_args.trg_col_min_price,
+            self.trg_args.trg_col_max_price,
+            self.trg_args.trg_col_dail_trad_vol]).encode('utf-8')).hexdigest()[:12]
+        return f'{self.trg_args.trg_agg_cache_key}{fingerprint}/'
+
+    def agg_cache_key(self, date: str):
+        """
+        Creates the key of the cached daily aggregates of a date
+
+        :param date: date of the aggregates
+
+        :returns:
+          key: e.g. cache/report1/3f2a9c81d0e4/2021-04-17.parquet
+        """
+        return f'{self._agg_cache_prefix()}{date}.{S3FileTypes.PARQUET.value}'
+
+    def _read_and_aggregate_file(self, key: str):
+        """
+        Reads one source file and reduces it to partial aggregates per ISIN and day
+
+        :param key: key of the source file
+
+        :returns:
+          data_frame: Pandas DataFrame with the partial aggregates of the file
+        """
+        return self._aggregate_report1(self._read_file(key))
+
+    def _aggregate_report1(self, data_frame: pd.DataFrame):
+        """
+        Reduces source data to partial aggregates per ISIN and day, see aggregate_report1
+
+        :param data_frame: Pandas DataFrame with source data
+
+        :returns:
+          data_frame: Pandas DataFrame with the partial aggregates
+        """
+        return aggregate_report1(data_frame, self.src_args, self.trg_args)
+
+    def _aggregate_report1_sharded(self, data_frame: pd.DataFrame):
+        """
+        Runs _aggregate_report1 in a process pool on shards of the source data.
+        Rows are sharded by the hash of the ISIN, so every ISIN and day is
+        aggregated completely within one shard. The shards are handed to the
+        worker processes as Arrow IPC streams instead of pickled DataFrames.
+
+        :param data_frame: Pandas DataFrame with source data
+
+        :returns:
+          data_frame: Pandas DataFrame with the aggregates, ordered like _aggregate_report1
+        """
+        workers = self.trg_args.trg_transform_workers
+        shard_ids = pd.util.hash_pandas_object(
+            data_frame[self.src_args.src_col_isin], index=False) % workers
+        buffers = [_to_ipc(shard) for _, shard in data_frame.groupby(shard_ids.values, sort=False)]
+        with ProcessPoolExecutor(max_workers=min(workers, len(buffers))) as executor:
+            aggregates = list(executor.map(_aggregate_report1_ipc, buffers,
+                                           [self.src_args] * len(buffers),
+                                           [self.trg_args] * len(buffers)))
+        return self._concat([_from_ipc(buffer) for buffer in aggregates]) \
+            .sort_values(by=[self.src_args.src_col_isin, self.src_args.src_col_date]) \
+            .reset_index(drop=True)
+
+    def _merge_report1_aggregates(self, data_frame: pd.DataFrame):
+        """
+        Merges partial aggregates per ISIN and day created by _aggregate_report1
+
+        :param data_frame: Pandas DataFrame with concatenated partial aggregates
+
+        :returns:
+          data_frame: Pandas DataFrame with one row per ISIN and day
+        """
+        keys = [self.src_args.src_col_isin, self.src_args.src_col_date]
+        # Opening price of the partial aggregate with the earliest first time
+        first = data_frame \
+            .sort_values(by=[FIRST_TIME_COL], kind='stable') \
+            .groupby(keys, as_index=False, observed=True) \
+            .agg(**{
+            self.trg_args.trg_col_op_price: (self.trg_args.trg_col_op_price, 'first'),
+            self.trg_args.trg_col_min_price: (self.trg_args.trg_col_min_price, 'min'),
+            self.trg_args.trg_col_max_price: (self.trg_args.trg_col_max_price, 'max'),
+            self.trg_args.trg_col_dail_trad_vol: (self.trg_args.trg_col_dail_trad_vol, 'sum'),
+            FIRST_TIME_COL: (FIRST_TIME_COL, 'first')})
+        # Closing price of the partial aggregate with the latest last time
+        last = data_frame \
+            .sort_values(by=[LAST_TIME_COL], kind='stable') \
+            .groupby(keys, as_index=False, observed=True) \
+            .agg(**{
+            self.trg_args.trg_col_clos_price: (self.trg_args.trg_col_clos_price, 'last'),
+            LAST_TIME_COL: (LAST_TIME_COL, 'last')})
+        data_frame = first.merge(last, on=keys)
+        return data_frame[keys + [
+            self.trg_args.trg_col_op_price,
+            self.trg_args.trg_col_clos_price,
+            self.trg_args.trg_col_min_price,
+            self.trg_args.trg_col_max_price,
+            self.trg_args.trg_col_dail_trad_vol,
+            FIRST_TIME_COL,
+            LAST_TIME_COL]]
+
+    def _report1_from_aggregates(self, data_frame: pd.DataFrame):
+        """
+        Finishes report 1 from the aggregates per ISIN and day
+
+        :param data_frame: Pandas DataFrame with one row per ISIN and day
+
+        :returns:
+          data_frame: Pandas DataFrame with the change to the previous closing price,
+          rounded and without the day before extract_date
+        """
+        # Categorical keys and compact price types of the source are not kept in the report
+        data_frame = self._plain_key_columns(data_frame).astype({
+            self.trg_args.trg_col_op_price: 'float64',
+            self.trg_args.trg_col_clos_price: 'float64',
+            self.trg_args.trg_col_min_price: 'float64',
+            self.trg_args.trg_col_max_price: 'float64'})
+        prices = data_frame[[
+            self.src_args.src_col_isin,
+            self.src_args.src_col_date,
+            self.trg_args.trg_col_op_price]]
+        if self.prev_clos_seed is not None:
+            # Prices of the day before extract_date from the previous closing price state,
+            # indexed below the aggregates so they are not assigned back
+            seed = self.prev_clos_seed[prices.columns]
+            prices = pd.concat([seed.set_axis(range(-len(seed), 0)), prices])
         # Change of current day's closing price compared to the
         # previous trading day's closing price in %
-        data_frame[self.trg_args.trg_col_ch_prev_clos] = data_frame \
+        data_frame[self.trg_args.trg_col_ch_prev_clos] = prices \
             .sort_values(by=[self.src_args.src_col_date]) \
             .groupby([self.src_args.src_col_isin])[self.trg_args.trg_col_op_price] \
             .shift(1)
@@ -169,11 +899,37 @@ class XetraETL:
                                                                  data_frame[self.trg_args.trg_col_op_price] \
                                                                  - data_frame[self.trg_args.trg_col_ch_prev_clos]
                                                          ) / data_frame[self.trg_args.trg_col_ch_prev_clos] * 100
+        if self.trg_args.trg_prev_clos_key:
+            # Unrounded prices of the last extracted day per ISIN for the next run,
+            # including today: the next run starts after today, which is marked as
+            # processed, and only uses the opening price, which is fixed once traded
+            self.prev_clos_update = data_frame \
+                .sort_values(by=[self.src_args.src_col_date], kind='stable') \
+                .groupby([self.src_args.src_col_isin]).tail(1)[[
+                self.src_args.src_col_isin,
+                self.src_args.src_col_date,
+                self.trg_args.trg_col_op_price,
+                self.trg_args.trg_col_clos_price]]
         # Rounding to 2 decimals
         data_frame = data_frame.round(decimals=2)
         # Removing the day before extract_date
-        data_frame = data_frame[data_frame.Date >= self.extract_date].reset_index(drop=True)
-        self._logger.info('Applying transformations to Xetra source data finished...')
+        data_frame = data_frame[
+            data_frame[self.src_args.src_col_date] >= self.extract_date].reset_index(drop=True)
+        return data_frame
+
+    def _plain_key_columns(self, data_frame: pd.DataFrame):
+        """
+        Converts categorical ISIN and date columns to the type of their categories
+
+        :param data_frame: Pandas DataFrame with ISIN and date column
+
+        :returns:
+          data_frame: Pandas DataFrame without categorical key columns
+        """
+        for column in [self.src_args.src_col_isin, self.src_args.src_col_date]:
+            if isinstance(data_frame[column].dtype, pd.CategoricalDtype):
+                data_frame = data_frame.assign(**{column: data_frame[column].astype(
+                    data_frame[column].cat.categories.dtype)})
         return data_frame
 
     def load(self, data_frame: pd.DataFrame):
@@ -182,28 +938,437 @@ class XetraETL:
 
         :param data_frame: Pandas DataFrame as Input
         """
-        # Creating target key
-        target_key = (
-            f'{self.trg_args.trg_key}'
-            f'{datetime.today().strftime(self.trg_args.trg_key_date_format)}.'
-            f'{self.trg_args.trg_format}'
-        )
-        # Writing to target
-        self.s3_bucket_trg.write_df_to_s3(data_frame, target_key, self.trg_args.trg_format)
+        # Sorting the rows, e.g. by ISIN for pruning row groups in the target files
+        if self.trg_args.trg_sort_keys and not data_frame.empty:
+            data_frame = data_frame.sort_values(
+                by=self.trg_args.trg_sort_keys, kind='stable').reset_index(drop=True)
+        if self.trg_args.trg_partition_key:
+            # Writing one file per date to the target
+            self._write_partitions(data_frame)
+        else:
+            # Writing to target
+            self._write_target(data_frame, self.target_key())
+        return self._finish_load(len(data_frame))
+
+    def _finish_load(self, rows_written: int):
+        """
+        Updates the meta file and the previous closing price state
+        after the target data is written
+
+        :param rows_written: number of rows written to the target
+        """
         self._logger.info('Xetra target data successfully written.')
+        self.metrics.increment('rows_written', rows_written)
         # Updating meta file
-        MetaProcess.update_meta_file(self.meta_update_list, self.meta_key, self.s3_bucket_trg)
+        MetaProcess.update_meta_file(self.meta_update_list, self.meta_key, self.s3_bucket_trg,
+                                     append_only=self.meta_append_only,
+                                     compact_threshold=self.meta_compact_threshold)
         self._logger.info('Xetra meta file successfully updated.')
+        if self.prev_clos_update is not None:
+            self._write_prev_clos_state()
         return True
 
+    def _write_prev_clos_state(self):
+        """
+        Merges the last prices per ISIN of this run into the previous
+        closing price state and writes it to the target
+        """
+        state = pd.concat([self.prev_clos_state, self.prev_clos_update], ignore_index=True) \
+            .sort_values(by=[self.src_args.src_col_date], kind='stable') \
+            .groupby([self.src_args.src_col_isin]).tail(1) \
+            .sort_values(by=[self.src_args.src_col_isin]).reset_index(drop=True)
+        self.s3_bucket_trg.write_df_to_s3(state, self.trg_args.trg_prev_clos_key,
+                                          S3FileTypes.CSV.value)
+        self._logger.info('Xetra previous closing price state successfully updated.')
+
+    def _write_partitions(self, data_frame: pd.DataFrame):
+        """
+        Writes the report as dataset partitioned by date,
+        a rerun overwrites only the partitions of its dates
+
+        :param data_frame: Pandas DataFrame as Input
+        """
+        if data_frame.empty:
+            self._logger.info('The dataframe is empty! No partition will be written!')
+            return
+        partitions = list(data_frame.groupby(self.src_args.src_col_date, sort=True))
+        self._map_concurrent(
+            lambda partition: self._write_target(partition[1].reset_index(drop=True),
+                                                 self.partition_key(partition[0])),
+            partitions)
+
+    def _write_target(self, data_frame: pd.DataFrame, key: str):
+        """
+        Writes target data in trg_format, parquet files with the trg_parquet options
+
+        :param data_frame: Pandas DataFrame as Input
+        :param key: key of the target file
+        """
+        parquet_args = None
+        if self.trg_args.trg_format == S3FileTypes.PARQUET.value:
+            parquet_args = self._parquet_args(data_frame)
+        return self.s3_bucket_trg.write_df_to_s3(data_frame, key, self.trg_args.trg_format,
+                                                 parquet_args=parquet_args)
+
+    def _parquet_args(self, data_frame: pd.DataFrame):
+        """
+        Creates the writer options of parquet target files, options that are
+        not configured keep the pyarrow defaults
+
+        :param data_frame: Pandas DataFrame that is written
+
+        :returns:
+          parquet_args: dict with the arguments of DataFrame.to_parquet
+        """
+        if data_frame.empty:
+            # Nothing is written, see S3BucketConnector.write_df_to_s3
+            return {}
+        options = {
+            'compression': self.trg_args.trg_parquet_compression,
+            'compression_level': self.trg_args.trg_parquet_compression_level,
+            'row_group_size': self.trg_args.trg_parquet_row_group_size,
+            'use_dictionary': self.trg_args.trg_parquet_dictionary,
+            'write_statistics': self.trg_args.trg_parquet_statistics}
+        parquet_args = {name: value for name, value in options.items() if value is not None}
+        # Declaring the sort order in the file metadata for query engines,
+        # up to the first sort key that is not a column of the target data
+        sorting_columns = []
+        for column in self.trg_args.trg_sort_keys or []:
+            if column not in data_frame.columns:
+                break
+            sorting_columns.append(pq.SortingColumn(data_frame.columns.get_loc(column)))
+        if sorting_columns:
+            parquet_args['sorting_columns'] = sorting_columns
+        return parquet_args
+
+    def target_key(self):
+        """
+        Creates the key of the target file of this run
+
+        :returns:
+          key: e.g. report1/xetra_daily_report1_20210510_101629.parquet
+        """
+        return (
+            f'{self.trg_args.trg_key}'
+            f'{datetime.today().strftime(self.trg_args.trg_key_date_format)}.'
+            f'{self._target_extension()}'
+        )
+
+    def partition_key(self, date: str):
+        """
+        Creates the target key of the partition of a date
+
+        :param date: date of the partition
+
+        :returns:
+          key: e.g. report1/date=2021-04-17/part-00000.parquet
+        """
+        return (
+            f'{self.trg_args.trg_partition_key}'
+            f'{self.trg_args.trg_col_date}={date}/'
+            f'part-00000.{self._target_extension()}'
+        )
+
+    def _target_extension(self):
+        """
+        Creates the extension of the target files, csv files get the suffix of
+        trg_compression, which S3BucketConnector.write_df_to_s3 compresses them by
+
+        :returns:
+          extension: e.g. parquet or csv.gz
+        """
+        if self.trg_args.trg_format != S3FileTypes.CSV.value or not self.trg_args.trg_compression:
+            return self.trg_args.trg_format
+        suffixes = {CompressionTypes.GZIP.value: 'gz', CompressionTypes.ZSTD.value: 'zst'}
+        if self.trg_args.trg_compression not in suffixes:
+            self._logger.info('The compression %s is not supported!',
+                              self.trg_args.trg_compression)
+            raise WrongFormatException
+        return f'{self.trg_args.trg_format}.{suffixes[self.trg_args.trg_compression]}'
+
+    def etl_report1_pipelined(self):
+        """
+        Pipelined alternative to etl_report1. A download thread reads the source
+        files date by date, the calling thread aggregates every date and calculates
+        its change to the previous closing price, and an upload thread writes the
+        report of every date. The stages are connected by queues holding at most
+        src_pipeline_depth dates, so they overlap while memory stays bounded.
+        The dates are extracted with extract and aggregated with trg_transform_engine,
+        the cached daily aggregates of trg_agg_cache_key are not supported.
+        """
+        if self.trg_args.trg_agg_cache_key:
+            self._logger.info('The aggregate cache is not supported for the pipelined ETL!')
+            raise WrongFormatException
+        self._logger.info('Pipelined Xetra ETL for report 1 started...')
+        downloads = queue.Queue(maxsize=self.src_args.src_pipeline_depth)
+        uploads = queue.Queue(maxsize=self.src_args.src_pipeline_depth)
+        stop = threading.Event()
+        with ThreadPoolExecutor(max_workers=2) as executor:
+            producer = executor.submit(self._pipeline_stage, self._pipeline_download,
+                                       None, downloads, stop)
+            consumer = executor.submit(self._pipeline_stage, self._pipeline_upload,
+                                       uploads, None, stop)
+            try:
+                self._pipeline_transform(downloads, uploads, stop)
+                self._pipeline_put(uploads, None, stop)
+            except BaseException:
+                stop.set()
+                raise
+            finally:
+                rows_written = consumer.result()
+                producer.result()
+        self._logger.info('Pipelined Xetra ETL for report 1 finished.')
+        return self._finish_load(rows_written)
+
+    def _pipeline_stage(self, func, source: queue.Queue, sink: queue.Queue,
+                        stop: threading.Event):
+        """
+        Runs a pipeline stage in a worker thread, stopping the other stages if it fails
+
+        :param func: function of the stage called with source, sink and stop
+        :param source: queue the stage takes its input from
+        :param sink: queue the stage puts its output to
+        :param stop: event set if one of the stages failed
+        """
+        try:
+            return func(source, sink, stop)
+        except BaseException:
+            stop.set()
+            raise
+
+    @staticmethod
+    def _pipeline_put(sink: queue.Queue, item, stop: threading.Event):
+        """
+        Puts an item to a pipeline queue, giving up if the pipeline is stopped
+
+        :param sink: queue the item is put to
+        :param item: item, None marks the end of the input of the next stage
+        :param stop: event set if one of the stages failed
+        """
+        while not stop.is_set():
+            try:
+                sink.put(item, timeout=0.1)
+                return True
+            except queue.Full:
+                continue
+        return False
+
+    @staticmethod
+    def _pipeline_items(source: queue.Queue, stop: threading.Event):
+        """
+        Yields the items of a pipeline queue until its end or a stop of the pipeline
+
+        :param source: queue the items are taken from
+        :param stop: event set if one of the stages failed
+        """
+        while not stop.is_set():
+            try:
+                item = source.get(timeout=0.1)
+            except queue.Empty:
+                continue
+            if item is None:
+                return
+            yield item
+
+    def _pipeline_download(self, _source: queue.Queue, sink: queue.Queue,
+                           stop: threading.Event):
+        """
+        Pipeline stage extracting the source data date by date
+
+        :param sink: queue the date and its source data are put to
+        :param stop: event set if one of the stages failed
+        """
+        for date in self.extract_date_list:
+            data_frame = self._extract_date(date)
+            if not data_frame.empty and not self._pipeline_put(sink, (date, data_frame), stop):
+                return
+        self._pipeline_put(sink, None, stop)
+
+    def _pipeline_transform(self, source: queue.Queue, sink: queue.Queue,
+                            stop: threading.Event):
+        """
+        Pipeline stage aggregating the source data of every date and calculating
+        the change to the previous closing price from the opening prices carried
+        over from earlier dates
+
+        :param source: queue with the dates and their source data
+        :param sink: queue the date and its report are put to
+        :param stop: event set if one of the stages failed
+        """
+        isin = self.src_args.src_col_isin
+        price_columns = [self.src_args.src_col_date,
+                         self.trg_args.trg_col_op_price,
+                         self.trg_args.trg_col_clos_price]
+        # Last date with prices per ISIN, seeded by the previous closing price state
+        carry = pd.DataFrame({self.src_args.src_col_date: pd.Series(dtype='str'),
+                              self.trg_args.trg_col_op_price: pd.Series(dtype='float64'),
+                              self.trg_args.trg_col_clos_price: pd.Series(dtype='float64')},
+                             index=pd.Index([], name=isin))
+        if self.prev_clos_seed is not None:
+            carry = self.prev_clos_seed.set_index(isin)[price_columns]
+        for date, data_frame in self._pipeline_items(source, stop):
+            data_frame = self._plain_key_columns(
+                self._aggregate_report1_engine(data_frame)).astype({
+                self.trg_args.trg_col_op_price: 'float64',
+                self.trg_args.trg_col_clos_price: 'float64',
+                self.trg_args.trg_col_min_price: 'float64',
+                self.trg_args.trg_col_max_price: 'float64'})
+            prev_op_price = data_frame[isin].map(carry[self.trg_args.trg_col_op_price])
+            data_frame[self.trg_args.trg_col_ch_prev_clos] = (
+                data_frame[self.trg_args.trg_col_op_price] - prev_op_price) / prev_op_price * 100
+            carry = pd.concat([carry, data_frame.set_index(isin)[price_columns]])
+            carry = carry[~carry.index.duplicated(keep='last')]
+            self._logger.info('Xetra source files of %s transformed.', date)
+            if date >= self.extract_date and not self._pipeline_put(
+                    sink, (date, data_frame.round(decimals=2)), stop):
+                return
+        if self.trg_args.trg_prev_clos_key and not carry.empty:
+            self.prev_clos_update = carry.reset_index()
+
+    def _pipeline_upload(self, source: queue.Queue, _sink: queue.Queue,
+                         stop: threading.Event):
+        """
+        Pipeline stage writing the report of every date as partition,
+        or all dates as one file if trg_partition_key is not set
+
+        :param source: queue with the dates and their reports
+        :param stop: event set if one of the stages failed
+
+        :returns:
+          rows_written: number of rows written to the target
+        """
+        reports = []
+        rows_written = 0
+        for date, data_frame in self._pipeline_items(source, stop):
+            if self.trg_args.trg_sort_keys:
+                data_frame = data_frame.sort_values(
+                    by=self.trg_args.trg_sort_keys, kind='stable').reset_index(drop=True)
+            if self.trg_args.trg_partition_key:
+                self._write_target(data_frame, self.partition_key(date))
+            else:
+                reports.append(data_frame)
+            rows_written += len(data_frame)
+        if not self.trg_args.trg_partition_key and not stop.is_set():
+            data_frame = pd.DataFrame()
+            if reports:
+                # Same order as the report of all dates at once, sort keys already applied
+                data_frame = pd.concat(reports, ignore_index=True).sort_values(
+                    by=(self.trg_args.trg_sort_keys or [])
+                    + [self.src_args.src_col_isin, self.src_args.src_col_date],
+                    kind='stable').reset_index(drop=True)
+            self._write_target(data_frame, self.target_key())
+        return rows_written
+
     def etl_report1(self):
         """
         Extract, transform and load to create report 1
         """
-        # Extraction
-        data_frame = self.extract()
-        # Transformation
-        data_frame = self.transform_report1(data_frame)
+        if self.src_args.src_pipelined:
+            # Download, transformation and upload overlapping date by date
+            with self.metrics.stage('pipeline'):
+                self.etl_report1_pipelined()
+            self.metrics.emit()
+            return True
+        if self.trg_args.trg_agg_cache_key:
+            # Extraction of days without cached aggregates and transformation
+            with self.metrics.stage('extract_transform'):
+                data_frame = self.extract_transform_report1_cached()
+        elif self.src_args.src_streaming:
+            # Extraction and transformation date by date
+            with self.metrics.stage('extract_transform'):
+                data_frame = self.extract_transform_report1()
+        else:
+            # Extraction
+            with self.metrics.stage('extract'):
+                data_frame = self.extract()
+            # Transformation
+            with self.metrics.stage('transform'):
+                data_frame = self.transform_report1(data_frame)
         # Load
-        self.load(data_frame)
+        with self.metrics.stage('load'):
+            self.load(data_frame)
+        self.metrics.emit()
         return True
+
+
+def aggregate_report1(data_frame: pd.DataFrame, src_args: XetraSourceConfig,
+                      trg_args: XetraTargetConfig):
+    """
+    Reduces source data to partial aggregates per ISIN and day.
+    Besides the report columns the times of the opening and closing price
+    are kept, so partial aggregates can be merged with XetraETL._merge_report1_aggregates.
+
+    :param data_frame: Pandas DataFrame with source data
+    :param src_args: NamedTuple class with source configuration data
+    :param trg_args: NamedTuple class with target configuration data
+
+    :returns:
+      data_frame: Pandas DataFrame with the partial aggregates
+    """
+    # Removing rows with missing values, then keeping only the aggregated columns
+    data_frame = data_frame.loc[:, src_args.src_columns].dropna()
+    data_frame = data_frame[[
+        src_args.src_col_isin,
+        src_args.src_col_date,
+        src_args.src_col_time,
+        src_args.src_col_start_price,
+        src_args.src_col_min_price,
+        src_args.src_col_max_price,
+        src_args.src_col_traded_vol]]
+    # One sort by time and one grouped reduction for all report columns
+    return data_frame \
+        .sort_values(by=[src_args.src_col_time], kind='stable') \
+        .groupby([
+        src_args.src_col_isin,
+        src_args.src_col_date], as_index=False, observed=True) \
+        .agg(**{
+        trg_args.trg_col_op_price: (src_args.src_col_start_price, 'first'),
+        trg_args.trg_col_clos_price: (src_args.src_col_start_price, 'last'),
+        trg_args.trg_col_min_price: (src_args.src_col_min_price, 'min'),
+        trg_args.trg_col_max_price: (src_args.src_col_max_price, 'max'),
+        trg_args.trg_col_dail_trad_vol: (src_args.src_col_traded_vol, 'sum'),
+        FIRST_TIME_COL: (src_args.src_col_time, 'first'),
+        LAST_TIME_COL: (src_args.src_col_time, 'last')})
+
+
+def _aggregate_report1_ipc(buffer: bytes, src_args: XetraSourceConfig,
+                           trg_args: XetraTargetConfig):
+    """
+    Process pool worker of XetraETL._aggregate_report1_sharded
+
+    :param buffer: Arrow IPC stream with a shard of the source data
+    :param src_args: NamedTuple class with source configuration data
+    :param trg_args: NamedTuple class with target configuration data
+
+    :returns:
+      buffer: Arrow IPC stream with the aggregates of the shard
+    """
+    return _to_ipc(aggregate_report1(_from_ipc(buffer), src_args, trg_args))
+
+
+def _to_ipc(data_frame: pd.DataFrame):
+    """
+    Serializes a DataFrame to an Arrow IPC stream
+
+    :param data_frame: Pandas DataFrame
+
+    :returns:
+      buffer: bytes of the Arrow IPC stream
+    """
+    table = pa.Table.from_pandas(data_frame, preserve_index=False)
+    sink = pa.BufferOutputStream()
+    with pa.ipc.new_stream(sink, table.schema) as writer:
+        writer.write_table(table)
+    return sink.getvalue().to_pybytes()
+
+
+def _from_ipc(buffer: bytes):
+    """
+    Deserializes a DataFrame from an Arrow IPC stream
+
+    :param buffer: bytes of the Arrow IPC stream
+
+    :returns:
+      data_frame: Pandas DataFrame
+    """
+    return pa.ipc.open_stream(buffer).read_all().to_pandas()